@@ -0,0 +1,294 @@
+import argparse
+import importlib
+import multiprocessing
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from etl_io import compare_memory
+from etl_metrics import read_run_log, print_run_summary, STAGES
+from etl_scoring import VARA, add_scores, add_vara, build_resumen, filter_period
+from etl_transform import unpivot_home_away, GAME_COMMON_COLS
+from synthetic_data import BASE_ROWS, generate, dataset_paths, make_all_seasons, make_players
+
+# ============================================
+# BENCHMARK DEL ETL
+# ============================================
+# Filas de game.csv en el dataset wyattowalsh/basketball
+GAME_ROWS = 65_698
+
+GAME_STAT_COLS = [
+    "fgm", "fga", "fg_pct", "fg3m", "fg3a", "fg3_pct", "ftm", "fta", "ft_pct",
+    "oreb", "dreb", "reb", "ast", "stl", "blk", "tov", "pf", "pts", "plus_minus",
+]
+
+
+def make_wide_games(n_rows, seed=42):
+    """Genera una tabla con las mismas columnas que game.csv (un partido por fila)"""
+    rng = np.random.default_rng(seed)
+    data = {
+        "season_id": rng.integers(21996, 22023, n_rows),
+        "game_id": np.arange(29600001, 29600001 + n_rows),
+        "game_date": pd.Timestamp("1996-11-01") + pd.to_timedelta(rng.integers(0, 10_000, n_rows), unit="D"),
+        "min": rng.choice([240, 265, 290], n_rows),
+        "season_type": rng.choice(["Regular Season", "Playoffs"], n_rows),
+    }
+    for side in ("home", "away"):
+        data[f"team_id_{side}"] = rng.integers(1610612737, 1610612767, n_rows)
+        data[f"team_abbreviation_{side}"] = rng.choice(["ATL", "BOS", "LAL", "MIA"], n_rows)
+        data[f"team_name_{side}"] = rng.choice(["Atlanta Hawks", "Boston Celtics", "Los Angeles Lakers"], n_rows)
+        data[f"matchup_{side}"] = rng.choice(["ATL vs. BOS", "BOS @ ATL"], n_rows)
+        data[f"wl_{side}"] = rng.choice(["W", "L"], n_rows)
+        for col in GAME_STAT_COLS:
+            values = rng.random(n_rows) if col.endswith("_pct") else rng.integers(0, 120, n_rows)
+            data[f"{col}_{side}"] = values
+        data[f"video_available_{side}"] = rng.integers(0, 2, n_rows)
+    return pd.DataFrame(data)
+
+
+def unpivot_copy_concat(df_game):
+    """Versión anterior: copia df_home / df_away, renombra y concatena"""
+    cols_home = [col for col in df_game.columns if '_home' in col]
+    cols_away = [col for col in df_game.columns if '_away' in col]
+
+    df_home = df_game[GAME_COMMON_COLS + cols_home].copy()
+    df_away = df_game[GAME_COMMON_COLS + cols_away].copy()
+
+    df_home.columns = GAME_COMMON_COLS + [col.replace('_home', '') for col in cols_home]
+    df_away.columns = GAME_COMMON_COLS + [col.replace('_away', '') for col in cols_away]
+
+    df_home['team_side'] = 'home'
+    df_away['team_side'] = 'away'
+
+    return pd.concat([df_home, df_away], ignore_index=True)
+
+
+def measure(func, *args):
+    """Ejecuta func y devuelve (resultado, segundos, pico de memoria en MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def bench_unpivot(scale=10):
+    """Compara la transformación home/away anterior con unpivot_home_away"""
+    df_game = make_wide_games(GAME_ROWS * scale)
+    rows = []
+    for name, func in [("copy + concat", unpivot_copy_concat),
+                       ("unpivot_home_away", lambda df: unpivot_home_away(df, GAME_COMMON_COLS))]:
+        result, elapsed, peak_mb = measure(func, df_game)
+        rows.append({
+            "método": name,
+            "filas_entrada": len(df_game),
+            "filas_salida": len(result),
+            "tiempo_s": elapsed,
+            "pico_memoria_mb": peak_mb,
+            "memoria_salida_mb": result.memory_usage(deep=False).sum() / 1e6,
+        })
+    return pd.DataFrame(rows)
+
+
+def bench_dtypes(csv_dir):
+    """
+    Reporte de memoria por tabla: tipos inferidos por pandas vs DTYPE_PLAN
+
+    Busca en csv_dir los CSV crudos (player.csv, team.csv, game.csv, ...) y
+    mide cada uno con etl_io.compare_memory; los que no estén se omiten.
+    """
+    csv_dir = Path(csv_dir)
+    rows = [compare_memory(csv_dir / f"{table}.csv", table)
+            for table in ("player", "team", "game", "line_score", "other_stats", "all_seasons")
+            if (csv_dir / f"{table}.csv").exists()]
+    return pd.DataFrame(rows)
+
+
+# ============================================
+# VARA Y RESUMEN (etl_scoring.py)
+# ============================================
+def vara_lambda(df, vara=VARA):
+    """Versión anterior: np.nanpercentile en una lambda por equipo-temporada"""
+    df = df.copy()
+    df["vara"] = df.groupby(["team_abbreviation", "season_year"])["global_score"].transform(
+        lambda x: np.nanpercentile(x, vara * 100)
+    )
+    df["rendimiento"] = np.where(df["global_score"] < df["vara"], "Malo", "Bueno")
+    return df
+
+
+def resumen_lambda(df):
+    """Versión anterior: cuenta los 'Malo' con una lambda por grupo"""
+    return df.groupby(["team_abbreviation", "season_year"]).agg(
+        n_players=("player_name", "count"),
+        n_malos=("rendimiento", lambda s: (s == "Malo").sum()),
+        vara_value=("vara", "first"),
+    ).reset_index()
+
+
+def bench_vara(scale=100, seed=42):
+    """
+    Compara vara + resumen con lambdas contra la versión vectorizada de
+    etl_scoring sobre un all_seasons sintético de scale veces las filas reales
+    """
+    rng = np.random.default_rng(seed)
+    names = make_players(BASE_ROWS["player"], rng)["full_name"].dropna().to_numpy()
+    df_all_seasons = make_all_seasons(int(BASE_ROWS["all_seasons"] * scale), rng, names)
+    df_scores = add_scores(filter_period(df_all_seasons))
+
+    rows, results = [], {}
+    for name, vara_func, resumen_func in [("lambda por grupo", vara_lambda, resumen_lambda),
+                                          ("etl_scoring", add_vara, build_resumen)]:
+        start = time.perf_counter()
+        scored = vara_func(df_scores)
+        resumen = resumen_func(scored)
+        elapsed = time.perf_counter() - start
+        results[name] = (scored, resumen)
+        rows.append({
+            "método": name,
+            "filas": len(scored),
+            "equipos_temporada": len(resumen),
+            "tiempo_s": elapsed,
+        })
+
+    (old, old_resumen), (new, new_resumen) = results.values()
+    iguales = (old["vara"].equals(new["vara"])
+               and (old["rendimiento"] == new["rendimiento"].astype(str)).all()
+               and old_resumen.equals(new_resumen))
+    return pd.DataFrame(rows).assign(mismo_resultado=iguales)
+
+
+# ============================================
+# ETL COMPLETO SOBRE DATOS SINTÉTICOS
+# ============================================
+def _run_etl_tables(data_dir, run_id):
+    """
+    Corre las tareas de etl_project.py sobre los CSV de data_dir
+
+    Cada tabla se ejecuta en un proceso nuevo (spawn), así el pico de memoria
+    medido es el de esa tabla sola. Las mediciones van al log de la carpeta
+    (etl_metrics) con el run_id indicado.
+    """
+    paths = dataset_paths(data_dir)
+    os.environ.update({
+        "ETL_CSV_DIR": str(paths["csv_dir"]),
+        "ETL_ALL_SEASONS_CSV": str(paths["all_seasons"]),
+        "ETL_OUTPUT_DIR": str(Path(data_dir) / "cleaned"),
+        "ETL_RUN_LOG": str(Path(data_dir) / "etl_runs.jsonl"),
+        "ETL_RUN_ID": run_id,
+    })
+    (Path(data_dir) / "cleaned").mkdir(exist_ok=True)
+    # Relee las rutas de entrada/salida de las variables de entorno
+    import etl_project
+    etl_project = importlib.reload(etl_project)
+
+    results = {}
+    for task in etl_project.TASKS:
+        kwargs = {dep: results[dep] for dep in task.deps}
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results[task.name] = pool.submit(task.func, **kwargs).result()
+
+
+def bench_synthetic(scale, root="data/synthetic", seed=42):
+    """
+    Throughput y pico de memoria por tabla del ETL local sobre datos sintéticos
+
+    Genera los CSV en <root>/x<escala> si todavía no existen (synthetic_data.py)
+    y corre las tareas de etl_project.py sin Kaggle ni credenciales.
+
+    Returns:
+        DataFrame por tabla: filas leídas y escritas, MB leídos, segundos,
+        filas/s, MB/s, pico de RSS del proceso y la mayor memoria extra que
+        pidió una de sus etapas. Las tablas derivadas (team_season,
+        game_advanced) no tienen etapa read: sus filas leídas son las de
+        entrada de su primera etapa y no tienen MB leídos.
+    """
+    data_dir = Path(root) / f"x{scale:g}"
+    if not dataset_paths(data_dir)["game"].exists():
+        print(f"🧪 Generando datos sintéticos x{scale:g} en {data_dir}")
+        generate(data_dir, scale, seed)
+
+    run_id = f"{datetime.now():%Y%m%dT%H%M%S}-x{scale:g}"
+    _run_etl_tables(data_dir, run_id)
+
+    log = read_run_log(Path(data_dir) / "etl_runs.jsonl")
+    rows = []
+    order = {name: i for i, name in enumerate(STAGES)}
+    for table, run in log[log["run_id"] == run_id].groupby("table", sort=False):
+        run = run.assign(orden=run["stage"].map(order)).sort_values(["orden", "started_at"])
+        first, last = run.iloc[0], run.iloc[-1]
+        segundos = run["wall_s"].sum()
+        # read no tiene filas de entrada: se leen sus filas de salida
+        filas = first["rows_out"] if first["stage"] == "read" else first["rows_in"]
+        mb = first["bytes"] / 1e6 if first["stage"] == "read" else float("nan")
+        rows.append({
+            "escala": f"x{scale:g}",
+            "tabla": table,
+            "filas_leídas": int(filas),
+            "filas_escritas": int(last["rows_in"] if last["stage"] == "save" else last["rows_out"]),
+            "mb_leídos": mb,
+            "segundos": segundos,
+            "filas_s": filas / segundos if segundos else float("nan"),
+            "mb_s": mb / segundos if segundos else float("nan"),
+            "pico_rss_mb": run["rss_peak_mb"].max(),
+            "rss_extra_mb": run["rss_peak_delta_mb"].max(),
+        })
+    return pd.DataFrame(rows), run_id
+
+
+def report_synthetic(scales, root="data/synthetic"):
+    """Corre bench_synthetic por escala, imprime el resumen y lo agrega al historial"""
+    resumen = []
+    for scale in scales:
+        print(f"🏀 ETL local sobre datos sintéticos x{scale:g}")
+        tablas, run_id = bench_synthetic(scale, root)
+        print_run_summary(run_id, Path(root) / f"x{scale:g}" / "etl_runs.jsonl")
+        print()
+        resumen.append(tablas)
+    resumen = pd.concat(resumen, ignore_index=True)
+
+    # Historial de corridas: una fila por escala y tabla
+    historial = Path(root) / "benchmark_results.csv"
+    resumen.assign(fecha=datetime.now().isoformat(timespec="seconds")).to_csv(
+        historial, mode="a", header=not historial.exists(), index=False
+    )
+    print("📊 Throughput y memoria por tabla")
+    print(resumen.to_string(index=False, float_format="%.2f"))
+    print(f"\n📝 Historial: {historial}")
+    return resumen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks del ETL NBA")
+    parser.add_argument("--scale", type=int, default=10, help="múltiplo de las filas de game.csv")
+    parser.add_argument("--dtypes", metavar="DIR",
+                        help="carpeta con los CSV crudos para el reporte de memoria por tabla")
+    parser.add_argument("--vara", type=float, nargs="?", const=100, metavar="ESCALA",
+                        help="compara vara y resumen con lambdas vs vectorizados (por defecto 100x all_seasons)")
+    parser.add_argument("--synthetic", type=float, nargs="+", metavar="ESCALA",
+                        help="corre el ETL local sobre datos sintéticos de esas escalas (ej: 1 10 100)")
+    parser.add_argument("--synthetic-dir", default="data/synthetic",
+                        help="carpeta de los datos sintéticos (una subcarpeta x<escala> por escala)")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        report_synthetic(args.synthetic, args.synthetic_dir)
+    elif args.vara:
+        print(f"📊 Vara y resumen sobre all_seasons sintético x{args.vara:g}")
+        print(bench_vara(args.vara).to_string(index=False, float_format="%.3f"))
+    else:
+        if args.dtypes:
+            print(f"📊 Memoria por tabla con el plan de tipos ({args.dtypes})")
+            print(bench_dtypes(args.dtypes).to_string(index=False, float_format="%.2f"))
+            print()
+
+        print(f"📊 Unpivot home/away sobre {GAME_ROWS * args.scale:,} partidos")
+        print(bench_unpivot(args.scale).to_string(index=False, float_format="%.3f"))
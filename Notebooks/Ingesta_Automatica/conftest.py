@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from etl_gcs import LocalBucket
+from etl_io import apply_dtype_plan
+
+# ============================================
+# DATOS DE PRUEBA COMPARTIDOS
+# ============================================
+# Tablas chicas con el plan de tipos de etl_schemas.py: game tiene contadores
+# con nulos (Int16), porcentajes float32, fechas y una columna extra sin
+# esquema, para cubrir todas las conversiones de la subida y la carga.
+
+
+def make_game(n_games, first=0):
+    """Tabla game limpia (una fila por equipo) con n_games partidos desde el id first"""
+    rows = []
+    for i in range(first, first + n_games):
+        for side, team_id, abbreviation in (("home", 1610612737, "ATL"), ("away", 1610612738, "BOS")):
+            rows.append({
+                "season_id": 22023,
+                "game_id": f"00223{i:05d}",
+                "game_date": pd.Timestamp("2023-10-24") + pd.Timedelta(days=i),
+                "season_type": "Regular Season",
+                "team_id": team_id,
+                "team_abbreviation": abbreviation,
+                "team_side": side,
+                "wl": "W" if side == "home" else "L",
+                "min": 240 if i % 3 else None,
+                "pts": 100 + i % 17,
+                "fg_pct": 0.487 if side == "home" else 0.43,
+                "fuente": "prueba",
+            })
+    return apply_dtype_plan(pd.DataFrame(rows), "game")
+
+
+@pytest.fixture
+def game():
+    return make_game(12)
+
+
+@pytest.fixture
+def bucket(tmp_path):
+    return LocalBucket(tmp_path / "bucket")
@@ -0,0 +1,184 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from etl_scoring import ATRIBUTOS, SCORE_COLUMNS, OUTPUT_DIR, PUNTAJE_CSV, season_to_int
+
+# ============================================
+# ÍNDICE DE CARRERAS POR JUGADOR
+# ============================================
+# La tabla de puntajes (o all_seasons) se ordena una vez por jugador y
+# temporada: las filas de cada jugador quedan contiguas y alcanza con guardar
+# dónde empieza y termina cada uno. Ver la carrera de un jugador es un slice
+# (sin recorrer la tabla con groupby o un filtro por nombre).
+#
+# Por cada métrica (los nueve atributos, sus *_score y global_score) se
+# precalcula, dentro de la carrera de cada jugador:
+#   - <métrica>_roll3: promedio de las últimas 3 temporadas (incluida la actual)
+#   - <métrica>_delta: diferencia contra la temporada anterior
+#   - pico: temporada y valor máximo de cada métrica (tabla aparte)
+#
+# Igual que los groupby('player_name') de los notebooks, dos jugadores con el
+# mismo nombre comparten carrera.
+CAREER_DIR = Path("data/career")
+CAREER_FILE = "career.parquet"
+PEAKS_FILE = "career_peaks.parquet"
+
+ROLLING_WINDOW = 3
+
+
+def career_metrics(df):
+    """Métricas presentes en la tabla: atributos, *_score y global_score"""
+    return [col for col in ATRIBUTOS + SCORE_COLUMNS + ["global_score"] if col in df.columns]
+
+
+def _rolling_mean(values, position, window=ROLLING_WINDOW):
+    """Promedio de las últimas `window` filas del mismo jugador, ignorando nulos"""
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    total, count = filled.copy(), present.astype(np.int64)
+    for lag in range(1, window):
+        same_player = position >= lag
+        total[lag:] += np.where(same_player[lag:], filled[:-lag], 0.0)
+        count[lag:] += np.where(same_player[lag:], present[:-lag], 0)
+    with np.errstate(invalid="ignore"):
+        return total / count
+
+
+def build_career_table(df, metrics=None):
+    """
+    Tabla ordenada por jugador y temporada con promedios móviles y variaciones
+
+    Las filas sin player_name quedan fuera; si falta season_year se calcula
+    a partir de season.
+
+    Returns:
+        DataFrame con las columnas de df más <métrica>_roll3 y <métrica>_delta
+    """
+    metrics = metrics or career_metrics(df)
+    if "season_year" not in df.columns:
+        df = df.assign(season_year=season_to_int(df["season"]))
+    table = (df.dropna(subset=["player_name"])
+               .sort_values(["player_name", "season_year"], kind="stable")
+               .reset_index(drop=True))
+    starts, _ = _career_bounds(table["player_name"])
+    sizes = np.diff(np.append(starts, len(table)))
+    position = np.arange(len(table)) - np.repeat(starts, sizes)
+
+    derived = {}
+    for metric in metrics:
+        values = table[metric].to_numpy(np.float64)
+        derived[f"{metric}_roll{ROLLING_WINDOW}"] = _rolling_mean(values, position)
+        previous = np.concatenate([[np.nan], values[:-1]])
+        derived[f"{metric}_delta"] = np.where(position >= 1, values - previous, np.nan)
+    return pd.concat([table, pd.DataFrame(derived)], axis=1)
+
+
+def _career_bounds(names):
+    """Inicio de cada jugador en una serie de nombres ya ordenada, y los nombres"""
+    codes, players = pd.factorize(names, sort=False)
+    starts = np.flatnonzero(np.diff(codes, prepend=-2))
+    return starts, np.asarray(players, dtype=object)
+
+
+def career_peaks(table, metrics=None):
+    """
+    Temporada pico de cada jugador en cada métrica (la primera si hay empate)
+
+    Returns:
+        DataFrame con una fila por jugador: temporadas, y por métrica
+        <métrica>_peak (valor) y <métrica>_peak_season
+    """
+    metrics = metrics or career_metrics(table)
+    starts, players = _career_bounds(table["player_name"])
+    sizes = np.diff(np.append(starts, len(table)))
+    group = np.repeat(np.arange(len(starts)), sizes)
+    seasons = table["season"].astype(str).to_numpy(dtype=object)
+
+    peaks = {"player_name": players, "temporadas": sizes}
+    for metric in metrics:
+        values = table[metric].to_numpy(np.float64)
+        ranked = np.where(np.isnan(values), -np.inf, values)
+        best = np.maximum.reduceat(ranked, starts)
+        # Primera fila de cada jugador que alcanza su máximo
+        hits = np.flatnonzero(ranked == best[group])
+        first_group, first_hit = np.unique(group[hits], return_index=True)
+        peak_row = np.full(len(starts), -1)
+        peak_row[first_group] = hits[first_hit]
+        has_peak = np.isfinite(best)
+        peaks[f"{metric}_peak"] = np.where(has_peak, best, np.nan)
+        peaks[f"{metric}_peak_season"] = np.where(has_peak, seasons[peak_row], None)
+    return pd.DataFrame(peaks)
+
+
+class CareerIndex:
+    """Carreras contiguas por jugador con acceso directo por nombre"""
+
+    def __init__(self, table, peaks):
+        self.table = table
+        self.peaks = peaks
+        starts, players = _career_bounds(table["player_name"])
+        ends = np.append(starts[1:], len(table))
+        self.offsets = {name: (int(s), int(e)) for name, s, e in zip(players, starts, ends)}
+        self._peak_rows = {name: i for i, name in enumerate(peaks["player_name"])}
+
+    @classmethod
+    def build(cls, df, metrics=None):
+        """Construye el índice a partir de la tabla de puntajes o de all_seasons"""
+        metrics = metrics or career_metrics(df)
+        table = build_career_table(df, metrics)
+        return cls(table, career_peaks(table, metrics))
+
+    @classmethod
+    def load(cls, directory=CAREER_DIR):
+        """Lee un índice guardado con save"""
+        directory = Path(directory)
+        return cls(pd.read_parquet(directory / CAREER_FILE), pd.read_parquet(directory / PEAKS_FILE))
+
+    def save(self, directory=CAREER_DIR):
+        """Guarda la tabla de carreras y la de picos en Parquet"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.table.to_parquet(directory / CAREER_FILE, index=False)
+        self.peaks.to_parquet(directory / PEAKS_FILE, index=False)
+
+    @property
+    def players(self):
+        return list(self.offsets)
+
+    def career(self, player_name):
+        """Temporadas del jugador en orden (slice de la tabla); vacío si no está"""
+        start, end = self.offsets.get(player_name, (0, 0))
+        return self.table.iloc[start:end]
+
+    def peak(self, player_name):
+        """Fila de picos del jugador (Series), o None si no está"""
+        row = self._peak_rows.get(player_name)
+        return None if row is None else self.peaks.iloc[row]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice de carreras por jugador")
+    parser.add_argument("--input", default=str(OUTPUT_DIR / PUNTAJE_CSV),
+                        help="tabla de puntajes (nba_puntaje_vara.csv) o all_seasons")
+    parser.add_argument("--out", default=str(CAREER_DIR), help="carpeta de career.parquet y career_peaks.parquet")
+    parser.add_argument("--player", help="muestra la carrera de este jugador")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = CareerIndex.build(pd.read_csv(args.input))
+    index.save(args.out)
+    print(f"✅ Índice de {len(index.offsets):,} jugadores ({len(index.table):,} temporadas) "
+          f"en {time.perf_counter() - start:.2f} s: {args.out}")
+
+    if args.player:
+        cols = ["season", "team_abbreviation", "global_score",
+                f"global_score_roll{ROLLING_WINDOW}", "global_score_delta"]
+        career = index.career(args.player)
+        print(career[[c for c in cols if c in career.columns]].to_string(index=False))
+        peak = index.peak(args.player)
+        if peak is not None and "global_score_peak_season" in peak:
+            print(f"🏔️ Pico de global_score: {peak['global_score_peak_season']} ({peak['global_score_peak']:.3f})")
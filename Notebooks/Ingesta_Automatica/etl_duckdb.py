@@ -0,0 +1,206 @@
+import argparse
+import os
+import time
+from pathlib import Path
+
+import duckdb
+
+from etl_io import cleaned_parquet_files
+from etl_schemas import SCHEMAS, BQ_TABLES
+from etl_scoring import OUTPUT_DIR, PUNTAJE_CSV, RESUMEN_CSV
+
+# ============================================
+# ALMACÉN LOCAL DUCKDB
+# ============================================
+# Las tablas limpias (<tabla>_cleaned.parquet con sus incrementos
+# <tabla>_cleaned_<run_id>.parquet, o el .csv, de ETL_OUTPUT_DIR) se cargan
+# en un único archivo DuckDB con los mismos nombres y tipos que en BigQuery
+# (BQ_TABLES y SCHEMAS, de donde salen los schema_*). Las consultas
+# corren en local, sin red ni credenciales, y las mismas SQL sirven para
+# BigQuery cambiando solo el prefijo del dataset.
+#
+# ETL_DUCKDB_PATH: archivo del almacén (por defecto data/nba.duckdb)
+DUCKDB_PATH = Path(os.getenv("ETL_DUCKDB_PATH", "data/nba.duckdb"))
+CLEANED_DIR = Path(os.getenv("ETL_OUTPUT_DIR", "data/smart_decisions_nba"))
+
+DUCKDB_TYPES = {
+    "INTEGER": "BIGINT",
+    "FLOAT": "DOUBLE",
+    "STRING": "VARCHAR",
+    "BOOLEAN": "BOOLEAN",
+    "DATE": "DATE",
+}
+
+# Salidas de etl_scoring.py que también usa la app (tipos detectados del CSV)
+SCORE_TABLES = {
+    "puntaje": PUNTAJE_CSV,
+    "resumen": RESUMEN_CSV,
+}
+
+# Vistas de los cruces habituales; se crean si existen todas sus tablas
+VIEWS = {
+    "games_teams": (("games", "teams"), """
+        SELECT g.*, t.nickname, t.city, t.state, t.year_founded
+        FROM games g
+        LEFT JOIN teams t ON g.team_id = t.team_id
+    """),
+    "all_seasons_teams": (("all_seasons", "teams"), """
+        SELECT a.*, t.nickname, t.city, t.state, t.year_founded
+        FROM all_seasons a
+        LEFT JOIN teams t ON a.team_id = t.team_id
+    """),
+    "games_line_score": (("games", "line_score"), """
+        SELECT g.*,
+               l.pts_qtr1, l.pts_qtr2, l.pts_qtr3, l.pts_qtr4,
+               l.pts_ot1, l.pts_ot2, l.pts_ot3, l.pts_ot4, l.team_wins_losses
+        FROM games g
+        JOIN line_score l ON g.game_id = l.game_id AND g.team_id = l.team_id
+    """),
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _cast_text(col, duck_type):
+    """Expresión que convierte una columna leída como texto (CSV) al tipo del esquema"""
+    if duck_type == "BIGINT":
+        # Los contadores con nulos se escriben como "41.0"
+        return f"TRY_CAST(TRY_CAST({col} AS DOUBLE) AS BIGINT)"
+    if duck_type == "DATE":
+        return f"TRY_CAST(TRY_CAST({col} AS TIMESTAMP) AS DATE)"
+    if duck_type == "BOOLEAN":
+        return f"COALESCE(TRY_CAST({col} AS BOOLEAN), TRY_CAST({col} AS DOUBLE) <> 0)"
+    if duck_type == "VARCHAR":
+        return col
+    return f"TRY_CAST({col} AS {duck_type})"
+
+
+def find_cleaned(cleaned_dir, table):
+    """
+    Archivos de una tabla limpia: <tabla>_cleaned.parquet y sus incrementos
+    (ya tipados) si existen; si no, el .csv; lista vacía si no hay ninguno
+    """
+    files = cleaned_parquet_files(cleaned_dir, table)
+    if files:
+        return files
+    path = Path(cleaned_dir) / f"{table}_cleaned.csv"
+    return [path] if path.exists() else []
+
+
+def _source_sql(paths):
+    paths = [str(p).replace("'", "''") for p in paths]
+    if paths[0].endswith(".parquet"):
+        # Base e incrementos como una sola tabla (columnas extra unidas por nombre)
+        files = ", ".join(f"'{p}'" for p in paths)
+        return f"read_parquet([{files}], union_by_name = true)"
+    # Todo como texto: los ids como game_id conservan los ceros a la izquierda
+    return f"read_csv('{paths[0]}', header = true, all_varchar = true)"
+
+
+def table_select(con, paths, table):
+    """
+    SELECT que lee los archivos limpios de una tabla con las columnas y tipos de SCHEMAS[table]
+
+    Las columnas del esquema que falten en el archivo quedan en NULL; las
+    columnas extra se conservan al final, como en etl_io.to_arrow_table.
+    """
+    source = _source_sql(paths)
+    columns = [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()]
+    from_csv = str(paths[0]).endswith(".csv")
+    declared = set()
+    exprs = []
+    for name, field_type, _ in SCHEMAS[table]:
+        duck_type = DUCKDB_TYPES[field_type]
+        declared.add(name)
+        if name not in columns:
+            exprs.append(f"CAST(NULL AS {duck_type}) AS {_quote(name)}")
+        elif from_csv:
+            exprs.append(f"{_cast_text(_quote(name), duck_type)} AS {_quote(name)}")
+        else:
+            exprs.append(f"CAST({_quote(name)} AS {duck_type}) AS {_quote(name)}")
+    exprs += [_quote(name) for name in columns if name not in declared]
+    return f"SELECT {', '.join(exprs)} FROM {source}"
+
+
+def build_store(cleaned_dir=CLEANED_DIR, db_path=DUCKDB_PATH, scores_dir=OUTPUT_DIR):
+    """
+    Construye el archivo DuckDB con las tablas limpias, los puntajes y las vistas
+
+    Se escribe en un archivo temporal y se reemplaza al final: quien esté
+    leyendo el almacén anterior no ve una base a medio construir.
+
+    Args:
+        cleaned_dir: carpeta con <tabla>_cleaned.parquet (más sus incrementos) / .csv
+        db_path: archivo DuckDB de salida
+        scores_dir: carpeta de nba_puntaje_vara.csv y resumen.csv (None = no cargarlos)
+
+    Returns:
+        dict {tabla: filas} de las tablas cargadas
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    loaded = {}
+    with duckdb.connect(str(tmp_path)) as con:
+        for table in SCHEMAS:
+            paths = find_cleaned(cleaned_dir, table)
+            if not paths:
+                print(f"⚠️ Sin {table}_cleaned.parquet/.csv en {cleaned_dir}")
+                continue
+            name = BQ_TABLES[table]
+            con.execute(f"CREATE TABLE {name} AS {table_select(con, paths, table)}")
+            loaded[name] = con.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+
+        for name, fname in SCORE_TABLES.items():
+            path = Path(scores_dir) / fname if scores_dir else None
+            if path is None or not path.exists():
+                continue
+            source = str(path).replace("'", "''")
+            con.execute(f"CREATE TABLE {name} AS SELECT * FROM read_csv('{source}', header = true)")
+            loaded[name] = con.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+
+        for view, (tables, sql) in VIEWS.items():
+            if all(t in loaded for t in tables):
+                con.execute(f"CREATE VIEW {view} AS {sql}")
+        con.execute("CHECKPOINT")
+
+    os.replace(tmp_path, db_path)
+    return loaded
+
+
+def connect(db_path=DUCKDB_PATH):
+    """Conexión de solo lectura al almacén (varios procesos pueden leer a la vez)"""
+    return duckdb.connect(str(db_path), read_only=True)
+
+
+def query(sql, db_path=DUCKDB_PATH, params=None):
+    """Ejecuta una consulta sobre el almacén y devuelve un DataFrame"""
+    with connect(db_path) as con:
+        return con.execute(sql, params or []).df()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Almacén DuckDB local con las tablas limpias")
+    parser.add_argument("--build", action="store_true", help="(re)construye el almacén")
+    parser.add_argument("--cleaned-dir", default=str(CLEANED_DIR), help="carpeta de <tabla>_cleaned.*")
+    parser.add_argument("--scores-dir", default=str(OUTPUT_DIR), help="carpeta de nba_puntaje_vara.csv y resumen.csv")
+    parser.add_argument("--db", default=str(DUCKDB_PATH), help="archivo DuckDB")
+    parser.add_argument("--query", help="consulta SQL a ejecutar")
+    args = parser.parse_args()
+
+    if args.build or not Path(args.db).exists():
+        start = time.perf_counter()
+        loaded = build_store(args.cleaned_dir, args.db, args.scores_dir)
+        print(f"✅ Almacén {args.db} en {time.perf_counter() - start:.2f} s")
+        for name, rows in loaded.items():
+            print(f"   {name}: {rows:,} filas")
+
+    if args.query:
+        start = time.perf_counter()
+        result = query(args.query, args.db)
+        print(result.to_string(index=False, max_rows=50))
+        print(f"⏱️ {len(result):,} filas en {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,340 @@
+import gzip
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+from etl_io import to_arrow_table, PARQUET_COMPRESSION
+from etl_schemas import SCHEMAS
+
+# ============================================
+# SUBIDA A GCS + CARGA DESDE GCS
+# ============================================
+# Cada tabla se serializa una sola vez, por chunks, directo a una subida
+# resumible de GCS; BigQuery carga ese mismo objeto desde su URI gs:// con el
+# esquema explícito de etl_schemas.py (sin autodetect ni copias en memoria).
+#
+# Las funciones reciben el bucket y el cliente de BigQuery como argumentos,
+# así pueden probarse con LocalBucket (más abajo) y un stub de BigQuery que
+# implemente load_table_from_uri().result().
+#
+# GCS_GZIP: "1" (por defecto) sube los CSV comprimidos con gzip
+# GCS_CHUNK_MB: tamaño de cada chunk de la subida resumible (múltiplo de 256 KB)
+# GCS_ROWS_PER_CHUNK: filas serializadas por vez (y por row group en Parquet)
+# GCS_UPLOAD_TIMEOUT: segundos máximos de reintentos por chunk
+GZIP_CSV = os.getenv("GCS_GZIP", "1") == "1"
+CHUNK_MB = int(os.getenv("GCS_CHUNK_MB", "8"))
+ROWS_PER_CHUNK = int(os.getenv("GCS_ROWS_PER_CHUNK", "50000"))
+UPLOAD_TIMEOUT = float(os.getenv("GCS_UPLOAD_TIMEOUT", "300"))
+
+CONTENT_TYPES = {
+    "parquet": "application/octet-stream",
+    "csv": "text/csv",
+}
+
+# Valores de bigquery.SourceFormat
+SOURCE_FORMATS = {
+    "parquet": "PARQUET",
+    "csv": "CSV",
+}
+
+
+def load_format(formats):
+    """Formato del objeto que se carga a BigQuery: Parquet si se genera, si no CSV"""
+    return "parquet" if "parquet" in formats else "csv"
+
+
+def schema_for(schema, dataframe):
+    """Campos del esquema presentes en el DataFrame, en el orden del esquema"""
+    return [field for field in schema if field.name in dataframe.columns]
+
+
+def _csv_ready(dataframe, table):
+    """
+    Prepara una tabla para CSV: columnas en el orden del esquema y enteros sin '.0'
+
+    BigQuery asigna las columnas de un CSV por posición, así que las declaradas
+    van primero en el orden de SCHEMAS y las extra al final (se ignoran en la
+    carga). Las columnas INTEGER guardadas como float pasan a Int64; solo se
+    reemplazan esas columnas (assign), sin copiar la tabla completa.
+    """
+    declared = [name for name, _, _ in SCHEMAS[table] if name in dataframe.columns]
+    extra = [name for name in dataframe.columns if name not in declared]
+    int_cols = {
+        name: dataframe[name].astype("Int64")
+        for name, field_type, _ in SCHEMAS[table]
+        if field_type == "INTEGER" and name in dataframe.columns
+        and dataframe[name].dtype.kind == "f"
+    }
+    if int_cols:
+        dataframe = dataframe.assign(**int_cols)
+    return dataframe[declared + extra]
+
+
+# ============================================
+# SUBIDA POR STREAMING (RESUMIBLE)
+# ============================================
+class _CountingWriter:
+    """Envoltorio de escritura que cuenta los bytes enviados al objeto"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes = 0
+        self.closed = False
+
+    def write(self, data):
+        self.bytes += len(data)
+        self.raw.write(data)
+        return len(data)
+
+    def tell(self):
+        return self.bytes
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        # La subida solo se confirma al cerrar; no se fuerza un chunk parcial
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def _upload_retry():
+    """Reintento por chunk de la subida resumible (None si no hay cliente de GCS)"""
+    try:
+        from google.cloud.storage.retry import DEFAULT_RETRY
+    except ImportError:
+        return None
+    return DEFAULT_RETRY.with_deadline(UPLOAD_TIMEOUT)
+
+
+def upload_stream(bucket, blob_name, dataframe, table, fmt, header=True, compress=None,
+                  rows_per_chunk=None):
+    """
+    Sube una tabla a GCS serializándola por chunks en una subida resumible
+
+    La tabla nunca se materializa completa como CSV/Parquet en memoria: cada
+    bloque de filas se serializa y se escribe en el objeto, que se envía en
+    chunks de GCS_CHUNK_MB. Si un chunk falla se reintenta solo ese chunk y
+    la sesión continúa desde el último byte confirmado. Si la subida se
+    interrumpe, el objeto anterior queda intacto.
+
+    Args:
+        bucket: bucket de GCS (o LocalBucket)
+        blob_name: ruta del objeto (ej: 'nba_data/cleaned/game_cleaned.csv')
+        dataframe: DataFrame de pandas
+        table: nombre de la tabla en SCHEMAS
+        fmt: 'parquet' (tipado con el esquema) o 'csv'
+        header: escribir encabezado (solo CSV)
+        compress: comprimir el CSV con gzip (por defecto GCS_GZIP)
+        rows_per_chunk: filas por bloque (por defecto GCS_ROWS_PER_CHUNK)
+
+    Returns:
+        dict con filas, bytes sin comprimir, bytes enviados, segundos y MB/s
+    """
+    rows_per_chunk = rows_per_chunk or ROWS_PER_CHUNK
+    gzip_csv = fmt == "csv" and (GZIP_CSV if compress is None else compress)
+    start = time.perf_counter()
+
+    blob = bucket.blob(blob_name)
+    if gzip_csv:
+        # GCS descomprime al descargar (transcoding) y BigQuery lee gzip directo
+        blob.content_encoding = "gzip"
+    raw = blob.open("wb", chunk_size=CHUNK_MB * 1024 * 1024, content_type=CONTENT_TYPES[fmt],
+                    retry=_upload_retry())
+    sent = _CountingWriter(raw)
+
+    if fmt == "parquet":
+        # Un row group por bloque: solo un bloque a la vez se convierte a Arrow
+        compression = None if PARQUET_COMPRESSION == "none" else PARQUET_COMPRESSION
+        writer = None
+        for first in range(0, max(len(dataframe), 1), rows_per_chunk):
+            chunk = to_arrow_table(dataframe.iloc[first:first + rows_per_chunk], table)
+            if writer is None:
+                writer = pq.ParquetWriter(sent, chunk.schema, compression=compression)
+            else:
+                # Las columnas extra (sin esquema) conservan el tipo del primer bloque
+                chunk = chunk.cast(writer.schema)
+            writer.write_table(chunk, row_group_size=rows_per_chunk)
+        writer.close()
+        raw_bytes = sent.bytes
+    else:
+        out = gzip.GzipFile(fileobj=sent, mode="wb", compresslevel=6, mtime=0) if gzip_csv else sent
+        frame = _csv_ready(dataframe, table)
+        raw_bytes = 0
+        for first in range(0, max(len(frame), 1), rows_per_chunk):
+            data = frame.iloc[first:first + rows_per_chunk].to_csv(
+                index=False, header=header and first == 0
+            ).encode("utf-8")
+            raw_bytes += len(data)
+            out.write(data)
+        if gzip_csv:
+            out.close()
+
+    # Cerrar confirma el objeto; ante un error antes de este punto no se crea
+    raw.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "blob": blob_name,
+        "rows": len(dataframe),
+        "bytes_raw": raw_bytes,
+        "bytes_sent": sent.bytes,
+        "seconds": elapsed,
+        "mb_s": sent.bytes / 1e6 / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def format_upload_stats(stats):
+    """Línea de resumen de una subida: tamaño, compresión y velocidad"""
+    ratio = stats["bytes_sent"] / stats["bytes_raw"] if stats["bytes_raw"] else 1.0
+    return (f"{stats['rows']:,} filas, {stats['bytes_sent'] / 1e6:.1f} MB enviados "
+            f"({ratio:.0%} de {stats['bytes_raw'] / 1e6:.1f} MB), "
+            f"{stats['seconds']:.1f} s, {stats['mb_s']:.1f} MB/s")
+
+
+# ============================================
+# BUCKET LOCAL (PRUEBAS Y CORRIDAS SIN GCP)
+# ============================================
+class LocalBlob:
+    """Objeto de LocalBucket guardado como archivo en disco"""
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_encoding = None
+        self.content_type = None
+
+    @property
+    def path(self):
+        return self.bucket.root / self.name
+
+    def exists(self):
+        return self.path.exists()
+
+    def open(self, mode="rb", **kwargs):
+        if mode == "rb":
+            return open(self.path, "rb")
+        # Se escribe en un temporal y se publica al cerrar, como la subida resumible
+        return _LocalWriter(self.bucket.root / ".uploads" / uuid.uuid4().hex, self.path)
+
+    def upload_from_file(self, file_obj, content_type=None, rewind=False):
+        if rewind:
+            file_obj.seek(0)
+        with self.open("wb") as f:
+            shutil.copyfileobj(file_obj, f)
+
+    def download_as_bytes(self):
+        return self.path.read_bytes()
+
+    def compose(self, sources):
+        data = b"".join(source.download_as_bytes() for source in sources)
+        with self.open("wb") as f:
+            f.write(data)
+
+    def delete(self):
+        self.path.unlink()
+
+
+class _LocalWriter:
+    def __init__(self, tmp_path, final_path):
+        tmp_path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp_path = tmp_path
+        self.final_path = final_path
+        self.file = open(tmp_path, "wb")
+
+    def write(self, data):
+        return self.file.write(data)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.close()
+        self.final_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.tmp_path, self.final_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LocalBucket:
+    """
+    Bucket de GCS respaldado por una carpeta local
+
+    Implementa lo que usa el ETL (blob, open, upload_from_file, compose,
+    delete, list_blobs). Se activa con GCS_BUCKET_NAME=file://<carpeta>.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.name = str(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def blob(self, name):
+        return LocalBlob(self, name)
+
+    def list_blobs(self, prefix=""):
+        return [self.blob(path.relative_to(self.root).as_posix())
+                for path in sorted(self.root.rglob("*"))
+                if path.is_file() and ".uploads" not in path.parts
+                and path.relative_to(self.root).as_posix().startswith(prefix)]
+
+
+def open_bucket(name):
+    """Bucket de GCS por nombre, o LocalBucket si el nombre es file://<carpeta>"""
+    if name and name.startswith("file://"):
+        return LocalBucket(name[len("file://"):])
+    from google.cloud import storage
+    return storage.Client().bucket(name)
+
+
+# ============================================
+# CARGA A BIGQUERY
+# ============================================
+def build_load_config(schema, fmt, write_disposition, header=True):
+    """Configuración de carga con esquema explícito (autodetect desactivado)"""
+    from google.cloud import bigquery
+
+    job_config = bigquery.LoadJobConfig(
+        schema=schema,
+        source_format=SOURCE_FORMATS[fmt],
+        write_disposition=write_disposition,
+        autodetect=False,
+    )
+    if fmt == "csv":
+        job_config.skip_leading_rows = 1 if header else 0
+        job_config.allow_quoted_newlines = True
+        # Columnas extra al final de cada fila (no declaradas en el esquema)
+        job_config.ignore_unknown_values = True
+    return job_config
+
+
+def load_from_gcs(bq_client, uri, table_id, schema, fmt, write_disposition, header=True):
+    """
+    Carga en BigQuery un objeto ya subido a GCS
+
+    Args:
+        bq_client: cliente de BigQuery
+        uri: gs://bucket/ruta del objeto
+        table_id: proyecto.dataset.tabla
+        schema: lista de SchemaField (schema_player, schema_game, ...) con
+            solo las columnas presentes en el objeto (ver schema_for)
+        fmt: formato del objeto ('parquet' o 'csv', comprimido o no)
+        write_disposition: WRITE_TRUNCATE o WRITE_APPEND
+        header: el CSV tiene encabezado (los incrementos CSV no lo tienen)
+
+    Returns:
+        el job de carga terminado
+    """
+    job = bq_client.load_table_from_uri(
+        uri, table_id, job_config=build_load_config(schema, fmt, write_disposition, header)
+    )
+    job.result()  # Esperar a que termine
+    return job
@@ -0,0 +1,384 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from etl_schemas import SCHEMAS, RAW_DTYPES, dtypes_for
+
+# ============================================
+# CONFIGURACIÓN DE SALIDA
+# ============================================
+# ETL_OUTPUT_FORMAT: "csv" (por defecto), "parquet" o "both"
+# PARQUET_COMPRESSION: "snappy" (por defecto), "zstd", "gzip", "brotli" o "none"
+OUTPUT_FORMAT = os.getenv("ETL_OUTPUT_FORMAT", "csv").lower()
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "snappy").lower()
+# ETL_CHUNKSIZE: filas por chunk al leer game.csv y line_score.csv
+CHUNKSIZE = int(os.getenv("ETL_CHUNKSIZE", "100000"))
+
+ARROW_TYPES = {
+    "INTEGER": pa.int64(),
+    "FLOAT": pa.float64(),
+    "STRING": pa.string(),
+    "BOOLEAN": pa.bool_(),
+    "DATE": pa.date32(),
+}
+
+
+def output_formats():
+    """Devuelve la lista de formatos a escribir según ETL_OUTPUT_FORMAT"""
+    if OUTPUT_FORMAT == "both":
+        return ["csv", "parquet"]
+    if OUTPUT_FORMAT not in ("csv", "parquet"):
+        raise ValueError(f"ETL_OUTPUT_FORMAT no soportado: {OUTPUT_FORMAT}")
+    return [OUTPUT_FORMAT]
+
+
+# ============================================
+# LECTURA CON EL PLAN DE TIPOS
+# ============================================
+def _parse_dtypes(dtypes, chunked=False):
+    """
+    dtypes para read_csv a partir del plan
+
+    Las fechas ("date") se leen como texto y se convierten después. Al leer por
+    chunks las categóricas también se leen como texto: cada chunk tendría sus
+    propias categorías y concatenarlos las volvería object.
+    """
+    texto = ("date", "category") if chunked else ("date",)
+    return {col: ("string[pyarrow]" if dtype in texto else dtype) for col, dtype in dtypes.items()}
+
+
+def apply_dtype_plan(dataframe, table):
+    """
+    Aplica DTYPE_PLAN a un DataFrame ya cargado (columna por columna)
+
+    Si una columna no se puede convertir (ej: un CSV subido con decimales en
+    un contador) se deja con su tipo original.
+    """
+    converted = {}
+    for col, dtype in dtypes_for(table, dataframe.columns).items():
+        if dataframe[col].dtype == dtype:
+            continue
+        try:
+            if dtype == "date":
+                converted[col] = pd.to_datetime(dataframe[col], errors="coerce")
+            else:
+                converted[col] = dataframe[col].astype(dtype)
+        except (ValueError, TypeError):
+            continue
+    return dataframe.assign(**converted) if converted else dataframe
+
+
+def read_table_csv(path, table, **kwargs):
+    """
+    Lee un CSV (crudo o limpio) con los tipos de DTYPE_PLAN[table]
+
+    Los tipos se aplican al parsear, así los ids se leen como texto sin perder
+    ceros a la izquierda y las categóricas nunca pasan por object.
+    """
+    columns = pd.read_csv(path, nrows=0, **kwargs).columns
+    dtypes = dtypes_for(table, columns)
+    dataframe = pd.read_csv(path, dtype=_parse_dtypes(dtypes), **kwargs)
+    fechas = {col: pd.to_datetime(dataframe[col], errors="coerce")
+              for col, dtype in dtypes.items() if dtype == "date"}
+    return dataframe.assign(**fechas) if fechas else dataframe
+
+
+def memory_mb(dataframe):
+    """Memoria del DataFrame en MB, contando el contenido real de los textos"""
+    return dataframe.memory_usage(deep=True).sum() / 1e6
+
+
+def compare_memory(path, table):
+    """
+    Memoria de un CSV leído con los tipos inferidos por pandas vs con DTYPE_PLAN
+
+    Returns:
+        dict con tabla, filas, MB antes, MB después y ahorro
+    """
+    inferida = pd.read_csv(path)
+    antes = memory_mb(inferida)
+    despues = memory_mb(read_table_csv(path, table))
+    return {
+        "tabla": table,
+        "archivo": Path(path).name,
+        "filas": len(inferida),
+        "mb_antes": antes,
+        "mb_despues": despues,
+        "ahorro": 1 - despues / antes if antes else 0.0,
+    }
+
+
+# ============================================
+# LECTURA POR CHUNKS CON FILTRO DE FECHA
+# ============================================
+def read_csv_since(path, table, date_col, fecha_corte, chunksize=None):
+    """
+    Lee un CSV crudo por chunks y conserva solo las filas desde fecha_corte
+
+    Cada chunk se lee con las columnas y tipos de RAW_DTYPES[table], se
+    convierte la fecha y se filtra antes de leer el siguiente, así la memoria
+    queda acotada por el tamaño del chunk más las filas que pasan el filtro.
+    El resultado (filas, orden e índice) es el mismo que leer el archivo
+    completo y filtrar después.
+
+    Args:
+        path: ruta del CSV (ej: game.csv)
+        table: clave de RAW_DTYPES ('game' o 'line_score'); los tipos salen de DTYPE_PLAN
+        date_col: columna de fecha a convertir y filtrar
+        fecha_corte: fecha mínima (inclusive)
+        chunksize: filas por chunk (por defecto ETL_CHUNKSIZE)
+    """
+    dtypes = RAW_DTYPES[table]
+    chunks = []
+    reader = pd.read_csv(path, usecols=list(dtypes), dtype=_parse_dtypes(dtypes, chunked=True),
+                         chunksize=chunksize or CHUNKSIZE)
+    for chunk in reader:
+        chunk[date_col] = pd.to_datetime(chunk[date_col], errors="coerce")
+        chunks.append(chunk[chunk[date_col] >= fecha_corte])
+    if not chunks:
+        return pd.DataFrame(columns=list(dtypes))
+    # Las categóricas se arman una vez, con los valores de todos los chunks
+    categoricas = {col: "category" for col, dtype in dtypes.items() if dtype == "category"}
+    return pd.concat(chunks).astype(categoricas)
+
+
+# ============================================
+# PARQUET TIPADO
+# ============================================
+def _to_arrow_column(serie, field_type):
+    """Convierte una columna de pandas al tipo Arrow declarado en el esquema"""
+    if field_type == "INTEGER":
+        serie = pd.to_numeric(serie, errors="coerce").astype("Int64")
+    elif field_type == "FLOAT":
+        if serie.dtype == "float32":
+            # Por su representación decimal más corta: 0.487 no queda como 0.48699998
+            serie = pd.Series(serie.to_numpy().astype("U32"), index=serie.index)
+        serie = pd.to_numeric(serie, errors="coerce").astype("float64")
+    elif field_type == "BOOLEAN":
+        serie = serie.astype("boolean")
+    elif field_type == "DATE":
+        fechas = pd.to_datetime(serie, errors="coerce").dt.normalize()
+        return pa.array(fechas, from_pandas=True).cast(pa.date32())
+    else:
+        serie = serie.astype("string")
+    return pa.array(serie, type=ARROW_TYPES[field_type], from_pandas=True)
+
+
+def to_arrow_table(dataframe, table):
+    """
+    Convierte un DataFrame limpio en una tabla Arrow con el esquema de la tabla
+
+    Las columnas declaradas en SCHEMAS se castean a su tipo explícito; las
+    columnas extra del DataFrame se conservan al final con el tipo inferido.
+
+    Args:
+        dataframe: DataFrame de pandas
+        table: nombre de la tabla en SCHEMAS (ej: 'game')
+    """
+    fields, arrays = [], []
+    declared = set()
+    for name, field_type, mode in SCHEMAS[table]:
+        if name not in dataframe.columns:
+            continue
+        declared.add(name)
+        array = _to_arrow_column(dataframe[name], field_type)
+        if mode == "REQUIRED" and array.null_count:
+            raise ValueError(
+                f"La columna '{name}' de {table} es REQUIRED y tiene {array.null_count} nulos"
+            )
+        fields.append(pa.field(name, ARROW_TYPES[field_type], nullable=(mode != "REQUIRED")))
+        arrays.append(array)
+
+    for name in dataframe.columns:
+        if name in declared:
+            continue
+        array = pa.array(dataframe[name], from_pandas=True)
+        fields.append(pa.field(name, array.type))
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def write_parquet(dataframe, destination, table, compression=None):
+    """
+    Escribe un DataFrame como Parquet tipado
+
+    Args:
+        dataframe: DataFrame de pandas
+        destination: ruta del archivo o buffer binario (BytesIO)
+        table: nombre de la tabla en SCHEMAS
+        compression: códec de compresión (por defecto PARQUET_COMPRESSION)
+    """
+    compression = compression or PARQUET_COMPRESSION
+    pq.write_table(
+        to_arrow_table(dataframe, table),
+        destination,
+        compression=None if compression == "none" else compression,
+    )
+
+
+def cleaned_parquet_files(output_dir, table):
+    """
+    Archivos Parquet de una tabla limpia: <table>_cleaned.parquet y después sus
+    incrementos <table>_cleaned_<run_id>.parquet en orden de corrida
+
+    Returns:
+        lista de rutas (vacía si no existe el archivo base)
+    """
+    output_dir = Path(output_dir)
+    base = output_dir / f"{table}_cleaned.parquet"
+    if not base.exists():
+        return []
+    return [base] + sorted(output_dir.glob(f"{table}_cleaned_*.parquet"))
+
+
+def save_cleaned(dataframe, output_dir, table, append=False, run_id=None):
+    """
+    Guarda una tabla limpia como <table>_cleaned.csv y/o .parquet
+
+    Con append=True las filas se agregan sin reescribir lo ya guardado: el CSV
+    crece al final sin repetir encabezado y el Parquet se escribe como
+    incremento aparte, <table>_cleaned_<run_id>.parquet (igual que
+    append_cleaned en GCS). Sin append se reemplaza el archivo completo y se
+    borran los incrementos, que quedan compactados en el archivo base.
+
+    Args:
+        dataframe: filas a guardar (la tabla completa o solo las nuevas)
+        output_dir: carpeta de salida
+        table: nombre de la tabla en SCHEMAS
+        append: agregar a lo guardado en vez de reemplazarlo
+        run_id: id del incremento Parquet (por defecto la fecha y hora actual)
+
+    Returns:
+        bytes escritos en disco (en append, lo que creció cada archivo)
+    """
+    output_dir = Path(output_dir)
+    written = 0
+    for fmt in output_formats():
+        path = output_dir / f"{table}_cleaned.{fmt}"
+        exists = append and path.exists()
+        size_before = path.stat().st_size if exists and fmt == "csv" else 0
+        if fmt == "csv":
+            dataframe.to_csv(path, index=False, mode="a" if exists else "w", header=not exists)
+        elif exists:
+            # El costo es el de las filas nuevas, no el de toda la tabla
+            path = output_dir / f"{table}_cleaned_{run_id or time.strftime('%Y%m%dT%H%M%S')}.parquet"
+            write_parquet(dataframe, path, table)
+        else:
+            write_parquet(dataframe, path, table)
+            for part in output_dir.glob(f"{table}_cleaned_*.parquet"):
+                part.unlink()
+        written += path.stat().st_size - size_before
+        print(f"💾 Guardado: {path}" + (f" (+{len(dataframe):,} filas)" if exists else ""))
+    return written
+
+
+def read_parquet_files(paths):
+    """
+    Lee varios Parquet de una misma tabla como un solo dataset
+
+    El esquema es la unión de los esquemas de los archivos: una columna extra
+    que falte en alguno queda en nulo en sus filas.
+    """
+    paths = [str(p) for p in paths]
+    if len(paths) == 1:
+        return pd.read_parquet(paths[0])
+    schema = pa.unify_schemas([pq.read_schema(p) for p in paths], promote_options="permissive")
+    return ds.dataset(paths, schema=schema, format="parquet").to_table().to_pandas()
+
+
+def read_cleaned(output_dir, table):
+    """
+    Lee una tabla limpia guardada con save_cleaned (el Parquet si existe, si no el CSV)
+
+    Del Parquet se leen el archivo base y sus incrementos juntos.
+
+    Returns:
+        DataFrame con el plan de tipos, o None si la tabla no está en output_dir
+    """
+    output_dir = Path(output_dir)
+    parquet_files = cleaned_parquet_files(output_dir, table)
+    if parquet_files:
+        return apply_dtype_plan(read_parquet_files(parquet_files), table)
+    csv_path = output_dir / f"{table}_cleaned.csv"
+    if csv_path.exists():
+        return read_table_csv(csv_path, table)
+    return None
+
+
+# ============================================
+# COMPARACIÓN CSV vs PARQUET
+# ============================================
+def _timed(func, repeat=3):
+    """Devuelve el mejor tiempo (segundos) de varias ejecuciones"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare_csv_parquet(dataframe, table, work_dir, compressions=("snappy", "zstd")):
+    """
+    Compara tamaño y tiempo de lectura de una tabla en CSV y en Parquet
+
+    Args:
+        dataframe: tabla limpia
+        table: nombre de la tabla en SCHEMAS
+        work_dir: carpeta donde se escriben los archivos de prueba
+        compressions: códecs Parquet a comparar
+
+    Returns:
+        DataFrame con una fila por formato: tamaño en MB, lectura completa y
+        lectura de dos columnas (column pruning).
+    """
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    columns = [name for name, _, _ in SCHEMAS[table] if name in dataframe.columns][:2]
+
+    csv_path = work_dir / f"{table}_cleaned.csv"
+    dataframe.to_csv(csv_path, index=False)
+    rows = [{
+        "tabla": table,
+        "formato": "csv",
+        "tamaño_mb": csv_path.stat().st_size / 1e6,
+        "lectura_s": _timed(lambda: pd.read_csv(csv_path)),
+        "lectura_2_columnas_s": _timed(lambda: pd.read_csv(csv_path, usecols=columns)),
+    }]
+
+    for compression in compressions:
+        pq_path = work_dir / f"{table}_cleaned.{compression}.parquet"
+        write_parquet(dataframe, pq_path, table, compression=compression)
+        rows.append({
+            "tabla": table,
+            "formato": f"parquet ({compression})",
+            "tamaño_mb": pq_path.stat().st_size / 1e6,
+            "lectura_s": _timed(lambda: pd.read_parquet(pq_path)),
+            "lectura_2_columnas_s": _timed(lambda: pd.read_parquet(pq_path, columns=columns)),
+        })
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # Uso: python etl_io.py <carpeta con *_cleaned.csv> [carpeta de trabajo]
+    cleaned_dir = Path(sys.argv[1] if len(sys.argv) > 1 else "data/smart_decisions_nba")
+    work_dir = Path(sys.argv[2] if len(sys.argv) > 2 else cleaned_dir / "comparacion")
+
+    resultados = []
+    for table in SCHEMAS:
+        csv_path = cleaned_dir / f"{table}_cleaned.csv"
+        if not csv_path.exists():
+            print(f"⚠️ No existe {csv_path}, se omite")
+            continue
+        resultados.append(compare_csv_parquet(pd.read_csv(csv_path), table, work_dir))
+
+    if resultados:
+        print(pd.concat(resultados, ignore_index=True).to_string(index=False, float_format="%.4f"))
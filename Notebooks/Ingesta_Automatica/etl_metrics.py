@@ -0,0 +1,262 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage ni /proc, el pico de RSS queda vacío
+    resource = None
+
+# ============================================
+# INSTRUMENTACIÓN POR ETAPA
+# ============================================
+# Cada etapa de una tabla (download, read, clean, unpivot, save, upload, load)
+# se mide con stage(): tiempo de reloj, tiempo de CPU del proceso, cuánto
+# subió el pico de RSS, filas de entrada/salida y bytes leídos o escritos.
+# Cada medición es una línea JSON en ETL_RUN_LOG; todas las de una corrida
+# comparten ETL_RUN_ID, que heredan los procesos del planificador.
+#
+# rss_peak_delta_mb es el pico de memoria residente durante la etapa menos
+# la memoria al empezarla. En Linux el pico se reinicia al comienzo de cada
+# etapa (/proc/self/clear_refs) y se lee de VmHWM; en otros sistemas se usa
+# el máximo del proceso (getrusage), así que una etapa que no supera el pico
+# de las anteriores muestra 0.
+#
+# ETL_RUN_LOG: archivo JSON-lines de mediciones (por defecto logs/etl_runs.jsonl)
+RUN_LOG = "logs/etl_runs.jsonl"
+
+STAGES = ["download", "read", "clean", "unpivot", "aggregate", "metrics", "save", "upload", "load"]
+
+
+def current_run_id():
+    """Id de la corrida actual; se fija en ETL_RUN_ID la primera vez que se pide"""
+    run_id = os.getenv("ETL_RUN_ID")
+    if not run_id:
+        run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+        os.environ["ETL_RUN_ID"] = run_id
+    return run_id
+
+
+def run_log_path(path=None):
+    """Archivo del log: el indicado, ETL_RUN_LOG (leída en cada llamada) o RUN_LOG"""
+    return Path(path or os.getenv("ETL_RUN_LOG") or RUN_LOG)
+
+
+_PROC_STATUS = Path("/proc/self/status")
+
+
+def _proc_status_mb(field):
+    """Campo de memoria (VmRSS, VmHWM) de /proc/self/status en MB, o None"""
+    try:
+        for line in _PROC_STATUS.read_text().splitlines():
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1e3
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """Reinicia el pico de RSS del proceso a la memoria actual (solo Linux)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _rss_mb():
+    """Memoria residente actual en MB (None si no se puede medir)"""
+    return _proc_status_mb("VmRSS")
+
+
+def _peak_rss_mb():
+    """Pico de memoria residente del proceso en MB (None si no se puede medir)"""
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None or resource is None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB, macOS bytes
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def file_bytes(*paths):
+    """Tamaño total en bytes de archivos o carpetas (los que no existen suman 0)"""
+    total = 0
+    for path in map(Path, paths):
+        if path.is_dir():
+            total += sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+        elif path.exists():
+            total += path.stat().st_size
+    return total
+
+
+class StageRecord:
+    """Medición de una etapa; la tarea completa filas y bytes dentro del with"""
+
+    def __init__(self, table, stage, rows_in=None, nbytes=None):
+        self.table = table
+        self.stage = stage
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.nbytes = nbytes
+
+    def out(self, result):
+        """Registra las filas de salida (len del resultado) y devuelve el resultado"""
+        self.rows_out = len(result)
+        return result
+
+
+def write_record(record, path=None):
+    """Agrega una medición al log JSON-lines (una línea por write, segura entre procesos)"""
+    path = run_log_path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@contextmanager
+def stage(table, name, rows_in=None, nbytes=None):
+    """
+    Mide una etapa del ETL y la agrega al log de la corrida
+
+    Uso:
+        with stage("player", "read", nbytes=file_bytes(player_csv)) as s:
+            df_player = s.out(read_table_csv(player_csv, "player"))
+
+    Si la etapa lanza una excepción se registra con status "error" y la
+    excepción sigue su curso.
+
+    Args:
+        table: tabla (o dataset de Kaggle en la descarga)
+        name: etapa (ver STAGES)
+        rows_in: filas de entrada, si aplica
+        nbytes: bytes leídos o escritos, si se conocen de antemano
+    """
+    record = StageRecord(table, name, rows_in, nbytes)
+    started_at = datetime.now().isoformat(timespec="seconds")
+    # Con el pico reiniciado, la base es la memoria actual; si no, el pico previo
+    peak_before = _rss_mb() if _reset_peak_rss() else _peak_rss_mb()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    status, error = "ok", None
+    try:
+        yield record
+    except Exception as e:
+        status, error = "error", str(e)
+        raise
+    finally:
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        peak_after = _peak_rss_mb()
+        write_record({
+            "run_id": current_run_id(),
+            "table": table,
+            "stage": name,
+            "status": status,
+            "started_at": started_at,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "rss_peak_mb": None if peak_after is None else round(peak_after, 1),
+            "rss_peak_delta_mb": None if peak_after is None else round(peak_after - peak_before, 1),
+            "rows_in": record.rows_in,
+            "rows_out": record.rows_out,
+            "bytes": record.nbytes,
+            "pid": os.getpid(),
+            "error": error,
+        })
+
+
+# ============================================
+# RESUMEN DE LA CORRIDA
+# ============================================
+def read_run_log(path=None):
+    """Lee el log JSON-lines como DataFrame (vacío si no existe)"""
+    path = run_log_path(path)
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True, dtype={"run_id": str})
+
+
+def stage_summary(run_id=None, path=None):
+    """
+    Mediciones de una corrida: una fila por tabla y etapa, en el orden de STAGES
+
+    Returns:
+        DataFrame con tabla, etapa, estado, segundos, CPU, pico de RSS, filas y MB
+    """
+    log = read_run_log(path)
+    run_id = run_id or current_run_id()
+    if log.empty or run_id not in set(log["run_id"]):
+        return pd.DataFrame()
+    run = log[log["run_id"] == run_id].copy()
+    run["orden"] = run["stage"].map({name: i for i, name in enumerate(STAGES)})
+    run = run.sort_values(["table", "orden", "started_at"])
+    return pd.DataFrame({
+        "tabla": run["table"],
+        "etapa": run["stage"],
+        "estado": run["status"],
+        "wall_s": run["wall_s"],
+        "cpu_s": run["cpu_s"],
+        "rss_delta_mb": run["rss_peak_delta_mb"],
+        "filas_in": run["rows_in"].astype("Int64"),
+        "filas_out": run["rows_out"].astype("Int64"),
+        "mb": run["bytes"] / 1e6,
+    }).reset_index(drop=True)
+
+
+def compare_with_previous(run_id=None, path=None, threshold=0.2):
+    """
+    Tiempo total por tabla en esta corrida vs la corrida anterior del log
+
+    Returns:
+        DataFrame con tabla, segundos actuales y anteriores, variación y una
+        marca ⚠️ si la tabla tardó más que (1 + threshold) veces lo anterior
+    """
+    log = read_run_log(path)
+    run_id = run_id or current_run_id()
+    if log.empty:
+        return pd.DataFrame()
+    runs = sorted(set(log["run_id"]))
+    if run_id not in runs or runs.index(run_id) == 0:
+        return pd.DataFrame()
+    previous = runs[runs.index(run_id) - 1]
+    totals = log[log["run_id"].isin([run_id, previous])].pivot_table(
+        index="table", columns="run_id", values="wall_s", aggfunc="sum"
+    )
+    if previous not in totals or run_id not in totals:
+        return pd.DataFrame()
+    variacion = totals[run_id] / totals[previous] - 1
+    return pd.DataFrame({
+        "tabla": totals.index,
+        "wall_s": totals[run_id].values,
+        f"wall_s_{previous}": totals[previous].values,
+        "variación": variacion.values,
+        "alerta": ["⚠️" if v > threshold else "" for v in variacion.values],
+    })
+
+
+def print_run_summary(run_id=None, path=None):
+    """Imprime las mediciones por etapa de la corrida y la comparación con la anterior"""
+    run_id = run_id or current_run_id()
+    summary = stage_summary(run_id, path)
+    print("=" * 60)
+    print(f"📏 MEDICIONES POR ETAPA (corrida {run_id})")
+    print("=" * 60)
+    if summary.empty:
+        print("Sin mediciones para esta corrida")
+        return
+    print(summary.to_string(index=False, float_format="%.2f", na_rep="-"))
+    print(f"\n📝 Log: {run_log_path(path)}")
+
+    comparison = compare_with_previous(run_id, path)
+    if not comparison.empty:
+        print("\n📉 Tiempo por tabla vs la corrida anterior")
+        print(comparison.to_string(index=False, float_format="%.2f"))
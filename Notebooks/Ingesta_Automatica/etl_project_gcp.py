@@ -3,8 +3,14 @@ from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
 import pandas as pd
-from google.cloud import storage
-from io import BytesIO
+from etl_io import output_formats, read_csv_since, read_table_csv
+from etl_gcs import upload_stream, format_upload_stats, open_bucket
+from etl_metrics import stage, file_bytes, current_run_id, print_run_summary
+from etl_scheduler import Task, run_tasks
+from etl_transform import (unpivot_home_away, clean_player, clean_team, clean_game,
+                           clean_line_score, clean_all_seasons, GAME_COMMON_COLS,
+                           LINE_SCORE_COMMON_COLS, LINE_SCORE_TEAM_COLS, clean_other_stats,
+                           build_team_season, build_game_advanced)
 
 # ============================================
 # CONFIGURACIÓN DE GOOGLE CLOUD STORAGE
@@ -13,50 +19,41 @@ from io import BytesIO
 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
 BUCKET_NAME = os.getenv('GCS_BUCKET_NAME')  # Nombre de tu bucket en GCS
 
-# Inicializar cliente de GCS
-storage_client = storage.Client()
-bucket = storage_client.bucket(BUCKET_NAME)
+# El cliente se crea al primer uso: cada proceso del planificador abre el suyo
+_bucket = None
 
-def upload_to_gcs(dataframe, blob_name):
+def get_bucket():
+    """Devuelve el bucket de GCS, creando el cliente en el proceso actual si hace falta"""
+    global _bucket
+    if _bucket is None:
+        _bucket = open_bucket(BUCKET_NAME)
+    return _bucket
+
+def upload_to_gcs(dataframe, blob_name, table):
     """
-    Sube un DataFrame a Google Cloud Storage como CSV
+    Sube un DataFrame a Google Cloud Storage como CSV (gzip) o Parquet
+
+    La tabla se serializa por chunks directo a una subida resumible, sin
+    armar el archivo completo en memoria (ver etl_gcs.upload_stream).
     
     Args:
         dataframe: DataFrame de pandas
         blob_name: ruta del archivo en el bucket (ej: 'nba_data/player_cleaned.csv')
+        table: nombre de la tabla en etl_schemas.SCHEMAS
     """
     try:
-        blob = bucket.blob(blob_name)
-        # Convertir DataFrame a CSV en memoria
-        csv_buffer = BytesIO()
-        dataframe.to_csv(csv_buffer, index=False)
-        csv_buffer.seek(0)
-        
-        # Subir a GCS
-        blob.upload_from_file(csv_buffer, content_type='text/csv')
-        print(f"✅ Archivo subido a GCS: gs://{BUCKET_NAME}/{blob_name}")
+        fmt = "parquet" if blob_name.endswith(".parquet") else "csv"
+        with stage(table, "upload", rows_in=len(dataframe)) as s:
+            stats = upload_stream(get_bucket(), blob_name, dataframe, table, fmt)
+            s.rows_out, s.nbytes = stats["rows"], stats["bytes_sent"]
+        print(f"✅ Archivo subido a GCS: gs://{BUCKET_NAME}/{blob_name} ({format_upload_stats(stats)})")
     except Exception as e:
         print(f"❌ Error al subir {blob_name}: {e}")
 
-print("✅ Cliente de Google Cloud Storage inicializado\n")
-
-# ============================================
-# CONFIGURACIÓN DE KAGGLE API
-# ============================================
-kaggle_username = os.getenv('KAGGLE_USERNAME')
-kaggle_key = os.getenv('KAGGLE_KEY')
-
-os.environ['KAGGLE_USERNAME'] = kaggle_username
-os.environ['KAGGLE_KEY'] = kaggle_key
-
-print("✅ Credenciales de Kaggle cargadas correctamente desde .env")
-print(f"   Usuario: {kaggle_username}\n")
-
-from kaggle.api.kaggle_api_extended import KaggleApi
-
-api = KaggleApi()
-api.authenticate()
-print("✅ Autenticación exitosa con Kaggle API\n")
+def upload_cleaned(dataframe, table):
+    """Sube una tabla limpia en los formatos definidos por ETL_OUTPUT_FORMAT"""
+    for fmt in output_formats():
+        upload_to_gcs(dataframe, f"nba_data/cleaned/{table}_cleaned.{fmt}", table)
 
 # ============================================
 # DIRECTORIOS DE DESCARGA LOCALES (temporal)
@@ -65,207 +62,213 @@ basketball_dir = Path("data/basketball")
 nba_players_dir = Path("data/nba_players")
 smart_decisions_nba_dir = Path("data/smart_decisions_nba")
 
-basketball_dir.mkdir(parents=True, exist_ok=True)
-nba_players_dir.mkdir(parents=True, exist_ok=True)
-smart_decisions_nba_dir.mkdir(parents=True, exist_ok=True)
-
-print("📥 Iniciando descarga de datasets de Kaggle...\n")
-
-# ============================================
-# DATASET 1: Basketball Database
-# ============================================
-print("1️⃣ Descargando: Basketball Database (wyattowalsh/basketball)")
-print("-" * 60)
-
-try:
-    api.dataset_download_files(
-        'wyattowalsh/basketball',
-        path=str(basketball_dir),
-        unzip=True
-    )
-    print(f"✅ Descargado exitosamente en: {basketball_dir}\n")
-except Exception as e:
-    print(f"❌ Error al descargar: {e}\n")
-
-# ============================================
-# DATASET 2: NBA Players Data
-# ============================================
-print("2️⃣ Descargando: NBA Players Data (justinas/nba-players-data)")
-print("-" * 60)
-
-try:
-    api.dataset_download_files(
-        'justinas/nba-players-data',
-        path=str(nba_players_dir),
-        unzip=True
-    )
-    print(f"✅ Descargado exitosamente en: {nba_players_dir}\n")
-except Exception as e:
-    print(f"❌ Error al descargar: {e}\n")
-
-print("="*60)
-print("🔄 INICIANDO PROCESO ETL Y CARGA A GCS")
-print("="*60 + "\n")
-
-# ===========================================
-# ETL 1: PLAYER
-# ===========================================
-print("📊 Procesando: player.csv")
-df_player = pd.read_csv(basketball_dir / "csv" / "player.csv")
-df_player = df_player.rename(columns={
-    "full_name": "player_name",
-    "id": "player_id"
-})
-upload_to_gcs(df_player, "nba_data/cleaned/player_cleaned.csv")
-print()
+# Leer por chunks filtrando desde octubre de 1996
+fecha_corte = pd.to_datetime("1996-10-01")
 
 # ===========================================
-# ETL 2: GAME
+# TAREAS ETL (una por tabla)
 # ===========================================
-print("📊 Procesando: game.csv")
-df_game = pd.read_csv(basketball_dir / "csv" / "game.csv")
-df_game["game_date"] = pd.to_datetime(df_game["game_date"], errors="coerce")
-
-# Filtrar desde octubre de 1996
-fecha_corte = pd.to_datetime("1996-10-01")
-df_game = df_game[df_game["game_date"] >= fecha_corte]
-
-# Imputación de valores nulos
-df_game['ft_pct_home'].fillna(df_game['ft_pct_home'].median(), inplace=True)
-df_game['ft_pct_away'].fillna(df_game['ft_pct_away'].median(), inplace=True)
-df_game['fg3_pct_home'].fillna(df_game['fg3_pct_home'].median(), inplace=True)
-df_game['wl_home'].fillna(df_game['wl_home'].mode()[0], inplace=True)
-df_game['wl_away'].fillna(df_game['wl_away'].mode()[0], inplace=True)
-
-# Eliminar duplicados
-df_game = df_game.drop_duplicates(subset=["game_id","team_id_home","team_id_away"], keep="first")
+# El planificador (etl_scheduler.py) ejecuta en paralelo las tareas sin
+# dependencias pendientes; ALL SEASONS espera a TEAM para el merge.
+# Cada etapa (read, clean, unpivot, upload) queda medida en el log de la
+# corrida (etl_metrics.py).
+def task_player():
+    print("📊 Procesando: player.csv")
+    player_csv = basketball_dir / "csv" / "player.csv"
+    with stage("player", "read", nbytes=file_bytes(player_csv)) as s:
+        df_player = s.out(read_table_csv(player_csv, "player"))
+    with stage("player", "clean", rows_in=len(df_player)) as s:
+        df_player = s.out(clean_player(df_player))
+    upload_cleaned(df_player, "player")
+    return len(df_player)
+
+
+def task_game():
+    print("📊 Procesando: game.csv")
+    game_csv = basketball_dir / "csv" / "game.csv"
+    with stage("game", "read", nbytes=file_bytes(game_csv)) as s:
+        df_game = s.out(read_csv_since(game_csv, "game", "game_date", fecha_corte))
+
+    # Imputación de valores nulos y duplicados
+    with stage("game", "clean", rows_in=len(df_game)) as s:
+        df_game = s.out(clean_game(df_game))
+
+    # Transformación: separar home y away
+    with stage("game", "unpivot", rows_in=len(df_game)) as s:
+        df_game_cleaned = s.out(unpivot_home_away(df_game, GAME_COMMON_COLS, side_col='team_side'))
+    upload_cleaned(df_game_cleaned, "game")
+    # TEAM_SEASON se arma con estos mismos partidos
+    return df_game_cleaned
+
+
+def task_team_season(game):
+    print("📊 Procesando: team_season (agregados de game)")
+    with stage("team_season", "aggregate", rows_in=len(game)) as s:
+        df_team_season = s.out(build_team_season(game))
+    upload_cleaned(df_team_season, "team_season")
+    return len(df_team_season)
+
+
+def task_team():
+    print("📊 Procesando: team.csv")
+    team_csv = basketball_dir / "csv" / "team.csv"
+    with stage("team", "read", nbytes=file_bytes(team_csv)) as s:
+        df_team = s.out(read_table_csv(team_csv, "team"))
+    with stage("team", "clean", rows_in=len(df_team)) as s:
+        df_team = s.out(clean_team(df_team))
+    upload_cleaned(df_team, "team")
+    # ALL SEASONS recibe la tabla de equipos ya limpia
+    return df_team
+
+
+def task_line_score():
+    print("📊 Procesando: line_score.csv")
+    line_score_csv = basketball_dir / "csv" / "line_score.csv"
+    with stage("line_score", "read", nbytes=file_bytes(line_score_csv)) as s:
+        df_line_score = s.out(read_csv_since(line_score_csv, "line_score", "game_date_est", fecha_corte))
+
+    # Overtime en 0 y duplicados
+    with stage("line_score", "clean", rows_in=len(df_line_score)) as s:
+        df_line_score = s.out(clean_line_score(df_line_score))
+
+    # Una fila por equipo: local (home) y visitante (away)
+    with stage("line_score", "unpivot", rows_in=len(df_line_score)) as s:
+        df_line_score_cleaned = s.out(unpivot_home_away(
+            df_line_score, LINE_SCORE_COMMON_COLS, LINE_SCORE_TEAM_COLS, side_col="local_visitante"
+        ))
+    upload_cleaned(df_line_score_cleaned, "line_score")
+    return len(df_line_score_cleaned)
+
+
+def task_all_seasons(team):
+    print("📊 Procesando: all_seasons.csv")
+    # Abreviaciones corregidas + merge con team data
+    all_seasons_csv = nba_players_dir / "all_seasons.csv"
+    with stage("all_seasons", "read", nbytes=file_bytes(all_seasons_csv)) as s:
+        df_all_seasons = s.out(read_table_csv(all_seasons_csv, "all_seasons"))
+    with stage("all_seasons", "clean", rows_in=len(df_all_seasons)) as s:
+        df_all_seasons = s.out(clean_all_seasons(df_all_seasons, team))
+    upload_cleaned(df_all_seasons, "all_seasons")
+    return len(df_all_seasons)
+
+
+def task_other_stats():
+    print("📊 Procesando: other_stats.csv")
+    other_stats_csv = basketball_dir / "csv" / "other_stats.csv"
+    with stage("other_stats", "read", nbytes=file_bytes(other_stats_csv)) as s:
+        df_other_stats = s.out(read_table_csv(other_stats_csv, "other_stats"))
+    # Eliminar duplicados y pasar a una fila por equipo
+    with stage("other_stats", "clean", rows_in=len(df_other_stats)) as s:
+        df_other_stats_cleaned = s.out(clean_other_stats(df_other_stats))
+    upload_cleaned(df_other_stats_cleaned, "other_stats")
+    # GAME_ADVANCED une estas filas con los partidos
+    return df_other_stats_cleaned
+
+
+def task_game_advanced(game, other_stats):
+    print("📊 Procesando: game_advanced (game + other_stats)")
+    with stage("game_advanced", "metrics", rows_in=len(game)) as s:
+        df_game_advanced = s.out(build_game_advanced(game, other_stats))
+    upload_cleaned(df_game_advanced, "game_advanced")
+    return len(df_game_advanced)
+
+
+TASKS = [
+    Task("player", task_player),
+    Task("game", task_game),
+    Task("team_season", task_team_season, deps=("game",)),
+    Task("team", task_team),
+    Task("line_score", task_line_score),
+    Task("all_seasons", task_all_seasons, deps=("team",)),
+    Task("other_stats", task_other_stats),
+    Task("game_advanced", task_game_advanced, deps=("game", "other_stats")),
+]
 
-# Transformación: separar home y away
-cols_comunes = ['season_id', 'game_id', 'game_date', 'season_type']
-cols_home = [col for col in df_game.columns if '_home' in col]
-cols_away = [col for col in df_game.columns if '_away' in col]
 
-df_home = df_game[cols_comunes + cols_home].copy()
-df_away = df_game[cols_comunes + cols_away].copy()
+def download_datasets():
+    """Autentica con Kaggle y descarga los datasets en data/"""
+    # ============================================
+    # CONFIGURACIÓN DE KAGGLE API
+    # ============================================
+    kaggle_username = os.getenv('KAGGLE_USERNAME')
+    kaggle_key = os.getenv('KAGGLE_KEY')
 
-df_home.columns = cols_comunes + [col.replace('_home', '') for col in cols_home]
-df_away.columns = cols_comunes + [col.replace('_away', '') for col in cols_away]
+    os.environ['KAGGLE_USERNAME'] = kaggle_username
+    os.environ['KAGGLE_KEY'] = kaggle_key
 
-df_home['team_side'] = 'home'
-df_away['team_side'] = 'away'
+    print("✅ Credenciales de Kaggle cargadas correctamente desde .env")
+    print(f"   Usuario: {kaggle_username}\n")
 
-df_game_cleaned = pd.concat([df_home, df_away], ignore_index=True)
-upload_to_gcs(df_game_cleaned, "nba_data/cleaned/game_cleaned.csv")
-print()
+    from kaggle.api.kaggle_api_extended import KaggleApi
 
-# ===========================================
-# ETL 3: TEAM
-# ===========================================
-print("📊 Procesando: team.csv")
-df_team = pd.read_csv(basketball_dir / "csv" / "team.csv")
-df_team = df_team.rename(columns={
-    'id': 'team_id',
-    'full_name': 'team_name',
-    'abbreviation': 'team_abbreviation'
-})
-upload_to_gcs(df_team, "nba_data/cleaned/team_cleaned.csv")
-print()
+    api = KaggleApi()
+    api.authenticate()
+    print("✅ Autenticación exitosa con Kaggle API\n")
 
-# ===========================================
-# ETL 4: LINE SCORE
-# ===========================================
-print("📊 Procesando: line_score.csv")
-df_line_score = pd.read_csv(basketball_dir / "csv" / "line_score.csv")
-df_line_score["game_date_est"] = pd.to_datetime(df_line_score["game_date_est"], errors="coerce")
-df_line_score = df_line_score.rename(columns={'game_date_est':'game_date'})
-
-# Filtrar desde octubre de 1996
-df_line_score = df_line_score[df_line_score["game_date"] >= fecha_corte]
-
-# Imputar valores nulos en overtime
-ot_cols = [col for col in df_line_score.columns if "pts_ot" in col]
-df_line_score[ot_cols] = df_line_score[ot_cols].fillna(0)
-
-# Eliminar duplicados
-df_line_score = df_line_score.drop_duplicates(subset=["game_id","team_id_home","team_id_away"], keep="first")
-
-# Crear tablas separadas para home y away
-home_cols = [
-    "game_date","game_id","team_id_home","team_abbreviation_home",
-    "team_city_name_home","team_nickname_home","team_wins_losses_home",
-    "pts_qtr1_home","pts_qtr2_home","pts_qtr3_home","pts_qtr4_home",
-    "pts_ot1_home","pts_ot2_home","pts_ot3_home","pts_ot4_home",
-    "pts_ot5_home","pts_ot6_home","pts_ot7_home","pts_ot8_home",
-    "pts_ot9_home","pts_ot10_home","pts_home"
-]
+    basketball_dir.mkdir(parents=True, exist_ok=True)
+    nba_players_dir.mkdir(parents=True, exist_ok=True)
+    smart_decisions_nba_dir.mkdir(parents=True, exist_ok=True)
 
-away_cols = [
-    "game_date","game_id","team_id_away","team_abbreviation_away",
-    "team_city_name_away","team_nickname_away","team_wins_losses_away",
-    "pts_qtr1_away","pts_qtr2_away","pts_qtr3_away","pts_qtr4_away",
-    "pts_ot1_away","pts_ot2_away","pts_ot3_away","pts_ot4_away",
-    "pts_ot5_away","pts_ot6_away","pts_ot7_away","pts_ot8_away",
-    "pts_ot9_away","pts_ot10_away","pts_away"
-]
+    print("📥 Iniciando descarga de datasets de Kaggle...\n")
 
-df_home_line_score = df_line_score[home_cols].copy()
-df_home_line_score = df_home_line_score.rename(columns=lambda x: x.replace("_home",""))
-df_home_line_score["local_visitante"] = "home"
+    # ============================================
+    # DATASET 1: Basketball Database
+    # ============================================
+    print("1️⃣ Descargando: Basketball Database (wyattowalsh/basketball)")
+    print("-" * 60)
 
-df_away_line_score = df_line_score[away_cols].copy()
-df_away_line_score = df_away_line_score.rename(columns=lambda x: x.replace("_away",""))
-df_away_line_score["local_visitante"] = "away"
+    try:
+        with stage("wyattowalsh/basketball", "download") as s:
+            api.dataset_download_files(
+                'wyattowalsh/basketball',
+                path=str(basketball_dir),
+                unzip=True
+            )
+            s.nbytes = file_bytes(basketball_dir)
+        print(f"✅ Descargado exitosamente en: {basketball_dir}\n")
+    except Exception as e:
+        print(f"❌ Error al descargar: {e}\n")
 
-df_line_score_cleaned = pd.concat([df_home_line_score, df_away_line_score], ignore_index=True)
-upload_to_gcs(df_line_score_cleaned, "nba_data/cleaned/line_score_cleaned.csv")
-print()
+    # ============================================
+    # DATASET 2: NBA Players Data
+    # ============================================
+    print("2️⃣ Descargando: NBA Players Data (justinas/nba-players-data)")
+    print("-" * 60)
 
-# ===========================================
-# ETL 5: ALL SEASONS
-# ===========================================
-print("📊 Procesando: all_seasons.csv")
-df_all_seasons = pd.read_csv(nba_players_dir / "all_seasons.csv")
-df_all_seasons = df_all_seasons.drop(columns=["Unnamed: 0"])
-df_all_seasons["college"] = df_all_seasons["college"].fillna("No College")
-
-# Limpiar y estandarizar abreviaciones
-df_all_seasons["team_abbreviation"] = (
-    df_all_seasons["team_abbreviation"]
-    .str.strip()
-    .str.upper()
-)
-
-# Correcciones históricas
-correcciones = {
-    "VAN": "MEM",
-    "CHH": "CHA",
-    "SEA": "OKC",
-    "NJN": "BKN",
-    "NOH": "NOP",
-    "NOK": "NOP",
-    "CHO": "CHA"
-}
-
-df_all_seasons["team_abbreviation"] = df_all_seasons["team_abbreviation"].replace(correcciones)
-df_all_seasons = df_all_seasons.drop(columns=["team_id", "team_name"], errors="ignore")
-
-# Merge con team data
-df_all_seasons = pd.merge(
-    df_all_seasons,
-    df_team[["team_id", "team_name", "team_abbreviation"]],
-    on="team_abbreviation",
-    how="left"
-)
-upload_to_gcs(df_all_seasons, "nba_data/cleaned/all_seasons_cleaned.csv")
-print()
-
-print("="*60)
-print("✅ PROCESO ETL COMPLETADO")
-print("="*60)
-print(f"\n📦 Todos los archivos fueron cargados a: gs://{BUCKET_NAME}/nba_data/cleaned/")
-print("\n💡 Archivos generados:")
-print("   - player_cleaned.csv")
-print("   - game_cleaned.csv")
-print("   - team_cleaned.csv")
-print("   - line_score_cleaned.csv")
-print("   - all_seasons_cleaned.csv")
\ No newline at end of file
+    try:
+        with stage("justinas/nba-players-data", "download") as s:
+            api.dataset_download_files(
+                'justinas/nba-players-data',
+                path=str(nba_players_dir),
+                unzip=True
+            )
+            s.nbytes = file_bytes(nba_players_dir)
+        print(f"✅ Descargado exitosamente en: {nba_players_dir}\n")
+    except Exception as e:
+        print(f"❌ Error al descargar: {e}\n")
+
+
+if __name__ == "__main__":
+    # Los procesos del planificador heredan el mismo ETL_RUN_ID
+    current_run_id()
+    download_datasets()
+
+    print("="*60)
+    print("🔄 INICIANDO PROCESO ETL Y CARGA A GCS")
+    print("="*60 + "\n")
+    run_tasks(TASKS)
+    print()
+    print_run_summary()
+    print()
+
+    print("="*60)
+    print("✅ PROCESO ETL COMPLETADO")
+    print("="*60)
+    print(f"\n📦 Todos los archivos fueron cargados a: gs://{BUCKET_NAME}/nba_data/cleaned/")
+    print(f"\n💡 Archivos generados ({', '.join(output_formats())}):")
+    print("   - player_cleaned")
+    print("   - game_cleaned")
+    print("   - team_cleaned")
+    print("   - line_score_cleaned")
+    print("   - all_seasons_cleaned")
+    print("   - other_stats_cleaned")
@@ -3,9 +3,21 @@ from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
 import pandas as pd
-from google.cloud import storage, bigquery
+from google.cloud import bigquery
 from google.cloud.exceptions import NotFound
-from io import BytesIO
+import zipfile
+from etl_io import output_formats, read_csv_since, read_table_csv, read_cleaned, save_cleaned
+from etl_gcs import (upload_stream, format_upload_stats, open_bucket, load_format, load_from_gcs,
+                     schema_for, GZIP_CSV)
+from etl_metrics import stage, file_bytes, current_run_id, print_run_summary
+from etl_scheduler import Task, run_tasks
+from etl_transform import (unpivot_home_away, clean_player, clean_team, clean_game,
+                           clean_line_score, clean_all_seasons, GAME_COMMON_COLS,
+                           LINE_SCORE_COMMON_COLS, LINE_SCORE_TEAM_COLS, clean_other_stats,
+                           build_team_season, build_game_advanced)
+from etl_state import (load_state, save_state, source_hashes, is_unchanged, select_increment,
+                       select_new_keys, record_table, MODE_APPEND, MODE_TRUNCATE)
+from etl_schemas import SCHEMAS, BQ_TABLES
 
 # ============================================
 # CONFIGURACIÓN DE GOOGLE CLOUD
@@ -15,90 +27,117 @@ BUCKET_NAME = os.getenv('GCS_BUCKET_NAME')
 PROJECT_ID = os.getenv('GCP_PROJECT_ID')
 DATASET_ID = 'nba_analytics'
 
-# Inicializar clientes
-storage_client = storage.Client()
-bucket = storage_client.bucket(BUCKET_NAME)
-bq_client = bigquery.Client(project=PROJECT_ID)
+# Los clientes se crean al primer uso: cada proceso del planificador abre los suyos
+_bucket = None
+_bq_client = None
 
-print("✅ Clientes de Google Cloud Storage y BigQuery inicializados\n")
+def get_bucket():
+    """Devuelve el bucket de GCS, creando el cliente en el proceso actual si hace falta"""
+    global _bucket
+    if _bucket is None:
+        _bucket = open_bucket(BUCKET_NAME)
+    return _bucket
+
+def get_bq_client():
+    """Devuelve el cliente de BigQuery del proceso actual"""
+    global _bq_client
+    if _bq_client is None:
+        _bq_client = bigquery.Client(project=PROJECT_ID)
+    return _bq_client
 
 # ============================================
 # FUNCIONES DE CARGA
 # ============================================
-def upload_to_gcs(dataframe, blob_name):
-    """Sube un DataFrame a Google Cloud Storage como CSV"""
+def upload_to_gcs(dataframe, blob_name, table, fmt, header=True):
+    """Sube un DataFrame a GCS por streaming (CSV gzip o Parquet tipado)"""
     try:
-        blob = bucket.blob(blob_name)
-        csv_buffer = BytesIO()
-        dataframe.to_csv(csv_buffer, index=False)
-        csv_buffer.seek(0)
-        blob.upload_from_file(csv_buffer, content_type='text/csv')
-        print(f"✅ GCS: gs://{BUCKET_NAME}/{blob_name}")
+        with stage(table, "upload", rows_in=len(dataframe)) as s:
+            stats = upload_stream(get_bucket(), blob_name, dataframe, table, fmt, header=header)
+            s.rows_out, s.nbytes = stats["rows"], stats["bytes_sent"]
+        print(f"✅ GCS: gs://{BUCKET_NAME}/{blob_name} ({format_upload_stats(stats)})")
         return True
     except Exception as e:
         print(f"❌ Error al subir a GCS {blob_name}: {e}")
         return False
 
+def upload_cleaned(dataframe, table):
+    """
+    Sube una tabla limpia en los formatos definidos por ETL_OUTPUT_FORMAT
+
+    Returns:
+        {formato: nombre del objeto} de los archivos subidos correctamente
+    """
+    objetos = {}
+    for fmt in output_formats():
+        blob_name = f"nba_data/cleaned/{table}_cleaned.{fmt}"
+        if upload_to_gcs(dataframe, blob_name, table, fmt):
+            objetos[fmt] = blob_name
+    # Los incrementos anteriores quedan incluidos en la tabla completa
+    for blob in get_bucket().list_blobs(prefix=f"nba_data/cleaned/{table}_cleaned_"):
+        blob.delete()
+    return objetos
+
+def append_cleaned(dataframe, table, run_id):
+    """
+    Sube las filas nuevas de una tabla como <table>_cleaned_<run_id>.<fmt>
+
+    El incremento CSV va sin encabezado para poder concatenarlo después al
+    objeto base (merge_csv_increment). El Parquet queda como archivo aparte,
+    legible junto al base con el comodín gs://.../<table>_cleaned*.parquet.
+
+    Returns:
+        {formato: nombre del objeto} de los incrementos subidos correctamente
+    """
+    objetos = {}
+    for fmt in output_formats():
+        part_name = f"nba_data/cleaned/{table}_cleaned_{run_id}.{fmt}"
+        if upload_to_gcs(dataframe, part_name, table, fmt, header=(fmt != "csv")):
+            objetos[fmt] = part_name
+    return objetos
+
+def merge_csv_increment(table, part_name):
+    """Concatena un incremento CSV al objeto base con compose y lo elimina"""
+    try:
+        base = get_bucket().blob(f"nba_data/cleaned/{table}_cleaned.csv")
+        part = get_bucket().blob(part_name)
+        if GZIP_CSV:
+            # Dos miembros gzip concatenados siguen siendo un gzip válido
+            base.content_type = "text/csv"
+            base.content_encoding = "gzip"
+        base.compose([base, part])
+        part.delete()
+        print(f"✅ GCS: incremento agregado a gs://{BUCKET_NAME}/{base.name}")
+        return True
+    except Exception as e:
+        print(f"❌ Error al agregar a GCS {table}: {e}")
+        return False
+
 def create_dataset_if_not_exists():
     """Crea el dataset de BigQuery si no existe"""
     dataset_ref = f"{PROJECT_ID}.{DATASET_ID}"
     try:
-        bq_client.get_dataset(dataset_ref)
+        get_bq_client().get_dataset(dataset_ref)
         print(f"✅ Dataset '{DATASET_ID}' ya existe en BigQuery\n")
     except NotFound:
         dataset = bigquery.Dataset(dataset_ref)
         dataset.location = "US"
         dataset.description = "Dataset para análisis de datos de la NBA (1996-2024)"
-        dataset = bq_client.create_dataset(dataset, timeout=30)
+        dataset = get_bq_client().create_dataset(dataset, timeout=30)
         print(f"✅ Dataset '{DATASET_ID}' creado en BigQuery\n")
 
-def convert_float_columns_to_int(df, int_columns):
-    """Convierte columnas float a int, manejando NaN"""
-    for col in int_columns:
-        if col in df.columns:
-            # Convertir NaN a 0 o dejarlo como está, luego convertir a int
-            df[col] = df[col].fillna(0).astype('Int64')  # Int64 permite NaN
-    return df
-
-def load_to_bigquery(dataframe, table_name, schema):
-    """Carga un DataFrame directamente a BigQuery"""
+def load_to_bigquery(blob_name, table, schema, fmt, write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+                     header=True):
+    """Carga en BigQuery un objeto ya subido a GCS, con el esquema explícito de la tabla"""
+    table_name = BQ_TABLES[table]
     table_id = f"{PROJECT_ID}.{DATASET_ID}.{table_name}"
-    
+    uri = f"gs://{BUCKET_NAME}/{blob_name}"
+
     try:
-        # Limpiar DataFrame antes de cargar
-        df_clean = dataframe.copy()
-        
-        # Identificar columnas INT64 del esquema
-        int_columns = [field.name for field in schema if field.field_type == "INTEGER"]
-        
-        # Convertir columnas float a int
-        df_clean = convert_float_columns_to_int(df_clean, int_columns)
-        
-        # Configurar opciones de carga - usar autodetect para mejor compatibilidad
-        job_config = bigquery.LoadJobConfig(
-            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
-            source_format=bigquery.SourceFormat.CSV,
-            skip_leading_rows=1,
-            autodetect=True,  # Cambiar a True para detectar tipos automáticamente
-            allow_quoted_newlines=True,
-            allow_jagged_rows=False
-        )
-        
-        # Convertir DataFrame a CSV en memoria
-        csv_buffer = BytesIO()
-        df_clean.to_csv(csv_buffer, index=False)
-        csv_buffer.seek(0)
-        
-        # Cargar a BigQuery
-        job = bq_client.load_table_from_file(
-            csv_buffer,
-            table_id,
-            job_config=job_config
-        )
-        job.result()  # Esperar a que termine
-        
-        table = bq_client.get_table(table_id)
-        print(f"✅ BigQuery: {table_id} ({table.num_rows:,} filas)")
+        with stage(table, "load") as s:
+            job = load_from_gcs(get_bq_client(), uri, table_id, schema, fmt, write_disposition, header)
+            s.rows_out = job.output_rows
+        bq_table = get_bq_client().get_table(table_id)
+        print(f"✅ BigQuery: {table_id} ← {uri} ({bq_table.num_rows:,} filas)")
         return True
     except Exception as e:
         print(f"❌ Error al cargar a BigQuery {table_name}: {e}")
@@ -107,342 +146,432 @@ def load_to_bigquery(dataframe, table_name, schema):
 # ============================================
 # ESQUEMAS DE BIGQUERY
 # ============================================
-schema_player = [
-    bigquery.SchemaField("player_id", "INTEGER", mode="REQUIRED"),
-    bigquery.SchemaField("player_name", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("first_name", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("last_name", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("is_active", "BOOLEAN", mode="NULLABLE"),
-]
-
-schema_team = [
-    bigquery.SchemaField("team_id", "INTEGER", mode="REQUIRED"),
-    bigquery.SchemaField("team_name", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("team_abbreviation", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("nickname", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("city", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("state", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("year_founded", "INTEGER", mode="NULLABLE"),
-]
-
-schema_game = [
-    bigquery.SchemaField("season_id", "INTEGER", mode="REQUIRED"),
-    bigquery.SchemaField("game_id", "INTEGER", mode="REQUIRED"),
-    bigquery.SchemaField("game_date", "DATE", mode="REQUIRED"),
-    bigquery.SchemaField("season_type", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("team_id", "INTEGER", mode="REQUIRED"),
-    bigquery.SchemaField("team_side", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("matchup", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("wl", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("min", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("fgm", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("fga", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("fg_pct", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("fg3m", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("fg3a", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("fg3_pct", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("ftm", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("fta", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("ft_pct", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("oreb", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("dreb", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("reb", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("ast", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("stl", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("blk", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("tov", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pf", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("plus_minus", "INTEGER", mode="NULLABLE"),
-]
-
-schema_line_score = [
-    bigquery.SchemaField("game_date", "DATE", mode="REQUIRED"),
-    bigquery.SchemaField("game_id", "INTEGER", mode="REQUIRED"),
-    bigquery.SchemaField("team_id", "INTEGER", mode="REQUIRED"),
-    bigquery.SchemaField("team_abbreviation", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("team_city_name", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("team_nickname", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("team_wins_losses", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("pts_qtr1", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_qtr2", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_qtr3", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_qtr4", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_ot1", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_ot2", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_ot3", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_ot4", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_ot5", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_ot6", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_ot7", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_ot8", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_ot9", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts_ot10", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("pts", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("local_visitante", "STRING", mode="REQUIRED"),
-]
-
-schema_all_seasons = [
-    bigquery.SchemaField("player_name", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("team_abbreviation", "STRING", mode="REQUIRED"),
-    bigquery.SchemaField("age", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("player_height", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("player_weight", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("college", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("country", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("draft_year", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("draft_round", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("draft_number", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("gp", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("pts", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("reb", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("ast", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("net_rating", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("oreb_pct", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("dreb_pct", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("usg_pct", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("ts_pct", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("ast_pct", "FLOAT", mode="NULLABLE"),
-    bigquery.SchemaField("season", "STRING", mode="NULLABLE"),
-    bigquery.SchemaField("team_id", "INTEGER", mode="NULLABLE"),
-    bigquery.SchemaField("team_name", "STRING", mode="NULLABLE"),
-]
+# Definidos en etl_schemas.py (compartidos con la salida Parquet)
+def build_bq_schema(table):
+    """Construye la lista de SchemaField de BigQuery para una tabla"""
+    return [bigquery.SchemaField(name, field_type, mode=mode) for name, field_type, mode in SCHEMAS[table]]
+
+schema_player = build_bq_schema("player")
+schema_team = build_bq_schema("team")
+schema_game = build_bq_schema("game")
+schema_line_score = build_bq_schema("line_score")
+schema_all_seasons = build_bq_schema("all_seasons")
+schema_other_stats = build_bq_schema("other_stats")
+schema_team_season = build_bq_schema("team_season")
+schema_game_advanced = build_bq_schema("game_advanced")
 
 # ============================================
-# CONFIGURACIÓN DE KAGGLE API
+# PUBLICACIÓN INCREMENTAL
 # ============================================
-kaggle_username = os.getenv('KAGGLE_USERNAME')
-kaggle_key = os.getenv('KAGGLE_KEY')
-
-os.environ['KAGGLE_USERNAME'] = kaggle_username
-os.environ['KAGGLE_KEY'] = kaggle_key
-
-print("✅ Credenciales de Kaggle cargadas correctamente desde .env")
-print(f"   Usuario: {kaggle_username}\n")
-
-from kaggle.api.kaggle_api_extended import KaggleApi
+cleaned_dir = Path("data/smart_decisions_nba")
+cleaned_dir.mkdir(parents=True, exist_ok=True)
+# Los procesos del planificador heredan el mismo run_id por variable de entorno
+run_id = current_run_id()
+
+def publish_table(dataframe, table, schema, mode):
+    """
+    Publica una tabla limpia en disco local, GCS y BigQuery
+
+    La tabla se serializa una vez por formato; BigQuery carga el mismo objeto
+    subido a GCS (Parquet si ETL_OUTPUT_FORMAT lo incluye, si no el CSV).
+
+    Args:
+        dataframe: filas a publicar (la tabla completa o solo el incremento)
+        table: nombre de la tabla en etl_schemas.SCHEMAS
+        schema: esquema de BigQuery
+        mode: MODE_TRUNCATE (reemplazo completo) o MODE_APPEND (solo filas nuevas)
+
+    Returns:
+        True si todos los destinos se actualizaron correctamente
+    """
+    append = mode == MODE_APPEND
+    print(f"   Modo: {mode} ({len(dataframe):,} filas)")
+    with stage(table, "save", rows_in=len(dataframe)) as s:
+        s.nbytes = save_cleaned(dataframe, cleaned_dir, table, append=append, run_id=run_id)
+    if append:
+        objetos = append_cleaned(dataframe, table, run_id)
+        disposition = bigquery.WriteDisposition.WRITE_APPEND
+    else:
+        objetos = upload_cleaned(dataframe, table)
+        disposition = bigquery.WriteDisposition.WRITE_TRUNCATE
+    ok = len(objetos) == len(output_formats())
+
+    fmt = load_format(output_formats())
+    if fmt not in objetos:
+        print(f"❌ BigQuery: no se carga {table}, falló la subida a GCS")
+        return False
+    # Los incrementos CSV no tienen encabezado
+    header = not (append and fmt == "csv")
+    ok = load_to_bigquery(objetos[fmt], table, schema_for(schema, dataframe), fmt,
+                          disposition, header) and ok
 
-api = KaggleApi()
-api.authenticate()
-print("✅ Autenticación exitosa con Kaggle API\n")
+    if append and "csv" in objetos:
+        ok = merge_csv_increment(table, objetos["csv"]) and ok
+    return ok
 
 # ============================================
-# DIRECTORIOS DE DESCARGA
+# DIRECTORIOS Y ARCHIVOS FUENTE
 # ============================================
 basketball_dir = Path("data/basketball")
 nba_players_dir = Path("data/nba_players")
 
-basketball_dir.mkdir(parents=True, exist_ok=True)
-nba_players_dir.mkdir(parents=True, exist_ok=True)
-
-print("📥 Iniciando descarga de datasets de Kaggle...\n")
-
-# ============================================
-# DESCARGAR DATASETS
-# ============================================
-print("1️⃣ Descargando: Basketball Database")
-print("-" * 60)
-try:
-    api.dataset_download_files('wyattowalsh/basketball', path=str(basketball_dir), unzip=True)
-    print(f"✅ Descargado exitosamente\n")
-except Exception as e:
-    print(f"❌ Error: {e}\n")
-
-print("2️⃣ Descargando: NBA Players Data")
-print("-" * 60)
-try:
-    api.dataset_download_files('justinas/nba-players-data', path=str(nba_players_dir), unzip=True)
-    print(f"✅ Descargado exitosamente\n")
-except Exception as e:
-    print(f"❌ Error: {e}\n")
-
-# ============================================
-# CREAR DATASET DE BIGQUERY
-# ============================================
-print("="*60)
-print("🏀 CREANDO BASE DE DATOS EN BIGQUERY")
-print("="*60 + "\n")
-create_dataset_if_not_exists()
-
-print("="*60)
-print("🔄 INICIANDO PROCESO ETL")
-print("="*60 + "\n")
-
-# ===========================================
-# ETL 1: PLAYER
-# ===========================================
-print("📊 Procesando: PLAYERS")
-print("-" * 60)
-df_player = pd.read_csv(basketball_dir / "csv" / "player.csv")
-df_player = df_player.rename(columns={"full_name": "player_name", "id": "player_id"})
-
-upload_to_gcs(df_player, "nba_data/cleaned/player_cleaned.csv")
-load_to_bigquery(df_player, "players", schema_player)
-print()
-
-# ===========================================
-# ETL 2: TEAM
-# ===========================================
-print("📊 Procesando: TEAMS")
-print("-" * 60)
-df_team = pd.read_csv(basketball_dir / "csv" / "team.csv")
-df_team = df_team.rename(columns={
-    'id': 'team_id',
-    'full_name': 'team_name',
-    'abbreviation': 'team_abbreviation'
-})
-
-# Convertir year_founded a entero
-if 'year_founded' in df_team.columns:
-    df_team['year_founded'] = df_team['year_founded'].fillna(0).astype(int)
-
-upload_to_gcs(df_team, "nba_data/cleaned/team_cleaned.csv")
-load_to_bigquery(df_team, "teams", schema_team)
-print()
-
-# ===========================================
-# ETL 3: GAME
-# ===========================================
-print("📊 Procesando: GAMES")
-print("-" * 60)
-df_game = pd.read_csv(basketball_dir / "csv" / "game.csv")
-df_game["game_date"] = pd.to_datetime(df_game["game_date"], errors="coerce")
+player_csv = basketball_dir / "csv" / "player.csv"
+team_csv = basketball_dir / "csv" / "team.csv"
+game_csv = basketball_dir / "csv" / "game.csv"
+line_score_csv = basketball_dir / "csv" / "line_score.csv"
+other_stats_csv = basketball_dir / "csv" / "other_stats.csv"
+all_seasons_csv = nba_players_dir / "all_seasons.csv"
 
 fecha_corte = pd.to_datetime("1996-10-01")
-df_game = df_game[df_game["game_date"] >= fecha_corte]
-
-# Imputación - usar loc para evitar warnings
-df_game.loc[:, 'ft_pct_home'] = df_game['ft_pct_home'].fillna(df_game['ft_pct_home'].median())
-df_game.loc[:, 'ft_pct_away'] = df_game['ft_pct_away'].fillna(df_game['ft_pct_away'].median())
-df_game.loc[:, 'fg3_pct_home'] = df_game['fg3_pct_home'].fillna(df_game['fg3_pct_home'].median())
-df_game.loc[:, 'wl_home'] = df_game['wl_home'].fillna(df_game['wl_home'].mode()[0])
-df_game.loc[:, 'wl_away'] = df_game['wl_away'].fillna(df_game['wl_away'].mode()[0])
-
-df_game = df_game.drop_duplicates(subset=["game_id","team_id_home","team_id_away"], keep="first")
-
-# Transformación
-cols_comunes = ['season_id', 'game_id', 'game_date', 'season_type']
-cols_home = [col for col in df_game.columns if '_home' in col]
-cols_away = [col for col in df_game.columns if '_away' in col]
-
-df_home = df_game[cols_comunes + cols_home].copy()
-df_away = df_game[cols_comunes + cols_away].copy()
-
-df_home.columns = cols_comunes + [col.replace('_home', '') for col in cols_home]
-df_away.columns = cols_comunes + [col.replace('_away', '') for col in cols_away]
-
-df_home['team_side'] = 'home'
-df_away['team_side'] = 'away'
-
-df_game_cleaned = pd.concat([df_home, df_away], ignore_index=True)
-
-# Convertir columnas numéricas a int donde sea necesario
-int_cols = ['min', 'fgm', 'fga', 'fg3m', 'fg3a', 'ftm', 'fta', 'oreb', 'dreb', 'reb', 
-            'ast', 'stl', 'blk', 'tov', 'pf', 'pts', 'plus_minus']
-for col in int_cols:
-    if col in df_game_cleaned.columns:
-        df_game_cleaned[col] = df_game_cleaned[col].fillna(0).astype(int)
-
-upload_to_gcs(df_game_cleaned, "nba_data/cleaned/game_cleaned.csv")
-load_to_bigquery(df_game_cleaned, "games", schema_game)
-print()
 
 # ===========================================
-# ETL 4: LINE SCORE
+# TAREAS ETL (una por tabla)
 # ===========================================
-print("📊 Procesando: LINE_SCORE")
-print("-" * 60)
-df_line_score = pd.read_csv(basketball_dir / "csv" / "line_score.csv")
-df_line_score["game_date_est"] = pd.to_datetime(df_line_score["game_date_est"], errors="coerce")
-df_line_score = df_line_score.rename(columns={'game_date_est':'game_date'})
-df_line_score = df_line_score[df_line_score["game_date"] >= fecha_corte]
-
-ot_cols = [col for col in df_line_score.columns if "pts_ot" in col]
-df_line_score[ot_cols] = df_line_score[ot_cols].fillna(0)
-df_line_score = df_line_score.drop_duplicates(subset=["game_id","team_id_home","team_id_away"], keep="first")
-
-home_cols = [
-    "game_date","game_id","team_id_home","team_abbreviation_home",
-    "team_city_name_home","team_nickname_home","team_wins_losses_home",
-    "pts_qtr1_home","pts_qtr2_home","pts_qtr3_home","pts_qtr4_home",
-    "pts_ot1_home","pts_ot2_home","pts_ot3_home","pts_ot4_home",
-    "pts_ot5_home","pts_ot6_home","pts_ot7_home","pts_ot8_home",
-    "pts_ot9_home","pts_ot10_home","pts_home"
+# Cada tarea corre en su propio proceso (etl_scheduler.py). Lee el estado de
+# la corrida anterior solo para consultar hashes y marcas de agua, y devuelve
+# {"state": entrada de su tabla} si publicó; el proceso principal la guarda.
+# Cada etapa (read, clean, unpivot, save, upload, load) queda medida en el
+# log de la corrida (etl_metrics.py).
+def task_player():
+    print("📊 Procesando: PLAYERS")
+    state = load_state()
+    hashes = source_hashes([player_csv])
+    if is_unchanged(state, "player", hashes):
+        print("⏭️ PLAYERS sin cambios desde la última corrida, se omite")
+        return {}
+
+    with stage("player", "read", nbytes=file_bytes(player_csv)) as s:
+        df_player = s.out(read_table_csv(player_csv, "player"))
+    with stage("player", "clean", rows_in=len(df_player)) as s:
+        df_player = s.out(clean_player(df_player))
+    if publish_table(df_player, "player", schema_player, MODE_TRUNCATE):
+        record_table(state, "player", hashes, df_player, MODE_TRUNCATE)
+        return {"state": state["tables"]["player"]}
+    return {}
+
+
+def task_team():
+    print("📊 Procesando: TEAMS")
+    state = load_state()
+    # team.csv se lee siempre: ALL SEASONS lo necesita para el merge
+    with stage("team", "read", nbytes=file_bytes(team_csv)) as s:
+        df_team = s.out(read_table_csv(team_csv, "team"))
+    with stage("team", "clean", rows_in=len(df_team)) as s:
+        df_team = s.out(clean_team(df_team))
+
+    # year_founded sin dato queda en 0 (el plan de tipos ya lo lee como Int16)
+    if 'year_founded' in df_team.columns:
+        df_team['year_founded'] = df_team['year_founded'].fillna(0)
+
+    hashes = source_hashes([team_csv])
+    if is_unchanged(state, "team", hashes):
+        print("⏭️ TEAMS sin cambios desde la última corrida, se omite")
+        return {"df": df_team}
+    if publish_table(df_team, "team", schema_team, MODE_TRUNCATE):
+        record_table(state, "team", hashes, df_team, MODE_TRUNCATE)
+        return {"df": df_team, "state": state["tables"]["team"]}
+    return {"df": df_team}
+
+
+def task_game():
+    print("📊 Procesando: GAMES")
+    state = load_state()
+    hashes = source_hashes([game_csv])
+    if is_unchanged(state, "game", hashes):
+        print("⏭️ GAMES sin cambios desde la última corrida, se omite")
+        return {}
+
+    # Lectura por chunks con filtro de fecha (desde octubre de 1996), imputación y duplicados
+    with stage("game", "read", nbytes=file_bytes(game_csv)) as s:
+        df_game = s.out(read_csv_since(game_csv, "game", "game_date", fecha_corte))
+    with stage("game", "clean", rows_in=len(df_game)) as s:
+        df_game = s.out(clean_game(df_game))
+
+    # Solo partidos nuevos (game_id todavía no publicado)
+    df_game, modo, claves = select_new_keys(df_game, state, "game", "game_id")
+
+    # Transformación
+    with stage("game", "unpivot", rows_in=len(df_game)) as s:
+        df_game_cleaned = s.out(unpivot_home_away(df_game, GAME_COMMON_COLS, side_col='team_side'))
+
+    # Estadísticas sin dato en 0; conservan el Int16 del plan de tipos
+    int_cols = ['min', 'fgm', 'fga', 'fg3m', 'fg3a', 'ftm', 'fta', 'oreb', 'dreb', 'reb', 
+                'ast', 'stl', 'blk', 'tov', 'pf', 'pts', 'plus_minus']
+    for col in int_cols:
+        if col in df_game_cleaned.columns:
+            df_game_cleaned[col] = df_game_cleaned[col].fillna(0)
+
+    if publish_table(df_game_cleaned, "game", schema_game, modo):
+        record_table(state, "game", hashes, df_game_cleaned, modo, ["game_id", "game_date"], claves)
+        # TEAM_SEASON suma estos partidos (los nuevos, en modo append)
+        return {"df": df_game_cleaned, "mode": modo, "state": state["tables"]["game"]}
+    return {}
+
+
+def task_team_season(game):
+    print("📊 Procesando: TEAM_SEASON")
+    state = load_state()
+    if "df" in game:
+        df_game, modo = game["df"], game["mode"]
+        hashes = game["state"]["sources"]
+    elif "team_season" not in state["tables"] and "game" in state["tables"]:
+        # GAME no cambió pero team_season nunca se publicó: se arma desde game_cleaned
+        df_game, modo = read_cleaned(cleaned_dir, "game"), MODE_TRUNCATE
+        hashes = state["tables"]["game"]["sources"]
+        if df_game is None:
+            print("⏭️ TEAM_SEASON: no hay game_cleaned en disco, se omite")
+            return {}
+    else:
+        print("⏭️ TEAM_SEASON sin partidos nuevos, se omite")
+        return {}
+
+    # Con partidos nuevos se suman a la tabla guardada; sin ella, se recalcula desde game_cleaned
+    previous = read_cleaned(cleaned_dir, "team_season") if modo == MODE_APPEND else None
+    if modo == MODE_APPEND and previous is None:
+        df_game = read_cleaned(cleaned_dir, "game")
+    with stage("team_season", "aggregate", rows_in=len(df_game)) as s:
+        df_team_season = s.out(build_team_season(df_game, previous))
+
+    # Son ~30 filas por temporada: la tabla se reemplaza completa
+    if publish_table(df_team_season, "team_season", schema_team_season, MODE_TRUNCATE):
+        record_table(state, "team_season", hashes, df_team_season, MODE_TRUNCATE)
+        return {"state": state["tables"]["team_season"]}
+    return {}
+
+
+def task_line_score():
+    print("📊 Procesando: LINE_SCORE")
+    state = load_state()
+    hashes = source_hashes([line_score_csv])
+    if is_unchanged(state, "line_score", hashes):
+        print("⏭️ LINE_SCORE sin cambios desde la última corrida, se omite")
+        return {}
+
+    with stage("line_score", "read", nbytes=file_bytes(line_score_csv)) as s:
+        df_line_score = s.out(read_csv_since(line_score_csv, "line_score", "game_date_est", fecha_corte))
+    with stage("line_score", "clean", rows_in=len(df_line_score)) as s:
+        df_line_score = s.out(clean_line_score(df_line_score))
+
+    # Solo partidos nuevos (game_id todavía no publicado)
+    df_line_score, modo, claves = select_new_keys(df_line_score, state, "line_score", "game_id")
+
+    # Una fila por equipo: local (home) y visitante (away)
+    with stage("line_score", "unpivot", rows_in=len(df_line_score)) as s:
+        df_line_score_cleaned = s.out(unpivot_home_away(
+            df_line_score, LINE_SCORE_COMMON_COLS, LINE_SCORE_TEAM_COLS, side_col="local_visitante"
+        ))
+
+    # Puntos por período sin dato en 0; conservan el Int16 del plan de tipos
+    pts_cols = ['pts_qtr1', 'pts_qtr2', 'pts_qtr3', 'pts_qtr4',
+                'pts_ot1', 'pts_ot2', 'pts_ot3', 'pts_ot4', 'pts_ot5',
+                'pts_ot6', 'pts_ot7', 'pts_ot8', 'pts_ot9', 'pts_ot10', 'pts']
+    for col in pts_cols:
+        if col in df_line_score_cleaned.columns:
+            df_line_score_cleaned[col] = df_line_score_cleaned[col].fillna(0)
+
+    # team_id sin dato en 0; conserva el Int32 del plan de tipos
+    if 'team_id' in df_line_score_cleaned.columns:
+        df_line_score_cleaned['team_id'] = df_line_score_cleaned['team_id'].fillna(0)
+
+    if publish_table(df_line_score_cleaned, "line_score", schema_line_score, modo):
+        record_table(state, "line_score", hashes, df_line_score_cleaned, modo, ["game_id", "game_date"],
+                     claves)
+        return {"state": state["tables"]["line_score"]}
+    return {}
+
+
+def task_all_seasons(team):
+    print("📊 Procesando: ALL_SEASONS")
+    state = load_state()
+    # Depende también de team.csv por el merge de team_id / team_name
+    hashes = source_hashes([all_seasons_csv, team_csv])
+    if is_unchanged(state, "all_seasons", hashes):
+        print("⏭️ ALL_SEASONS sin cambios desde la última corrida, se omite")
+        return {}
+
+    with stage("all_seasons", "read", nbytes=file_bytes(all_seasons_csv)) as s:
+        df_all_seasons = s.out(read_table_csv(all_seasons_csv, "all_seasons"))
+    with stage("all_seasons", "clean", rows_in=len(df_all_seasons)) as s:
+        df_all_seasons = s.out(clean_all_seasons(df_all_seasons, team["df"]))
+
+    # Solo temporadas nuevas (season mayor a la marca de agua, ej: '2023-24')
+    df_all_seasons, modo = select_increment(df_all_seasons, state, "all_seasons", "season")
+
+    if publish_table(df_all_seasons, "all_seasons", schema_all_seasons, modo):
+        record_table(state, "all_seasons", hashes, df_all_seasons, modo, ["season"])
+        return {"state": state["tables"]["all_seasons"]}
+    return {}
+
+
+def task_other_stats():
+    print("📊 Procesando: OTHER_STATS")
+    state = load_state()
+    hashes = source_hashes([other_stats_csv])
+    if is_unchanged(state, "other_stats", hashes):
+        print("⏭️ OTHER_STATS sin cambios desde la última corrida, se omite")
+        return {}
+
+    with stage("other_stats", "read", nbytes=file_bytes(other_stats_csv)) as s:
+        df_other_stats = s.out(read_table_csv(other_stats_csv, "other_stats"))
+    # Eliminar duplicados y pasar a una fila por equipo
+    with stage("other_stats", "clean", rows_in=len(df_other_stats)) as s:
+        df_other_stats_cleaned = s.out(clean_other_stats(df_other_stats))
+
+    # Solo partidos nuevos (game_id todavía no publicado)
+    df_other_stats_cleaned, modo, claves = select_new_keys(df_other_stats_cleaned, state, "other_stats",
+                                                           "game_id")
+
+    if publish_table(df_other_stats_cleaned, "other_stats", schema_other_stats, modo):
+        record_table(state, "other_stats", hashes, df_other_stats_cleaned, modo, ["game_id"], claves)
+        return {"mode": modo, "state": state["tables"]["other_stats"]}
+    return {}
+
+
+def task_game_advanced(game, other_stats):
+    print("📊 Procesando: GAME_ADVANCED")
+    state = load_state()
+    published = "game_advanced" in state["tables"]
+    if published and "state" not in game and "state" not in other_stats:
+        print("⏭️ GAME_ADVANCED sin cambios en GAME ni OTHER_STATS, se omite")
+        return {}
+
+    # Partidos nuevos de GAME: se agregan solo sus filas. Cualquier otro cambio
+    # (reconstrucción de GAME, OTHER_STATS de partidos ya cargados) reconstruye la tabla.
+    if published and game.get("mode") == MODE_APPEND and other_stats.get("mode") != MODE_TRUNCATE:
+        df_game, modo = game["df"], MODE_APPEND
+    else:
+        df_game, modo = read_cleaned(cleaned_dir, "game"), MODE_TRUNCATE
+    # other_stats_cleaned ya incluye lo publicado en esta corrida
+    df_other_stats = read_cleaned(cleaned_dir, "other_stats")
+    if df_game is None:
+        print("⏭️ GAME_ADVANCED: no hay game_cleaned en disco, se omite")
+        return {}
+
+    with stage("game_advanced", "metrics", rows_in=len(df_game)) as s:
+        df_game_advanced = s.out(build_game_advanced(df_game, df_other_stats))
+    hashes = {}
+    for table, result in (("game", game), ("other_stats", other_stats)):
+        hashes.update(result.get("state", state["tables"].get(table, {})).get("sources", {}))
+    if publish_table(df_game_advanced, "game_advanced", schema_game_advanced, modo):
+        record_table(state, "game_advanced", hashes, df_game_advanced, modo, ["game_id", "game_date"])
+        return {"state": state["tables"]["game_advanced"]}
+    return {}
+
+
+TASKS = [
+    Task("player", task_player),
+    Task("team", task_team),
+    Task("game", task_game),
+    Task("team_season", task_team_season, deps=("game",)),
+    Task("line_score", task_line_score),
+    Task("all_seasons", task_all_seasons, deps=("team",)),
+    Task("other_stats", task_other_stats),
+    Task("game_advanced", task_game_advanced, deps=("game", "other_stats")),
 ]
 
-away_cols = [
-    "game_date","game_id","team_id_away","team_abbreviation_away",
-    "team_city_name_away","team_nickname_away","team_wins_losses_away",
-    "pts_qtr1_away","pts_qtr2_away","pts_qtr3_away","pts_qtr4_away",
-    "pts_ot1_away","pts_ot2_away","pts_ot3_away","pts_ot4_away",
-    "pts_ot5_away","pts_ot6_away","pts_ot7_away","pts_ot8_away",
-    "pts_ot9_away","pts_ot10_away","pts_away"
-]
-
-df_home_line_score = df_line_score[home_cols].copy()
-df_home_line_score = df_home_line_score.rename(columns=lambda x: x.replace("_home",""))
-df_home_line_score["local_visitante"] = "home"
-
-df_away_line_score = df_line_score[away_cols].copy()
-df_away_line_score = df_away_line_score.rename(columns=lambda x: x.replace("_away",""))
-df_away_line_score["local_visitante"] = "away"
-
-df_line_score_cleaned = pd.concat([df_home_line_score, df_away_line_score], ignore_index=True)
-
-# Convertir columnas de puntos a enteros
-pts_cols = ['pts_qtr1', 'pts_qtr2', 'pts_qtr3', 'pts_qtr4',
-            'pts_ot1', 'pts_ot2', 'pts_ot3', 'pts_ot4', 'pts_ot5',
-            'pts_ot6', 'pts_ot7', 'pts_ot8', 'pts_ot9', 'pts_ot10', 'pts']
-for col in pts_cols:
-    if col in df_line_score_cleaned.columns:
-        df_line_score_cleaned[col] = df_line_score_cleaned[col].fillna(0).astype(int)
-
-# Convertir team_id a entero
-if 'team_id' in df_line_score_cleaned.columns:
-    df_line_score_cleaned['team_id'] = df_line_score_cleaned['team_id'].fillna(0).astype(int)
-
-upload_to_gcs(df_line_score_cleaned, "nba_data/cleaned/line_score_cleaned.csv")
-load_to_bigquery(df_line_score_cleaned, "line_score", schema_line_score)
-print()
+# ============================================
+# DESCARGA DE KAGGLE
+# ============================================
+def download_dataset(api, dataset, path, members):
+    """
+    Descarga un dataset de Kaggle y extrae solo los archivos usados por el ETL
+
+    El zip se conserva en disco, así Kaggle omite la descarga (force=False)
+    cuando el dataset no cambió, y cada archivo se vuelve a extraer solo si
+    el zip es más nuevo que la copia local.
+    """
+    with stage(dataset, "download") as s:
+        api.dataset_download_files(dataset, path=str(path), unzip=False, force=False)
+        zip_path = Path(path) / f"{dataset.split('/')[1]}.zip"
+        with zipfile.ZipFile(zip_path) as zf:
+            for member in members:
+                destino = Path(path) / member
+                if not destino.exists() or destino.stat().st_mtime < zip_path.stat().st_mtime:
+                    zf.extract(member, path)
+                    print(f"   📄 Extraído: {member}")
+        s.nbytes = file_bytes(zip_path)
+
+def download_datasets():
+    """Autentica con Kaggle y descarga los archivos fuente del ETL"""
+    kaggle_username = os.getenv('KAGGLE_USERNAME')
+    kaggle_key = os.getenv('KAGGLE_KEY')
+
+    os.environ['KAGGLE_USERNAME'] = kaggle_username
+    os.environ['KAGGLE_KEY'] = kaggle_key
+
+    print("✅ Credenciales de Kaggle cargadas correctamente desde .env")
+    print(f"   Usuario: {kaggle_username}\n")
+
+    from kaggle.api.kaggle_api_extended import KaggleApi
+
+    api = KaggleApi()
+    api.authenticate()
+    print("✅ Autenticación exitosa con Kaggle API\n")
+
+    basketball_dir.mkdir(parents=True, exist_ok=True)
+    nba_players_dir.mkdir(parents=True, exist_ok=True)
+
+    print("📥 Iniciando descarga de datasets de Kaggle...\n")
+
+    print("1️⃣ Descargando: Basketball Database")
+    print("-" * 60)
+    try:
+        download_dataset(api, 'wyattowalsh/basketball', basketball_dir,
+                         ["csv/player.csv", "csv/team.csv", "csv/game.csv", "csv/line_score.csv", "csv/other_stats.csv"])
+        print(f"✅ Descargado exitosamente\n")
+    except Exception as e:
+        print(f"❌ Error: {e}\n")
 
-# ===========================================
-# ETL 5: ALL SEASONS
-# ===========================================
-print("📊 Procesando: ALL_SEASONS")
-print("-" * 60)
-df_all_seasons = pd.read_csv(nba_players_dir / "all_seasons.csv")
-df_all_seasons = df_all_seasons.drop(columns=["Unnamed: 0"])
-df_all_seasons["college"] = df_all_seasons["college"].fillna("No College")
-
-df_all_seasons["team_abbreviation"] = df_all_seasons["team_abbreviation"].str.strip().str.upper()
-
-correcciones = {
-    "VAN": "MEM", "CHH": "CHA", "SEA": "OKC",
-    "NJN": "BKN", "NOH": "NOP", "NOK": "NOP", "CHO": "CHA"
-}
-
-df_all_seasons["team_abbreviation"] = df_all_seasons["team_abbreviation"].replace(correcciones)
-df_all_seasons = df_all_seasons.drop(columns=["team_id", "team_name"], errors="ignore")
-
-df_all_seasons = pd.merge(
-    df_all_seasons,
-    df_team[["team_id", "team_name", "team_abbreviation"]],
-    on="team_abbreviation",
-    how="left"
-)
-
-upload_to_gcs(df_all_seasons, "nba_data/cleaned/all_seasons_cleaned.csv")
-load_to_bigquery(df_all_seasons, "all_seasons", schema_all_seasons)
-print()
-
-print("="*60)
-print("✅ PROCESO ETL COMPLETADO")
-print("="*60)
-print(f"\n📦 Cloud Storage: gs://{BUCKET_NAME}/nba_data/cleaned/")
-print(f"📊 BigQuery: {PROJECT_ID}.{DATASET_ID}")
-print("\n💡 Tablas disponibles:")
-print("   - players")
-print("   - teams")
-print("   - games")
-print("   - line_score")
-print("   - all_seasons")
\ No newline at end of file
+    print("2️⃣ Descargando: NBA Players Data")
+    print("-" * 60)
+    try:
+        download_dataset(api, 'justinas/nba-players-data', nba_players_dir, ["all_seasons.csv"])
+        print(f"✅ Descargado exitosamente\n")
+    except Exception as e:
+        print(f"❌ Error: {e}\n")
+
+
+if __name__ == "__main__":
+    download_datasets()
+
+    # ============================================
+    # CREAR DATASET DE BIGQUERY
+    # ============================================
+    print("="*60)
+    print("🏀 CREANDO BASE DE DATOS EN BIGQUERY")
+    print("="*60 + "\n")
+    create_dataset_if_not_exists()
+
+    print("="*60)
+    print("🔄 INICIANDO PROCESO ETL")
+    print("="*60 + "\n")
+
+    # Estado de la corrida anterior (hashes de archivos fuente y marcas de agua)
+    state = load_state()
+    os.environ["ETL_RUN_ID"] = run_id
+
+    def guardar_estado(table, result):
+        # Se guarda al terminar cada tabla, así una falla posterior no pierde lo ya publicado
+        if result.get("state"):
+            state["tables"][table] = result["state"]
+            save_state(state)
+
+    run_tasks(TASKS, on_result=guardar_estado)
+    print()
+    print_run_summary(run_id)
+    print()
+
+    print("="*60)
+    print("✅ PROCESO ETL COMPLETADO")
+    print("="*60)
+    print(f"\n📦 Cloud Storage: gs://{BUCKET_NAME}/nba_data/cleaned/")
+    print(f"📊 BigQuery: {PROJECT_ID}.{DATASET_ID}")
+    print("\n💡 Tablas disponibles:")
+    print("   - players")
+    print("   - teams")
+    print("   - games")
+    print("   - line_score")
+    print("   - all_seasons")
+    print("   - other_stats")
+    print("   - team_season")
+    print("   - game_advanced")
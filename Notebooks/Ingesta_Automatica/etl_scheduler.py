@@ -0,0 +1,180 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# ============================================
+# PLANIFICADOR DE TAREAS DEL ETL
+# ============================================
+# Cada tabla es una tarea con nombre y dependencias declaradas. Las tareas
+# sin dependencias pendientes se ejecutan en paralelo en un pool de procesos;
+# el resultado de cada dependencia se pasa como argumento con su nombre
+# (ej: all_seasons recibe team=<resultado de la tarea team>).
+#
+# ETL_WORKERS: procesos del pool (por defecto, uno por CPU). Con 1 las tareas
+# se ejecutan en orden dentro del proceso principal.
+WORKERS = int(os.getenv("ETL_WORKERS", "0")) or os.cpu_count()
+
+Task = namedtuple("Task", ["name", "func", "deps"], defaults=[()])
+
+
+def _run_timed(func, kwargs):
+    """Ejecuta una tarea y devuelve (resultado, inicio, fin) en tiempo de reloj"""
+    start = time.time()
+    result = func(**kwargs)
+    return result, start, time.time()
+
+
+def _check_graph(tasks):
+    """Valida nombres únicos, dependencias existentes y ausencia de ciclos"""
+    names = [task.name for task in tasks]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Nombres de tareas repetidos: {names}")
+    by_name = {task.name: task for task in tasks}
+    for task in tasks:
+        for dep in task.deps:
+            if dep not in by_name:
+                raise ValueError(f"La tarea '{task.name}' depende de '{dep}', que no existe")
+
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Ciclo de dependencias en la tarea '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in names:
+        visit(name)
+
+
+def critical_path(tasks, timings):
+    """
+    Calcula la cadena de dependencias con mayor duración acumulada
+
+    Args:
+        tasks: lista de Task
+        timings: {nombre: (inicio, fin)} de las tareas ejecutadas
+
+    Returns:
+        (lista de nombres en orden, duración total en segundos)
+    """
+    by_name = {task.name: task for task in tasks}
+    best = {}
+
+    def longest(name):
+        if name not in best:
+            start, end = timings[name]
+            prev = max((longest(dep) for dep in by_name[name].deps if dep in timings),
+                       key=lambda item: item[1], default=([], 0.0))
+            best[name] = (prev[0] + [name], prev[1] + (end - start))
+        return best[name]
+
+    return max((longest(name) for name in timings), key=lambda item: item[1], default=([], 0.0))
+
+
+def print_summary(tasks, timings, status, wall_time):
+    """Imprime duración por tarea y el resumen de la ruta crítica"""
+    t0 = min((start for start, _ in timings.values()), default=0.0)
+    print("=" * 60)
+    print("⏱️ RESUMEN DE TAREAS")
+    print("=" * 60)
+    print(f"{'tarea':<14}{'estado':<10}{'inicio_s':>10}{'duración_s':>12}  dependencias")
+    for task in tasks:
+        if task.name in timings:
+            start, end = timings[task.name]
+            print(f"{task.name:<14}{status[task.name]:<10}{start - t0:>10.2f}{end - start:>12.2f}  {', '.join(task.deps) or '-'}")
+        else:
+            print(f"{task.name:<14}{status[task.name]:<10}{'-':>10}{'-':>12}  {', '.join(task.deps) or '-'}")
+
+    path, path_time = critical_path(tasks, timings)
+    serial_time = sum(end - start for start, end in timings.values())
+    print("-" * 60)
+    print(f"Ruta crítica: {' → '.join(path) or '-'} ({path_time:.2f} s)")
+    print(f"Tiempo total: {wall_time:.2f} s | suma de tareas: {serial_time:.2f} s"
+          + (f" | aceleración x{serial_time / wall_time:.2f}" if wall_time > 0 else ""))
+
+
+def run_tasks(tasks, max_workers=None, on_result=None):
+    """
+    Ejecuta las tareas respetando sus dependencias
+
+    Si una tarea falla, sus dependientes se marcan como omitidas y el resto
+    sigue ejecutándose.
+
+    Args:
+        tasks: lista de Task(name, func, deps)
+        max_workers: procesos del pool (por defecto ETL_WORKERS)
+        on_result: función opcional (nombre, resultado) llamada en el proceso
+            principal apenas termina cada tarea (ej: guardar el estado)
+
+    Returns:
+        {nombre: resultado} de las tareas que terminaron bien
+    """
+    _check_graph(tasks)
+    max_workers = max_workers or WORKERS
+    pending = {task.name: task for task in tasks}
+    results, timings, status = {}, {}, {task.name: "pendiente" for task in tasks}
+    wall_start = time.time()
+
+    def ready():
+        return [task for task in pending.values() if all(dep in results for dep in task.deps)]
+
+    def skip_blocked():
+        # Dependientes de tareas fallidas: no se van a poder ejecutar
+        changed = True
+        while changed:
+            changed = False
+            for task in list(pending.values()):
+                if any(status[dep] in ("error", "omitida") for dep in task.deps):
+                    status[task.name] = "omitida"
+                    del pending[task.name]
+                    changed = True
+
+    def finish(task, outcome):
+        try:
+            result, start, end = outcome()
+            results[task.name] = result
+            timings[task.name] = (start, end)
+            status[task.name] = "ok"
+            if on_result is not None:
+                on_result(task.name, result)
+        except Exception as e:
+            status[task.name] = "error"
+            print(f"❌ Tarea {task.name} falló: {e}")
+
+    if max_workers == 1:
+        while pending:
+            batch = ready()
+            if not batch:
+                skip_blocked()
+                continue
+            task = batch[0]
+            del pending[task.name]
+            kwargs = {dep: results[dep] for dep in task.deps}
+            finish(task, lambda: _run_timed(task.func, kwargs))
+            skip_blocked()
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            running = {}
+            while pending or running:
+                for task in ready():
+                    del pending[task.name]
+                    kwargs = {dep: results[dep] for dep in task.deps}
+                    running[pool.submit(_run_timed, task.func, kwargs)] = task
+                    status[task.name] = "corriendo"
+                if not running:
+                    skip_blocked()
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result)
+                skip_blocked()
+
+    print_summary(tasks, timings, status, time.time() - wall_start)
+    return results
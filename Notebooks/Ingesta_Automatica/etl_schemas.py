@@ -0,0 +1,337 @@
+# ============================================
+# ESQUEMAS DE LAS TABLAS LIMPIAS
+# ============================================
+# Definición única de columnas, tipos y modos de las tablas limpias del
+# proyecto. etl_project_gcp_bq.py construye sus schema_* de BigQuery a partir
+# de estas listas y etl_io.py las usa para escribir Parquet tipado.
+
+SCHEMAS = {
+    "player": [
+        ("player_id", "INTEGER", "REQUIRED"),
+        ("player_name", "STRING", "REQUIRED"),
+        ("first_name", "STRING", "NULLABLE"),
+        ("last_name", "STRING", "NULLABLE"),
+        ("is_active", "BOOLEAN", "NULLABLE"),
+    ],
+    "team": [
+        ("team_id", "INTEGER", "REQUIRED"),
+        ("team_name", "STRING", "REQUIRED"),
+        ("team_abbreviation", "STRING", "REQUIRED"),
+        ("nickname", "STRING", "NULLABLE"),
+        ("city", "STRING", "NULLABLE"),
+        ("state", "STRING", "NULLABLE"),
+        ("year_founded", "INTEGER", "NULLABLE"),
+    ],
+    "game": [
+        ("season_id", "INTEGER", "REQUIRED"),
+        ("game_id", "STRING", "REQUIRED"),
+        ("game_date", "DATE", "REQUIRED"),
+        ("season_type", "STRING", "NULLABLE"),
+        ("team_id", "INTEGER", "REQUIRED"),
+        ("team_abbreviation", "STRING", "NULLABLE"),
+        ("team_name", "STRING", "NULLABLE"),
+        ("team_side", "STRING", "REQUIRED"),
+        ("matchup", "STRING", "NULLABLE"),
+        ("wl", "STRING", "NULLABLE"),
+        ("min", "INTEGER", "NULLABLE"),
+        ("fgm", "INTEGER", "NULLABLE"),
+        ("fga", "INTEGER", "NULLABLE"),
+        ("fg_pct", "FLOAT", "NULLABLE"),
+        ("fg3m", "INTEGER", "NULLABLE"),
+        ("fg3a", "INTEGER", "NULLABLE"),
+        ("fg3_pct", "FLOAT", "NULLABLE"),
+        ("ftm", "INTEGER", "NULLABLE"),
+        ("fta", "INTEGER", "NULLABLE"),
+        ("ft_pct", "FLOAT", "NULLABLE"),
+        ("oreb", "INTEGER", "NULLABLE"),
+        ("dreb", "INTEGER", "NULLABLE"),
+        ("reb", "INTEGER", "NULLABLE"),
+        ("ast", "INTEGER", "NULLABLE"),
+        ("stl", "INTEGER", "NULLABLE"),
+        ("blk", "INTEGER", "NULLABLE"),
+        ("tov", "INTEGER", "NULLABLE"),
+        ("pf", "INTEGER", "NULLABLE"),
+        ("pts", "INTEGER", "NULLABLE"),
+        ("plus_minus", "INTEGER", "NULLABLE"),
+        ("video_available", "INTEGER", "NULLABLE"),
+    ],
+    "line_score": [
+        ("game_date", "DATE", "REQUIRED"),
+        ("game_id", "STRING", "REQUIRED"),
+        ("team_id", "INTEGER", "REQUIRED"),
+        ("team_abbreviation", "STRING", "NULLABLE"),
+        ("team_city_name", "STRING", "NULLABLE"),
+        ("team_nickname", "STRING", "NULLABLE"),
+        ("team_wins_losses", "STRING", "NULLABLE"),
+        ("pts_qtr1", "INTEGER", "NULLABLE"),
+        ("pts_qtr2", "INTEGER", "NULLABLE"),
+        ("pts_qtr3", "INTEGER", "NULLABLE"),
+        ("pts_qtr4", "INTEGER", "NULLABLE"),
+        ("pts_ot1", "INTEGER", "NULLABLE"),
+        ("pts_ot2", "INTEGER", "NULLABLE"),
+        ("pts_ot3", "INTEGER", "NULLABLE"),
+        ("pts_ot4", "INTEGER", "NULLABLE"),
+        ("pts_ot5", "INTEGER", "NULLABLE"),
+        ("pts_ot6", "INTEGER", "NULLABLE"),
+        ("pts_ot7", "INTEGER", "NULLABLE"),
+        ("pts_ot8", "INTEGER", "NULLABLE"),
+        ("pts_ot9", "INTEGER", "NULLABLE"),
+        ("pts_ot10", "INTEGER", "NULLABLE"),
+        ("pts", "INTEGER", "NULLABLE"),
+        ("local_visitante", "STRING", "REQUIRED"),
+    ],
+    "all_seasons": [
+        ("player_name", "STRING", "REQUIRED"),
+        ("team_abbreviation", "STRING", "REQUIRED"),
+        ("age", "FLOAT", "NULLABLE"),
+        ("player_height", "FLOAT", "NULLABLE"),
+        ("player_weight", "FLOAT", "NULLABLE"),
+        ("college", "STRING", "NULLABLE"),
+        ("country", "STRING", "NULLABLE"),
+        ("draft_year", "STRING", "NULLABLE"),
+        ("draft_round", "STRING", "NULLABLE"),
+        ("draft_number", "STRING", "NULLABLE"),
+        ("gp", "FLOAT", "NULLABLE"),
+        ("pts", "FLOAT", "NULLABLE"),
+        ("reb", "FLOAT", "NULLABLE"),
+        ("ast", "FLOAT", "NULLABLE"),
+        ("net_rating", "FLOAT", "NULLABLE"),
+        ("oreb_pct", "FLOAT", "NULLABLE"),
+        ("dreb_pct", "FLOAT", "NULLABLE"),
+        ("usg_pct", "FLOAT", "NULLABLE"),
+        ("ts_pct", "FLOAT", "NULLABLE"),
+        ("ast_pct", "FLOAT", "NULLABLE"),
+        ("season", "STRING", "NULLABLE"),
+        ("team_id", "INTEGER", "NULLABLE"),
+        ("team_name", "STRING", "NULLABLE"),
+    ],
+    "other_stats": [
+        ("game_id", "STRING", "REQUIRED"),
+        ("league_id", "STRING", "NULLABLE"),
+        ("lead_changes", "INTEGER", "NULLABLE"),
+        ("times_tied", "INTEGER", "NULLABLE"),
+        ("team_id", "INTEGER", "REQUIRED"),
+        ("team_abbreviation", "STRING", "NULLABLE"),
+        ("team_city", "STRING", "NULLABLE"),
+        ("pts_paint", "INTEGER", "NULLABLE"),
+        ("pts_2nd_chance", "INTEGER", "NULLABLE"),
+        ("pts_fb", "INTEGER", "NULLABLE"),
+        ("largest_lead", "INTEGER", "NULLABLE"),
+        ("team_turnovers", "INTEGER", "NULLABLE"),
+        ("total_turnovers", "INTEGER", "NULLABLE"),
+        ("team_rebounds", "INTEGER", "NULLABLE"),
+        ("pts_off_to", "INTEGER", "NULLABLE"),
+        ("team_side", "STRING", "REQUIRED"),
+    ],
+    "team_season": [
+        ("team_id", "INTEGER", "REQUIRED"),
+        ("season_id", "INTEGER", "REQUIRED"),
+        ("team_abbreviation", "STRING", "NULLABLE"),
+        ("team_name", "STRING", "NULLABLE"),
+        ("games", "INTEGER", "REQUIRED"),
+        ("wins", "INTEGER", "REQUIRED"),
+        ("losses", "INTEGER", "REQUIRED"),
+        ("home_games", "INTEGER", "REQUIRED"),
+        ("home_wins", "INTEGER", "REQUIRED"),
+        ("away_games", "INTEGER", "REQUIRED"),
+        ("away_wins", "INTEGER", "REQUIRED"),
+        ("pts", "INTEGER", "REQUIRED"),
+        ("opp_pts", "INTEGER", "REQUIRED"),
+        ("fga", "INTEGER", "REQUIRED"),
+        ("oreb", "INTEGER", "REQUIRED"),
+        ("tov", "INTEGER", "REQUIRED"),
+        ("fta", "INTEGER", "REQUIRED"),
+        ("opp_fga", "INTEGER", "REQUIRED"),
+        ("opp_oreb", "INTEGER", "REQUIRED"),
+        ("opp_tov", "INTEGER", "REQUIRED"),
+        ("opp_fta", "INTEGER", "REQUIRED"),
+        ("win_pct", "FLOAT", "NULLABLE"),
+        ("home_win_pct", "FLOAT", "NULLABLE"),
+        ("away_win_pct", "FLOAT", "NULLABLE"),
+        ("pts_avg", "FLOAT", "NULLABLE"),
+        ("opp_pts_avg", "FLOAT", "NULLABLE"),
+        ("point_diff_avg", "FLOAT", "NULLABLE"),
+        ("possessions_avg", "FLOAT", "NULLABLE"),
+        ("pace", "FLOAT", "NULLABLE"),
+    ],
+    "game_advanced": [
+        ("season_id", "INTEGER", "REQUIRED"),
+        ("game_id", "STRING", "REQUIRED"),
+        ("game_date", "DATE", "REQUIRED"),
+        ("season_type", "STRING", "NULLABLE"),
+        ("team_id", "INTEGER", "REQUIRED"),
+        ("team_abbreviation", "STRING", "NULLABLE"),
+        ("team_side", "STRING", "REQUIRED"),
+        ("wl", "STRING", "NULLABLE"),
+        ("pts", "INTEGER", "NULLABLE"),
+        ("opp_pts", "INTEGER", "NULLABLE"),
+        ("possessions", "FLOAT", "NULLABLE"),
+        ("ortg", "FLOAT", "NULLABLE"),
+        ("drtg", "FLOAT", "NULLABLE"),
+        ("efg_pct", "FLOAT", "NULLABLE"),
+        ("tov_rate", "FLOAT", "NULLABLE"),
+        ("net_rtg", "FLOAT", "NULLABLE"),
+        ("pts_paint", "INTEGER", "NULLABLE"),
+        ("pts_2nd_chance", "INTEGER", "NULLABLE"),
+        ("pts_fb", "INTEGER", "NULLABLE"),
+        ("pts_off_to", "INTEGER", "NULLABLE"),
+        ("largest_lead", "INTEGER", "NULLABLE"),
+        ("lead_changes", "INTEGER", "NULLABLE"),
+        ("times_tied", "INTEGER", "NULLABLE"),
+        ("team_turnovers", "INTEGER", "NULLABLE"),
+        ("total_turnovers", "INTEGER", "NULLABLE"),
+        ("team_rebounds", "INTEGER", "NULLABLE"),
+    ],
+}
+
+# Nombre de cada tabla en BigQuery
+BQ_TABLES = {
+    "player": "players",
+    "team": "teams",
+    "game": "games",
+    "line_score": "line_score",
+    "all_seasons": "all_seasons",
+    "other_stats": "other_stats",
+    "team_season": "team_season",
+    "game_advanced": "game_advanced",
+}
+
+# ============================================
+# PLAN DE TIPOS EN MEMORIA (pandas)
+# ============================================
+# dtype de pandas de cada columna al leer las tablas, crudas o limpias. Las
+# columnas <col>_home / <col>_away de los CSV anchos usan el tipo de <col>.
+#   - category: textos con pocos valores distintos (equipos, wl, lado, país...)
+#   - string[pyarrow]: ids como game_id ("0029600012") conservan los ceros a la izquierda
+#   - Int8/Int16/Int32: enteros chicos, nullable (los contadores tienen nulos
+#     en partidos antiguos y en el CSV vienen como "41.0")
+#   - float32: porcentajes de tiro con 3 decimales (se escriben igual en CSV)
+#   - date: se lee como texto y se convierte con pd.to_datetime
+# Las métricas de all_seasons quedan en float64: alimentan el puntaje global
+# y el modelo, que deben dar los mismos resultados que antes.
+_COUNT = "Int16"
+_TEXT = "string[pyarrow]"
+
+DTYPE_PLAN = {
+    "player": {
+        "id": "Int32", "player_id": "Int32",
+        "full_name": _TEXT, "player_name": _TEXT,
+        "first_name": _TEXT, "last_name": _TEXT,
+        "is_active": "Int8",
+    },
+    "team": {
+        "id": "Int32", "team_id": "Int32",
+        # ~30 filas: una categórica ocuparía más que el texto
+        "full_name": _TEXT, "team_name": _TEXT,
+        "abbreviation": _TEXT, "team_abbreviation": _TEXT,
+        "nickname": _TEXT, "city": _TEXT, "state": _TEXT,
+        "year_founded": "Int16",
+    },
+    "game": {
+        "season_id": "Int32", "game_id": _TEXT, "game_date": "date",
+        "season_type": "category",
+        "team_id": "Int32", "team_abbreviation": "category", "team_name": "category",
+        "matchup": _TEXT, "wl": "category", "team_side": "category",
+        "min": _COUNT,
+        "fgm": _COUNT, "fga": _COUNT, "fg_pct": "float32",
+        "fg3m": _COUNT, "fg3a": _COUNT, "fg3_pct": "float32",
+        "ftm": _COUNT, "fta": _COUNT, "ft_pct": "float32",
+        "oreb": _COUNT, "dreb": _COUNT, "reb": _COUNT,
+        "ast": _COUNT, "stl": _COUNT, "blk": _COUNT,
+        "tov": _COUNT, "pf": _COUNT, "pts": _COUNT,
+        "plus_minus": _COUNT,
+        "video_available": "Int8",
+    },
+    "line_score": {
+        "game_date_est": "date", "game_date": "date", "game_id": _TEXT,
+        "team_id": "Int32", "team_abbreviation": "category",
+        "team_city_name": "category", "team_nickname": "category",
+        "team_wins_losses": _TEXT, "local_visitante": "category",
+        **{f"pts_qtr{i}": _COUNT for i in range(1, 5)},
+        **{f"pts_ot{i}": _COUNT for i in range(1, 11)},
+        "pts": _COUNT,
+    },
+    "other_stats": {
+        "game_id": _TEXT, "league_id": "category",
+        "lead_changes": _COUNT, "times_tied": _COUNT,
+        "team_id": "Int32", "team_abbreviation": "category", "team_city": "category",
+        "pts_paint": _COUNT, "pts_2nd_chance": _COUNT, "pts_fb": _COUNT,
+        "largest_lead": _COUNT, "team_turnovers": _COUNT,
+        "total_turnovers": _COUNT, "team_rebounds": _COUNT,
+        "pts_off_to": _COUNT, "team_side": "category",
+    },
+    "all_seasons": {
+        "player_name": _TEXT, "team_abbreviation": "category",
+        "age": "float32", "player_height": "float64", "player_weight": "float64",
+        "college": "category", "country": "category",
+        "draft_year": "category", "draft_round": "category", "draft_number": "category",
+        "gp": _COUNT, "season": "category",
+        "team_id": "Int32", "team_name": "category",
+    },
+    # Las sumas y promedios de team_season quedan en int64 / float64
+    "team_season": {
+        "team_id": "Int32", "season_id": "Int32",
+        "team_abbreviation": _TEXT, "team_name": _TEXT,
+    },
+    # Las métricas por posesión quedan en float64
+    "game_advanced": {
+        "season_id": "Int32", "game_id": _TEXT, "game_date": "date",
+        "season_type": "category", "team_id": "Int32", "team_abbreviation": "category",
+        "team_side": "category", "wl": "category",
+        "pts": _COUNT, "opp_pts": _COUNT,
+        "pts_paint": _COUNT, "pts_2nd_chance": _COUNT, "pts_fb": _COUNT, "pts_off_to": _COUNT,
+        "largest_lead": _COUNT, "lead_changes": _COUNT, "times_tied": _COUNT,
+        "team_turnovers": _COUNT, "total_turnovers": _COUNT, "team_rebounds": _COUNT,
+    },
+}
+
+SIDE_SUFFIXES = ("_home", "_away")
+
+
+def dtypes_for(table, columns):
+    """
+    dtype del plan para cada columna presente (las que no están en el plan no se tocan)
+
+    Args:
+        table: clave de DTYPE_PLAN
+        columns: nombres de columnas del archivo o DataFrame
+    """
+    plan = DTYPE_PLAN[table]
+    dtypes = {}
+    for col in columns:
+        base = col
+        for suffix in SIDE_SUFFIXES:
+            if col.endswith(suffix) and col[:-len(suffix)] in plan:
+                base = col[:-len(suffix)]
+        if base in plan:
+            dtypes[col] = plan[base]
+    return dtypes
+
+
+# ============================================
+# COLUMNAS DE LOS CSV CRUDOS LEÍDOS POR CHUNKS
+# ============================================
+# Se usan como usecols/dtype al leer game.csv y line_score.csv por chunks.
+def _with_sides(table, common, side_cols):
+    columns = list(common)
+    for side in ("home", "away"):
+        columns += [f"{col}_{side}" for col in side_cols]
+    return dtypes_for(table, columns)
+
+
+RAW_DTYPES = {
+    "game": _with_sides(
+        "game",
+        ["season_id", "game_id", "game_date", "season_type"],
+        ["team_id", "team_abbreviation", "team_name", "matchup", "wl",
+         "fgm", "fga", "fg_pct", "fg3m", "fg3a", "fg3_pct", "ftm", "fta", "ft_pct",
+         "oreb", "dreb", "reb", "ast", "stl", "blk", "tov", "pf", "pts", "plus_minus",
+         "video_available"],
+    ),
+    "line_score": _with_sides(
+        "line_score",
+        ["game_date_est", "game_id"],
+        ["team_id", "team_abbreviation", "team_city_name", "team_nickname", "team_wins_losses",
+         *[f"pts_qtr{i}" for i in range(1, 5)], *[f"pts_ot{i}" for i in range(1, 11)], "pts"],
+    ),
+}
@@ -0,0 +1,409 @@
+import argparse
+import hashlib
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# PUNTAJE POR TEMPORADA (nba_puntaje_vara.csv)
+# ============================================
+# Versión en módulo del global_score de nba_puntaje_vara.csv. El cálculo
+# (individual_score_season, season_to_int, vara y resumen) y la escritura de
+# los CSV contra los que se verifica la paridad bit a bit están en
+# Notebooks/EDA/eda_analisis_jugadores.ipynb; EDA_all seasons_v3.ipynb parte
+# del mismo all_seasons.csv pero no calcula este puntaje:
+#   1. all_seasons hasta la temporada 2019-20, con season_year = año inicial
+#   2. <atributo>_score = (valor - media de la temporada) / desvío (ddof=0);
+#      si el desvío es 0 o NaN el puntaje es 0
+#   3. global_score = promedio de los nueve puntajes
+#   4. vara = percentil 10 del global_score del equipo en la temporada;
+#      rendimiento "Malo" si el jugador queda por debajo
+#   5. resumen: jugadores, jugadores "Malo" y vara por equipo y temporada
+#
+# Las medias y desvíos se calculan para los nueve atributos a la vez, sobre
+# las filas ordenadas por temporada: una suma de numpy por temporada (no por
+# jugador ni por atributo) y el resultado se reparte con np.repeat. Se suma
+# cada temporada como un bloque contiguo, igual que Series.mean/std dentro del
+# groupby del notebook, para obtener exactamente los mismos decimales que el
+# CSV guardado; groupby().transform("mean"/"std") de pandas usa otro orden de
+# suma y difiere en el último decimal. La vara sale de un solo ordenamiento
+# por (equipo-temporada, puntaje) y el resumen de agregaciones de pandas, sin
+# lambdas por grupo.
+REPO_DIR = Path(__file__).resolve().parents[2]
+ALL_SEASONS_CSV = REPO_DIR / "Data" / "Processed" / "all_seasons_filtrado.csv"
+OUTPUT_DIR = REPO_DIR / "Notebooks" / "EDA"
+
+ATRIBUTOS = ["pts", "reb", "ast", "net_rating", "oreb_pct", "dreb_pct", "usg_pct", "ts_pct", "ast_pct"]
+SCORE_COLUMNS = [atrib + "_score" for atrib in ATRIBUTOS]
+
+# Columnas que agrega el puntaje; el resto de la tabla puntuada es all_seasons tal cual
+SCORED_COLUMNS = ["season_year", *SCORE_COLUMNS, "global_score", "vara", "rendimiento"]
+
+PUNTAJE_CSV = "nba_puntaje_vara.csv"
+RESUMEN_CSV = "resumen.csv"
+
+# Última temporada del período de análisis
+ULTIMA_TEMPORADA = "2019-20"
+
+# vara = percentil 10 (peor 10%) del equipo en la temporada
+VARA = 0.10
+
+
+def season_to_int(seasons):
+    """Año inicial de la temporada ("1996-97" -> 1996); NaN si no empieza con un año"""
+    # Se convierte cada temporada distinta una sola vez y se reparte por código
+    codes, uniques = pd.factorize(seasons, use_na_sentinel=False)
+    years = pd.to_numeric(pd.Series(uniques).astype(str).str[:4], errors="coerce")
+    return pd.Series(years.to_numpy()[codes], index=seasons.index, name=seasons.name)
+
+
+def filter_period(df, ultima_temporada=ULTIMA_TEMPORADA):
+    """Filas hasta ultima_temporada inclusive, con la columna season_year"""
+    df = df[df["season"] <= ultima_temporada].copy()
+    df["season_year"] = season_to_int(df["season"])
+    return df
+
+
+def season_zscores(df, attributes=ATRIBUTOS, group_col="season_year"):
+    """
+    Puntaje relativo a la temporada de cada atributo, en una sola pasada
+
+    Equivale a groupby(group_col)[atrib].transform(individual_score_season)
+    para cada atributo: (x - media) / desvío poblacional de la temporada,
+    ignorando nulos, y 0 cuando la temporada no tiene variación.
+
+    Returns:
+        DataFrame con una columna <atributo>_score por atributo, mismo índice que df
+    """
+    codes, _ = pd.factorize(df[group_col], sort=True)
+    if (codes < 0).any():
+        raise ValueError(f"{group_col} tiene valores nulos")
+    order = np.argsort(codes, kind="stable")
+    sizes = np.bincount(codes)
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+
+    # Una fila por atributo: cada temporada queda contigua en cada fila
+    values = np.ascontiguousarray(df[attributes].to_numpy(np.float64)[order].T)
+    missing = np.isnan(values)
+    filled = np.where(missing, 0.0, values)
+    present = (~missing).astype(np.int64)
+
+    n_groups = len(sizes)
+    sums = np.empty((len(attributes), n_groups))
+    counts = np.empty((len(attributes), n_groups), dtype=np.int64)
+    for g in range(n_groups):
+        block = slice(bounds[g], bounds[g + 1])
+        sums[:, g] = filled[:, block].sum(axis=1)
+        counts[:, g] = present[:, block].sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    deviations = values - np.repeat(means, sizes, axis=1)
+
+    squares = np.where(missing, 0.0, deviations * deviations)
+    sq_sums = np.empty_like(sums)
+    for g in range(n_groups):
+        sq_sums[:, g] = squares[:, bounds[g]:bounds[g + 1]].sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stds = np.repeat(np.sqrt(sq_sums / counts), sizes, axis=1)
+        flat = np.isnan(stds) | (stds == 0)
+        scores = np.where(flat, deviations * 0.0, deviations / stds)
+
+    result = np.empty_like(scores)
+    result[:, order] = scores
+    return pd.DataFrame(result.T, index=df.index, columns=[atrib + "_score" for atrib in attributes])
+
+
+def add_scores(df):
+    """Agrega los nueve <atributo>_score y global_score (promedio de los nueve)"""
+    scores = season_zscores(df)
+    df = pd.concat([df, scores], axis=1)
+    df["global_score"] = df[SCORE_COLUMNS].mean(axis=1)
+    return df
+
+
+def grouped_percentile(values, codes, percentile):
+    """
+    Percentil de cada grupo, ignorando nulos, repartido a cada fila
+
+    Mismo resultado que np.nanpercentile(x, percentile) por grupo (método
+    lineal, con la misma interpolación de numpy), pero con un solo
+    ordenamiento de todas las filas por (grupo, valor).
+
+    Args:
+        values: array de float
+        codes: grupo de cada fila (0..n_grupos-1; negativo = sin grupo)
+        percentile: 0 a 100
+
+    Returns:
+        array con el percentil del grupo de cada fila (NaN si el grupo no
+        tiene valores o la fila no tiene grupo)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.asarray(codes, dtype=np.int64)
+    result = np.full(len(values), np.nan)
+    grouped = codes >= 0
+    if not grouped.any():
+        return result
+
+    n_groups = codes.max() + 1
+    # Orden por valor y después (estable) por grupo: dentro de cada grupo los
+    # valores quedan ordenados y los NaN al final
+    group_values, group_codes = values[grouped], codes[grouped]
+    by_value = np.argsort(group_values)
+    sorted_values = group_values[by_value][np.argsort(group_codes[by_value], kind="stable")]
+    starts = np.concatenate([[0], np.cumsum(np.bincount(codes[grouped], minlength=n_groups))[:-1]])
+    valid = np.bincount(codes[grouped & ~np.isnan(values)], minlength=n_groups)
+
+    # Índice virtual (n - 1) * q y sus vecinos, como np.percentile(method="linear")
+    quantile = np.true_divide(percentile, 100)
+    virtual = (valid - 1) * quantile
+    previous = np.floor(virtual).astype(np.int64)
+    following = np.minimum(previous + 1, valid - 1)
+    previous = np.minimum(previous, valid - 1)
+    gamma = virtual - previous
+
+    has_values = valid > 0
+    below = sorted_values[starts + np.where(has_values, previous, 0)]
+    above = sorted_values[starts + np.where(has_values, following, 0)]
+    diff = above - below
+    # Misma fórmula que numpy: desde abajo si gamma < 0.5, desde arriba si no
+    per_group = np.where(gamma >= 0.5, above - diff * (1 - gamma), below + diff * gamma)
+    per_group[~has_values] = np.nan
+
+    result[grouped] = per_group[codes[grouped]]
+    return result
+
+
+def add_vara(df, vara=VARA):
+    """
+    vara (percentil del equipo en la temporada) y rendimiento Malo/Bueno
+
+    rendimiento es categórica (Bueno/Malo); en el CSV se escribe igual.
+    """
+    codes = df.groupby(["team_abbreviation", "season_year"], sort=False).ngroup()
+    varas = grouped_percentile(df["global_score"], codes.to_numpy(), vara * 100)
+    malo = (df["global_score"].to_numpy() < varas).astype(np.int8)
+    return df.assign(
+        vara=varas,
+        rendimiento=pd.Categorical.from_codes(malo, categories=["Bueno", "Malo"]),
+    )
+
+
+def build_resumen(df):
+    """Jugadores, jugadores 'Malo' y vara de cada equipo por temporada"""
+    return df.assign(malo=df["rendimiento"].eq("Malo")).groupby(["team_abbreviation", "season_year"]).agg(
+        n_players=("player_name", "count"),
+        n_malos=("malo", "sum"),
+        vara_value=("vara", "first"),
+    ).reset_index()
+
+
+def score_all_seasons(all_seasons, ultima_temporada=ULTIMA_TEMPORADA, vara=VARA):
+    """
+    Tabla de puntajes completa a partir de all_seasons
+
+    Returns:
+        (puntajes con *_score, global_score, vara y rendimiento, resumen por equipo y temporada)
+    """
+    scored = add_vara(add_scores(filter_period(all_seasons, ultima_temporada)), vara)
+    return scored, build_resumen(scored)
+
+
+# ============================================
+# RE-PUNTAJE INCREMENTAL
+# ============================================
+# Los puntajes, la vara y el resumen de una temporada dependen solo de las
+# filas de esa temporada, así que al sumar una temporada (o corregir filas de
+# una ya puntuada) alcanza con recalcular esas temporadas. La tabla puntuada
+# guarda todas las columnas de all_seasons: la huella de cada temporada se
+# compara entre las filas guardadas y las de entrada, sin archivo de estado.
+# Cambiar --vara o --ultima-temporada requiere una corrida completa.
+def season_fingerprints(df, columns):
+    """
+    Huella de las filas de cada temporada (SHA-256 del hash de cada fila, en orden)
+
+    Returns:
+        {season_year: hash hex}
+    """
+    row_hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    years = df["season_year"].to_numpy()
+    order = np.argsort(years, kind="stable")
+    seasons, starts = np.unique(years[order], return_index=True)
+    bounds = np.append(starts, len(order))
+    return {
+        int(season): hashlib.sha256(row_hashes[order[bounds[i]:bounds[i + 1]]].tobytes()).hexdigest()
+        for i, season in enumerate(seasons)
+    }
+
+
+def rescore(all_seasons, scored, resumen, ultima_temporada=ULTIMA_TEMPORADA, vara=VARA):
+    """
+    Actualiza una tabla puntuada recalculando solo las temporadas que cambiaron
+
+    Una temporada se recalcula si es nueva o si sus filas en all_seasons no
+    son las mismas (en el mismo orden) que las guardadas; las que ya no están
+    se quitan. Las filas quedan en el orden de all_seasons, igual que con
+    score_all_seasons.
+
+    Args:
+        all_seasons: all_seasons completo (con las filas nuevas o corregidas)
+        scored: tabla puntuada guardada (nba_puntaje_vara.csv)
+        resumen: resumen guardado (resumen.csv)
+
+    Returns:
+        (tabla puntuada, resumen, temporadas recalculadas, temporadas quitadas)
+    """
+    incoming = filter_period(all_seasons, ultima_temporada)
+    columns = list(all_seasons.columns)
+    if list(scored.columns) != columns + SCORED_COLUMNS:
+        # Tabla guardada con otras columnas: se puntúa todo de nuevo
+        scored, resumen = score_all_seasons(all_seasons, ultima_temporada, vara)
+        return scored, resumen, sorted(scored["season_year"].unique().tolist()), []
+
+    new_prints = season_fingerprints(incoming, columns)
+    old_prints = season_fingerprints(scored, columns)
+    changed = sorted(season for season, digest in new_prints.items() if old_prints.get(season) != digest)
+    removed = sorted(set(old_prints) - set(new_prints))
+    if not changed and not removed:
+        return scored, resumen, [], []
+
+    # Filas guardadas de las temporadas sin cambios: son las mismas filas de
+    # entrada de esas temporadas, en el mismo orden, y toman su posición
+    kept = scored[~scored["season_year"].isin(changed + removed)]
+    kept = kept.iloc[np.argsort(kept["season_year"].to_numpy(), kind="stable")]
+    kept_source = incoming[incoming["season_year"].isin(kept["season_year"].unique())]
+    kept.index = kept_source.index[np.argsort(kept_source["season_year"].to_numpy(), kind="stable")]
+
+    rescored = add_vara(add_scores(incoming[incoming["season_year"].isin(changed)]), vara)
+    scored = pd.concat([kept, rescored.astype({"rendimiento": str})]).sort_index().reset_index(drop=True)
+    resumen = pd.concat([
+        resumen[~resumen["season_year"].isin(changed + removed)],
+        build_resumen(rescored),
+    ]).sort_values(["team_abbreviation", "season_year"]).reset_index(drop=True)
+    return scored, resumen, changed, removed
+
+
+def update_stored_scores(all_seasons, out_dir=OUTPUT_DIR, ultima_temporada=ULTIMA_TEMPORADA, vara=VARA):
+    """
+    Re-puntaje incremental sobre los CSV de out_dir, que se reescriben en el lugar
+
+    Si todavía no hay tabla puntuada en out_dir se puntúa todo.
+
+    Returns:
+        (temporadas recalculadas, temporadas quitadas)
+    """
+    out_dir = Path(out_dir)
+    if (out_dir / PUNTAJE_CSV).exists() and (out_dir / RESUMEN_CSV).exists():
+        scored = pd.read_csv(out_dir / PUNTAJE_CSV, float_precision="round_trip")
+        resumen = pd.read_csv(out_dir / RESUMEN_CSV, float_precision="round_trip")
+        scored, resumen, changed, removed = rescore(all_seasons, scored, resumen, ultima_temporada, vara)
+    else:
+        scored, resumen = score_all_seasons(all_seasons, ultima_temporada, vara)
+        changed, removed = sorted(scored["season_year"].unique().tolist()), []
+    if changed or removed:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        scored.to_csv(out_dir / PUNTAJE_CSV, index=False)
+        resumen.to_csv(out_dir / RESUMEN_CSV, index=False)
+    return changed, removed
+
+
+def append_rows(new_rows, out_dir=OUTPUT_DIR, ultima_temporada=ULTIMA_TEMPORADA, vara=VARA):
+    """
+    Agrega filas nuevas de all_seasons a la tabla puntuada de out_dir
+
+    Las filas guardadas (sin las columnas de puntaje) más las nuevas forman el
+    all_seasons de entrada; solo se recalculan las temporadas de las filas nuevas.
+
+    Returns:
+        (temporadas recalculadas, temporadas quitadas)
+    """
+    scored = pd.read_csv(Path(out_dir) / PUNTAJE_CSV, float_precision="round_trip")
+    stored = scored.drop(columns=SCORED_COLUMNS)
+    missing = set(stored.columns) - set(new_rows.columns)
+    if missing:
+        raise ValueError(f"Faltan columnas de all_seasons en las filas nuevas: {sorted(missing)}")
+    all_seasons = pd.concat([stored, new_rows[stored.columns]], ignore_index=True)
+    return update_stored_scores(all_seasons, out_dir, ultima_temporada, vara)
+
+
+def compare_with_csv(df, path):
+    """
+    Compara una tabla con un CSV guardado, valor por valor
+
+    Los CSV se leen con float_precision="round_trip" para recuperar
+    exactamente los float escritos por to_csv.
+
+    Returns:
+        DataFrame con columna, valores distintos y máxima diferencia absoluta
+    """
+    saved = pd.read_csv(path, float_precision="round_trip")
+    if list(saved.columns) != list(df.columns) or len(saved) != len(df):
+        raise ValueError(f"{path}: columnas o filas distintas a las calculadas")
+    rows = []
+    for col in df.columns:
+        new, old = df[col].reset_index(drop=True), saved[col]
+        both_null = new.isna() & old.isna()
+        if pd.api.types.is_float_dtype(new) and pd.api.types.is_float_dtype(old):
+            distintos = int((~((new == old) | both_null)).sum())
+            max_diff = float((new - old).abs().max())
+        else:
+            distintos = int((~((new.astype(str) == old.astype(str)).fillna(False) | both_null)).sum())
+            max_diff = np.nan
+        rows.append({"columna": col, "distintos": distintos, "max_diff": max_diff})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Puntaje por temporada, vara y resumen de all_seasons")
+    parser.add_argument("--input", default=str(ALL_SEASONS_CSV), help="CSV de all_seasons (limpio)")
+    parser.add_argument("--out-dir", default=str(OUTPUT_DIR),
+                        help="carpeta de nba_puntaje_vara.csv y resumen.csv")
+    parser.add_argument("--ultima-temporada", default=ULTIMA_TEMPORADA,
+                        help="última temporada incluida (ej: 2019-20)")
+    parser.add_argument("--vara", type=float, default=VARA,
+                        help="percentil del equipo que marca la vara, entre 0 y 1 (por defecto 0.10)")
+    parser.add_argument("--compare", action="store_true",
+                        help="compara con los CSV de --out-dir en lugar de sobrescribirlos")
+    parser.add_argument("--incremental", action="store_true",
+                        help="recalcula solo las temporadas de --input nuevas o con filas distintas a las guardadas")
+    parser.add_argument("--append", metavar="CSV",
+                        help="agrega las filas de all_seasons de este CSV a la tabla guardada y recalcula sus temporadas")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    start = time.perf_counter()
+    if args.incremental or args.append:
+        if args.append:
+            changed, removed = append_rows(pd.read_csv(args.append, float_precision="round_trip"),
+                                           out_dir, args.ultima_temporada, args.vara)
+        else:
+            changed, removed = update_stored_scores(pd.read_csv(args.input, float_precision="round_trip"),
+                                                    out_dir, args.ultima_temporada, args.vara)
+        elapsed = time.perf_counter() - start
+        if not changed and not removed:
+            print(f"✅ Sin temporadas nuevas ni modificadas ({elapsed:.2f} s)")
+        else:
+            print(f"🔁 Temporadas recalculadas: {changed or '-'}; quitadas: {removed or '-'} ({elapsed:.2f} s)")
+            print(f"✅ Actualizados: {out_dir / PUNTAJE_CSV}, {out_dir / RESUMEN_CSV}")
+    else:
+        df_all_seasons = pd.read_csv(args.input, float_precision="round_trip")
+        df_scored, df_resumen = score_all_seasons(df_all_seasons, args.ultima_temporada, args.vara)
+        print(f"⏱️ {len(df_scored):,} jugadores-temporada puntuados en {time.perf_counter() - start:.2f} s")
+
+        outputs = {PUNTAJE_CSV: df_scored, RESUMEN_CSV: df_resumen}
+        if args.compare:
+            for name, df in outputs.items():
+                comparison = compare_with_csv(df, out_dir / name)
+                distintos = comparison[comparison["distintos"] > 0]
+                if distintos.empty:
+                    print(f"✅ {name}: idéntico al CSV guardado")
+                else:
+                    print(f"⚠️ {name}: columnas con diferencias")
+                    print(distintos.to_string(index=False))
+        else:
+            out_dir.mkdir(parents=True, exist_ok=True)
+            for name, df in outputs.items():
+                df.to_csv(out_dir / name, index=False)
+                print(f"✅ Guardado: {out_dir / name}")
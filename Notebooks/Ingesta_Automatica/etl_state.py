@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# ============================================
+# ESTADO INCREMENTAL DEL ETL
+# ============================================
+# El archivo de estado guarda, por tabla, el hash de cada archivo fuente y la
+# marca de agua (máximo game_id / game_date / season ya cargado). Con eso la
+# corrida siguiente omite las tablas sin cambios y solo procesa filas nuevas.
+#
+# Los partidos nuevos se eligen por game_id no publicado (anti-join), no por
+# game_id mayor a la marca de agua: los ids no crecen con el tiempo
+# ("004" + temporada para playoffs queda por encima del "002" de la
+# temporada regular siguiente). Los game_id publicados de las tablas por
+# partido, con una huella de las filas de cada uno, van en un Parquet aparte
+# (<ETL_KEYS_DIR>/<tabla>.<clave>.parquet): el JSON queda chico y la huella
+# permite detectar correcciones de partidos ya publicados.
+#
+# ETL_STATE_PATH: ruta del archivo de estado (por defecto data/etl_state.json)
+# ETL_KEYS_DIR: carpeta de las claves publicadas (por defecto data/etl_state_keys)
+# ETL_FULL_REFRESH=1: ignora el estado y reconstruye todas las tablas
+STATE_PATH = Path(os.getenv("ETL_STATE_PATH", "data/etl_state.json"))
+KEYS_DIR = Path(os.getenv("ETL_KEYS_DIR", STATE_PATH.parent / "etl_state_keys"))
+FULL_REFRESH = os.getenv("ETL_FULL_REFRESH", "0") == "1"
+
+MODE_TRUNCATE = "truncate"
+MODE_APPEND = "append"
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Calcula el hash SHA-256 de un archivo leyéndolo por bloques"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_state(path=STATE_PATH):
+    """Lee el archivo de estado; si no existe devuelve un estado vacío"""
+    path = Path(path)
+    if FULL_REFRESH or not path.exists():
+        return {"tables": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    """Guarda el estado de forma atómica (archivo temporal + rename)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def source_hashes(sources):
+    """Devuelve {nombre de archivo: hash} para una lista de rutas"""
+    return {Path(p).name: file_sha256(p) for p in sources}
+
+
+def is_unchanged(state, table, hashes):
+    """True si la tabla ya se cargó con exactamente estos archivos fuente"""
+    return state["tables"].get(table, {}).get("sources") == hashes
+
+
+def select_increment(dataframe, state, table, key):
+    """
+    Elige las filas a publicar para una tabla cuyo origen cambió
+
+    Si hay marca de agua y aparecen filas con key mayor, se devuelven solo
+    esas en modo append. Sin marca de agua, con una marca de agua de otro
+    tipo que la columna, o si el archivo cambió sin filas nuevas
+    (correcciones de filas ya cargadas), se reconstruye la tabla.
+
+    Sirve solo para claves que crecen con el tiempo (ej: 'season'); para
+    game_id usar select_new_keys.
+
+    Args:
+        dataframe: tabla limpia completa (antes del unpivot, si corresponde)
+        state: estado cargado con load_state
+        table: nombre de la tabla
+        key: columna de la marca de agua (ej: 'season')
+
+    Returns:
+        (DataFrame a publicar, MODE_APPEND o MODE_TRUNCATE)
+    """
+    watermark = state["tables"].get(table, {}).get("watermark", {}).get(key)
+    if watermark is None:
+        return dataframe, MODE_TRUNCATE
+    try:
+        nuevos = dataframe[dataframe[key] > watermark]
+    except TypeError:
+        # La marca de agua es de otro tipo que la columna (ej: game_id pasó
+        # de entero a texto con el plan de tipos): se reconstruye la tabla
+        return dataframe, MODE_TRUNCATE
+    if nuevos.empty:
+        return dataframe, MODE_TRUNCATE
+    return nuevos, MODE_APPEND
+
+
+def key_fingerprints(dataframe, key):
+    """
+    Huella de las filas de cada clave (ej: las dos filas por equipo de un game_id)
+
+    Es la suma (módulo 2**64) de los hashes de sus filas: no depende del orden
+    de las filas y cambia si cambia cualquier valor de cualquiera de ellas.
+
+    Returns:
+        DataFrame con la clave (como texto) y row_hash; attrs["dtype"] guarda
+        el tipo de la columna en el DataFrame
+    """
+    row_hashes = pd.util.hash_pandas_object(dataframe, index=False)
+    fingerprints = (row_hashes.groupby(dataframe[key].astype(str)).sum()
+                    .rename("row_hash").rename_axis(key).reset_index())
+    fingerprints.attrs["dtype"] = str(dataframe[key].dtype)
+    return fingerprints
+
+
+def _keys_path(table, key):
+    return KEYS_DIR / f"{table}.{key}.parquet"
+
+
+def load_keys(state, table, key):
+    """Huellas publicadas de una tabla (ver key_fingerprints), o None si no hay"""
+    entry = state["tables"].get(table, {}).get("keys", {}).get(key)
+    path = _keys_path(table, key)
+    if entry is None or not path.exists():
+        return None
+    published = pd.read_parquet(path)
+    published[key] = published[key].astype(str)
+    published.attrs["dtype"] = entry["dtype"]
+    return published
+
+
+def save_keys(table, fingerprints):
+    """Guarda las huellas publicadas de una tabla de forma atómica (temporal + rename)"""
+    path = _keys_path(table, fingerprints.columns[0])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    fingerprints.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def select_new_keys(dataframe, state, table, key):
+    """
+    Elige las filas cuya clave todavía no se publicó (anti-join contra el estado)
+
+    Compara la huella de cada clave (key_fingerprints) con la publicada. Si
+    solo aparecen claves nuevas se devuelven sus filas en modo append. Si
+    además cambiaron o desaparecieron filas de claves ya publicadas
+    (correcciones), se avisa y se reconstruye la tabla; también sin huellas
+    en el estado, con claves guardadas de otro tipo que la columna o si el
+    archivo cambió sin claves nuevas.
+
+    Args:
+        dataframe: tabla limpia completa (antes del unpivot, si corresponde)
+        state: estado cargado con load_state
+        table: nombre de la tabla
+        key: columna de la clave (ej: 'game_id')
+
+    Returns:
+        (DataFrame a publicar, MODE_APPEND o MODE_TRUNCATE, huellas de la
+        tabla completa para record_table)
+    """
+    current = key_fingerprints(dataframe, key)
+    published = load_keys(state, table, key)
+    if published is None or published.attrs["dtype"] != current.attrs["dtype"]:
+        # Ej: game_id pasó de entero a texto con el plan de tipos
+        return dataframe, MODE_TRUNCATE, current
+
+    known = current[key].isin(published[key])
+    both = current[known].merge(published, on=key, suffixes=("", "_publicado"))
+    cambiadas = int((both["row_hash"] != both["row_hash_publicado"]).sum())
+    faltantes = int((~published[key].isin(current[key])).sum())
+    if cambiadas or faltantes:
+        print(f"⚠️ {table}: {cambiadas:,} {key} ya publicados cambiaron y {faltantes:,} ya no están "
+              f"en el origen, se reconstruye la tabla")
+        return dataframe, MODE_TRUNCATE, current
+    if known.all():
+        return dataframe, MODE_TRUNCATE, current
+    nuevos = dataframe[dataframe[key].astype(str).isin(current.loc[~known, key])]
+    return nuevos, MODE_APPEND, current
+
+
+def _to_json_value(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def record_table(state, table, hashes, dataframe, mode, watermark_cols=(), keys=None):
+    """
+    Registra en el estado una tabla publicada con éxito
+
+    Args:
+        state: estado cargado con load_state
+        table: nombre de la tabla
+        hashes: resultado de source_hashes para sus archivos fuente
+        dataframe: filas publicadas en esta corrida
+        mode: MODE_APPEND o MODE_TRUNCATE
+        watermark_cols: columnas cuyo máximo se guarda como marca de agua
+        keys: huellas de la tabla completa devueltas por select_new_keys; se
+            guardan en ETL_KEYS_DIR y el estado solo registra su tipo y cantidad
+    """
+    entry = state["tables"].get(table, {}) if mode == MODE_APPEND else {}
+    watermark = dict(entry.get("watermark", {}))
+    for col in watermark_cols:
+        if col in dataframe.columns and not dataframe.empty:
+            watermark[col] = _to_json_value(dataframe[col].max())
+    key_entries = dict(entry.get("keys", {}))
+    if keys is not None:
+        save_keys(table, keys)
+        key_entries[keys.columns[0]] = {"dtype": keys.attrs["dtype"], "count": len(keys)}
+    rows = entry.get("rows", 0) if mode == MODE_APPEND else 0
+    state["tables"][table] = {
+        "sources": hashes,
+        "watermark": watermark,
+        "keys": key_entries,
+        "rows": rows + len(dataframe),
+        "last_mode": mode,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
@@ -0,0 +1,381 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from etl_io import apply_dtype_plan
+
+# ============================================
+# TRANSFORMACIÓN HOME / AWAY (ANCHO → LARGO)
+# ============================================
+SIDES = ("home", "away")
+
+
+def _stack(home, away):
+    """Apila la columna home sobre la away en un único arreglo nuevo"""
+    if isinstance(home.dtype, np.dtype) and isinstance(away.dtype, np.dtype):
+        return np.concatenate([home.to_numpy(), away.to_numpy()])
+    if isinstance(home.dtype, pd.CategoricalDtype) and isinstance(away.dtype, pd.CategoricalDtype):
+        # Categorías de ambos lados (ej: equipos que solo jugaron de visitante)
+        return union_categoricals([home, away])
+    return pd.concat([home, away], ignore_index=True).array
+
+
+def unpivot_home_away(dataframe, common_cols, value_cols=None, side_col="team_side",
+                      suffixes=("_home", "_away")):
+    """
+    Convierte una tabla con columnas <col>_home / <col>_away en una fila por equipo
+
+    A diferencia de copiar df_home y df_away y concatenarlos, cada columna de
+    salida se construye una sola vez directamente desde la tabla ancha, por lo
+    que el pico de memoria es entrada + salida.
+
+    Args:
+        dataframe: tabla ancha (un partido por fila)
+        common_cols: columnas compartidas por ambos equipos (se repiten)
+        value_cols: nombres base de las columnas por equipo; si es None se
+            infieren de las columnas que terminan con el sufijo home
+        side_col: nombre de la columna categórica que indica home/away
+        suffixes: sufijos (home, away) de las columnas por equipo
+
+    Returns:
+        DataFrame largo con 2 * len(dataframe) filas: primero todos los
+        registros home y luego todos los away.
+    """
+    home_suffix, away_suffix = suffixes
+    if value_cols is None:
+        value_cols = [
+            col[:-len(home_suffix)] for col in dataframe.columns
+            if col.endswith(home_suffix) and col[:-len(home_suffix)] + away_suffix in dataframe.columns
+        ]
+
+    n = len(dataframe)
+    data = {}
+    for col in common_cols:
+        data[col] = _stack(dataframe[col], dataframe[col])
+    for col in value_cols:
+        data[col] = _stack(dataframe[col + home_suffix], dataframe[col + away_suffix])
+    data[side_col] = pd.Categorical.from_codes(np.repeat(np.array([0, 1], dtype=np.int8), n),
+                                               categories=list(SIDES))
+    return pd.DataFrame(data, copy=False)
+
+
+# ============================================
+# COLUMNAS DE GAME / LINE SCORE / OTHER STATS
+# ============================================
+GAME_COMMON_COLS = ["season_id", "game_id", "game_date", "season_type"]
+
+LINE_SCORE_COMMON_COLS = ["game_date", "game_id"]
+LINE_SCORE_TEAM_COLS = [
+    "team_id", "team_abbreviation", "team_city_name", "team_nickname", "team_wins_losses",
+    "pts_qtr1", "pts_qtr2", "pts_qtr3", "pts_qtr4",
+    "pts_ot1", "pts_ot2", "pts_ot3", "pts_ot4", "pts_ot5",
+    "pts_ot6", "pts_ot7", "pts_ot8", "pts_ot9", "pts_ot10", "pts",
+]
+
+OTHER_STATS_COMMON_COLS = ["game_id", "league_id", "lead_changes", "times_tied"]
+
+
+def clean_other_stats(df_other_stats):
+    """Elimina duplicados de other_stats.csv y lo pasa a una fila por equipo"""
+    df_other_stats = df_other_stats.drop_duplicates(subset=["game_id", "team_id_home", "team_id_away"], keep="first")
+    return unpivot_home_away(df_other_stats, OTHER_STATS_COMMON_COLS)
+
+
+# ============================================
+# LIMPIEZA POR TABLA
+# ============================================
+# Correcciones históricas de abreviaciones de all_seasons.csv
+TEAM_ABBREVIATION_FIXES = {
+    "VAN": "MEM",  # Vancouver → Memphis
+    "CHH": "CHA",  # Hornets antiguos → actuales
+    "SEA": "OKC",  # Seattle → Oklahoma
+    "NJN": "BKN",  # New Jersey → Brooklyn
+    "NOH": "NOP",  # New Orleans Hornets → Pelicans
+    "NOK": "NOP",  # Transición → Pelicans
+    "CHO": "CHA"   # Estandarizar a abreviación oficial
+}
+
+
+def clean_player(df_player):
+    """Renombra las columnas de player.csv"""
+    return df_player.rename(columns={
+        "full_name": "player_name",
+        "id": "player_id"
+    })
+
+
+def clean_team(df_team):
+    """Renombra las columnas de team.csv"""
+    return df_team.rename(columns={
+        'id': 'team_id',
+        'full_name': 'team_name',
+        'abbreviation': 'team_abbreviation'
+    })
+
+
+def clean_game(df_game):
+    """Imputa nulos y elimina duplicados de game.csv (sigue en formato ancho)"""
+    df_game = df_game.copy()
+
+    ## Imputar con la mediana en columnas numéricas específicas
+    for col in ['ft_pct_home', 'ft_pct_away', 'fg3_pct_home']:
+        df_game[col] = df_game[col].fillna(df_game[col].median())
+
+    ## Imputar con el valor más frecuente en columnas categóricas específicas
+    for col in ['wl_home', 'wl_away']:
+        df_game[col] = df_game[col].fillna(df_game[col].mode()[0])
+
+    return df_game.drop_duplicates(subset=["game_id", "team_id_home", "team_id_away"], keep="first")
+
+
+def clean_line_score(df_line_score):
+    """Renombra la fecha, rellena prórrogas y elimina duplicados de line_score.csv"""
+    df_line_score = df_line_score.rename(columns={'game_date_est': 'game_date'})
+
+    # Imputar valores nulos en columnas numéricas.
+    ot_cols = [col for col in df_line_score.columns if "pts_ot" in col]
+    df_line_score[ot_cols] = df_line_score[ot_cols].fillna(0)
+
+    # Eliminar duplicados
+    return df_line_score.drop_duplicates(subset=["game_id", "team_id_home", "team_id_away"], keep="first")
+
+
+def clean_all_seasons(df_all_seasons, df_team):
+    """Estandariza abreviaciones de all_seasons.csv y agrega team_id / team_name"""
+    df_all_seasons = df_all_seasons.drop(columns=["Unnamed: 0"], errors="ignore")
+
+    college = df_all_seasons["college"]
+    if isinstance(college.dtype, pd.CategoricalDtype) and "No College" not in college.cat.categories:
+        college = college.cat.add_categories("No College")
+    df_all_seasons["college"] = college.fillna("No College")
+
+    # Limpiar, estandarizar y aplicar correcciones históricas
+    df_all_seasons["team_abbreviation"] = (
+        df_all_seasons["team_abbreviation"]
+        .str.strip()
+        .str.upper()
+        .replace(TEAM_ABBREVIATION_FIXES)
+    )
+
+    # Eliminar columnas anteriores si existen y hacer el merge con df_team
+    df_all_seasons = df_all_seasons.drop(columns=["team_id", "team_name"], errors="ignore")
+    df_all_seasons = pd.merge(
+        df_all_seasons,
+        df_team[["team_id", "team_name", "team_abbreviation"]],
+        on="team_abbreviation",
+        how="left"
+    )
+    # Las operaciones de texto y el merge devuelven object: se vuelve al plan de tipos
+    return apply_dtype_plan(df_all_seasons, "all_seasons")
+
+
+# ============================================
+# AGREGADOS POR EQUIPO Y TEMPORADA
+# ============================================
+# team_season: una fila por team_id + season_id armada desde game_cleaned.
+# Se guardan sumas enteras (partidos, victorias, puntos propios y del rival,
+# componentes de las posesiones) y de ellas salen los porcentajes y promedios.
+# Así un incremento de partidos se suma a la tabla guardada y el resultado es
+# idéntico al de recalcular todo.
+TEAM_SEASON_KEYS = ["team_id", "season_id"]
+TEAM_SEASON_LABELS = ["team_abbreviation", "team_name"]
+# Componentes de las posesiones estimadas: FGA - OREB + TOV + 0.44 * FTA
+POSSESSION_COLS = ["fga", "oreb", "tov", "fta"]
+TEAM_SEASON_SUMS = (["games", "wins", "losses", "home_games", "home_wins", "away_games", "away_wins",
+                     "pts", "opp_pts"]
+                    + POSSESSION_COLS + [f"opp_{col}" for col in POSSESSION_COLS])
+
+
+def _counts(serie):
+    """Columna de contadores como int64, con los nulos en 0"""
+    return np.nan_to_num(serie.to_numpy(dtype="float64", na_value=np.nan)).astype(np.int64)
+
+
+def team_season_sums(df_game_cleaned):
+    """
+    Sumas por equipo y temporada de partidos en formato largo (una fila por equipo)
+
+    Los valores del rival salen del total de cada partido menos los propios,
+    así que cada partido tiene que venir con sus dos filas (home y away).
+    """
+    game_codes, _ = pd.factorize(df_game_cleaned["game_id"])
+    wl = df_game_cleaned["wl"].astype("string")
+    home = (df_game_cleaned["team_side"] == "home").to_numpy()
+    win = (wl == "W").fillna(False).to_numpy()
+    columns = {
+        "games": np.ones(len(df_game_cleaned), dtype=np.int64),
+        "wins": win.astype(np.int64),
+        "losses": (wl == "L").fillna(False).to_numpy().astype(np.int64),
+        "home_games": home.astype(np.int64),
+        "home_wins": (home & win).astype(np.int64),
+        "away_games": (~home).astype(np.int64),
+        "away_wins": (~home & win).astype(np.int64),
+    }
+    for col in ["pts"] + POSSESSION_COLS:
+        own = _counts(df_game_cleaned[col])
+        game_total = np.bincount(game_codes, weights=own).astype(np.int64)
+        columns[col] = own
+        columns["opp_pts" if col == "pts" else f"opp_{col}"] = game_total[game_codes] - own
+
+    sums = pd.DataFrame(columns, index=df_game_cleaned.index)
+    sums[TEAM_SEASON_KEYS] = df_game_cleaned[TEAM_SEASON_KEYS].astype("int64")
+    for col in TEAM_SEASON_LABELS:
+        sums[col] = df_game_cleaned[col].astype("string")
+    return _group_sums(sums)
+
+
+def _group_sums(sums):
+    # Las etiquetas del equipo son las de su último partido (o del último incremento)
+    agg = {col: "last" for col in TEAM_SEASON_LABELS} | {col: "sum" for col in TEAM_SEASON_SUMS}
+    return sums.groupby(TEAM_SEASON_KEYS, sort=True).agg(agg).reset_index()
+
+
+def _ratio(num, den):
+    num = np.asarray(num, dtype="float64")
+    den = np.asarray(den, dtype="float64")
+    return np.divide(num, den, out=np.full(len(num), np.nan), where=den != 0)
+
+
+def build_team_season(df_game_cleaned, previous=None):
+    """
+    Tabla team_season a partir de game_cleaned
+
+    Args:
+        df_game_cleaned: partidos en formato largo (la tabla completa o solo
+            los partidos nuevos, siempre con sus dos filas)
+        previous: team_season ya guardada; si se pasa, los partidos de
+            df_game_cleaned se suman a ella (refresco incremental)
+
+    Returns:
+        DataFrame con una fila por team_id + season_id: las sumas y
+        win_pct, home_win_pct, away_win_pct, pts_avg, opp_pts_avg,
+        point_diff_avg, possessions_avg y pace (posesiones por partido de
+        ambos equipos)
+    """
+    sums = team_season_sums(df_game_cleaned)
+    if previous is not None and not previous.empty:
+        previous = previous[TEAM_SEASON_KEYS + TEAM_SEASON_SUMS + TEAM_SEASON_LABELS].astype(
+            {col: "int64" for col in TEAM_SEASON_KEYS + TEAM_SEASON_SUMS} | {col: "string" for col in TEAM_SEASON_LABELS})
+        sums = _group_sums(pd.concat([previous, sums], ignore_index=True))
+
+    possessions = sums["fga"] - sums["oreb"] + sums["tov"] + 0.44 * sums["fta"]
+    opp_possessions = sums["opp_fga"] - sums["opp_oreb"] + sums["opp_tov"] + 0.44 * sums["opp_fta"]
+    return sums.assign(
+        win_pct=_ratio(sums["wins"], sums["games"]),
+        home_win_pct=_ratio(sums["home_wins"], sums["home_games"]),
+        away_win_pct=_ratio(sums["away_wins"], sums["away_games"]),
+        pts_avg=_ratio(sums["pts"], sums["games"]),
+        opp_pts_avg=_ratio(sums["opp_pts"], sums["games"]),
+        point_diff_avg=_ratio(sums["pts"] - sums["opp_pts"], sums["games"]),
+        possessions_avg=_ratio(possessions, sums["games"]),
+        pace=_ratio((possessions + opp_possessions) / 2, sums["games"]),
+    )
+
+
+# ============================================
+# MÉTRICAS AVANZADAS POR EQUIPO Y PARTIDO
+# ============================================
+# game_advanced: una fila por equipo y partido de game_cleaned con las
+# columnas de other_stats del mismo equipo (unión por índice game_id +
+# team_id) y métricas por posesión:
+#   - possessions: (posesiones propias + del rival) / 2, con
+#     posesiones = FGA - OREB + TOV + 0.44 * FTA
+#   - ortg / drtg / net_rtg: puntos anotados / recibidos cada 100 posesiones
+#   - efg_pct: (FGM + 0.5 * FG3M) / FGA
+#   - tov_rate: TOV / (FGA + 0.44 * FTA + TOV)
+# Los valores del rival salen del total del partido menos los propios; si al
+# partido le falta una de sus dos filas o el dato es nulo, quedan en NaN.
+GAME_ADVANCED_COLS = ["season_id", "game_id", "game_date", "season_type", "team_id",
+                      "team_abbreviation", "team_side", "wl", "pts"]
+OTHER_STATS_VALUE_COLS = ["pts_paint", "pts_2nd_chance", "pts_fb", "pts_off_to", "largest_lead",
+                          "lead_changes", "times_tied", "team_turnovers", "total_turnovers",
+                          "team_rebounds"]
+
+
+def _floats(serie):
+    return serie.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _nullable_int(values):
+    """Arreglo float con NaN → Int64 con nulos"""
+    return pd.array(values, dtype="Float64").astype("Int64")
+
+
+def _opponent(own, game_codes):
+    """Valor del rival en cada fila: total del partido menos el propio (NaN si falta algo)"""
+    missing = np.isnan(own)
+    filled = np.where(missing, 0.0, own)
+    total = np.bincount(game_codes, weights=filled)
+    rows = np.bincount(game_codes)
+    missing_in_game = np.bincount(game_codes, weights=missing)
+    opp = total[game_codes] - filled
+    incomplete = (rows[game_codes] != 2) | (missing_in_game[game_codes] > 0)
+    return np.where(incomplete, np.nan, opp)
+
+
+def indexed_lookup(right, left, keys):
+    """
+    Posición en `right` de cada fila de `left` según las columnas keys (-1 si no está)
+
+    Equivale a un merge left sin duplicar filas: las claves de ambos lados se
+    codifican juntas como un entero por fila, las de `right` se ordenan una
+    vez (primera aparición de cada clave) y cada fila de `left` se busca con
+    searchsorted.
+    """
+    n_left = len(left)
+    combined = np.zeros(n_left + len(right), dtype=np.int64)
+    for key in keys:
+        codes, uniques = pd.factorize(pd.concat([left[key], right[key]], ignore_index=True))
+        combined = combined * (len(uniques) + 1) + (codes + 1)
+    left_keys, right_keys = combined[:n_left], combined[n_left:]
+    if len(right_keys) == 0:
+        return np.full(n_left, -1)
+
+    sorted_keys, first = np.unique(right_keys, return_index=True)
+    found = np.minimum(np.searchsorted(sorted_keys, left_keys), len(sorted_keys) - 1)
+    return np.where(sorted_keys[found] == left_keys, first[found], -1)
+
+
+def build_game_advanced(df_game_cleaned, df_other_stats_cleaned=None):
+    """
+    Tabla game_advanced a partir de game_cleaned y other_stats_cleaned
+
+    Args:
+        df_game_cleaned: partidos en formato largo (completos o solo los
+            nuevos, siempre con sus dos filas)
+        df_other_stats_cleaned: other_stats en formato largo; los partidos
+            que no estén quedan con sus columnas en nulo
+
+    Returns:
+        DataFrame con GAME_ADVANCED_COLS, opp_pts, las métricas avanzadas y
+        las columnas de OTHER_STATS_VALUE_COLS, en el orden de df_game_cleaned
+    """
+    game = df_game_cleaned.reset_index(drop=True)
+    game_codes, _ = pd.factorize(game["game_id"])
+    stats = {col: _floats(game[col]) for col in ["pts", "fgm", "fga", "fg3m", "fta", "oreb", "tov"]}
+    own_poss = stats["fga"] - stats["oreb"] + stats["tov"] + 0.44 * stats["fta"]
+    opp_pts = _opponent(stats["pts"], game_codes)
+    possessions = (own_poss + _opponent(own_poss, game_codes)) / 2
+    plays = stats["fga"] + 0.44 * stats["fta"] + stats["tov"]
+
+    data = {col: game[col] for col in GAME_ADVANCED_COLS if col in game.columns}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        data["opp_pts"] = _nullable_int(opp_pts)
+        data["possessions"] = possessions
+        data["ortg"] = np.where(possessions > 0, 100 * stats["pts"] / possessions, np.nan)
+        data["drtg"] = np.where(possessions > 0, 100 * opp_pts / possessions, np.nan)
+        data["efg_pct"] = np.where(stats["fga"] > 0, (stats["fgm"] + 0.5 * stats["fg3m"]) / stats["fga"], np.nan)
+        data["tov_rate"] = np.where(plays > 0, stats["tov"] / plays, np.nan)
+    data["net_rtg"] = data["ortg"] - data["drtg"]
+
+    if df_other_stats_cleaned is None:
+        rows = np.full(len(game), -1)
+    else:
+        rows = indexed_lookup(df_other_stats_cleaned, game, ["game_id", "team_id"])
+    matched = rows >= 0
+    for col in OTHER_STATS_VALUE_COLS:
+        values = np.full(len(game), np.nan)
+        if df_other_stats_cleaned is not None:
+            values[matched] = _floats(df_other_stats_cleaned[col])[rows[matched]]
+        data[col] = _nullable_int(values)
+    return pd.DataFrame(data, copy=False)
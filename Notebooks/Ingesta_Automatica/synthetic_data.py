@@ -0,0 +1,471 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ============================================
+# DATOS SINTÉTICOS NBA (SIN KAGGLE)
+# ============================================
+# Genera game.csv, line_score.csv, other_stats.csv, player.csv, team.csv y
+# all_seasons.csv con las mismas columnas y formatos que los datasets de
+# Kaggle, en la misma estructura de carpetas que deja la descarga:
+#
+#   <carpeta>/basketball/csv/{game,line_score,other_stats,player,team}.csv
+#   <carpeta>/nba_players/all_seasons.csv
+#
+# Escala 1 = filas de los datasets reales; 10 y 100 las multiplican (team.csv
+# queda siempre con los 30 equipos). Los partidos se escriben por bloques de
+# CHUNK_GAMES, así la memoria no crece con la escala.
+#
+# Nulos y duplicados siguen lo observado en los archivos reales:
+#   - 3 puntos vacíos antes de 1979-80; rebotes ofensivos/defensivos, robos,
+#     tapas y pérdidas vacíos antes de 1973-74
+#   - NULL_RATES: porcentaje de nulos al azar por columna (<col>_home/_away
+#     usan la tasa de <col>)
+#   - DUPLICATE_RATES: filas repetidas tal cual, como en los CSV de Kaggle
+BASE_ROWS = {
+    "game": 65_698,
+    "line_score": 58_053,
+    "other_stats": 28_271,
+    "player": 4_831,
+    "all_seasons": 12_844,
+}
+SCALES = (1, 10, 100)
+CHUNK_GAMES = 200_000
+
+NULL_RATES = {
+    "game": {"ft_pct": 0.001, "wl": 0.0005, "plus_minus": 0.001},
+    "line_score": {"pts_ot": 0.30, "team_wins_losses": 0.02, "pts_qtr1": 0.002},
+    "other_stats": {"team_rebounds": 0.07, "pts_off_to": 0.075, "total_turnovers": 0.011},
+    "player": {"first_name": 0.0012},
+    "all_seasons": {"college": 0.144},
+}
+DUPLICATE_RATES = {
+    "game": 0.003,
+    "line_score": 0.003,
+    "other_stats": 0.00035,
+    "player": 0.0,
+    "all_seasons": 0.0003,
+}
+
+# (id, full_name, abbreviation, nickname, city, state, year_founded)
+TEAMS = [
+    (1610612737, "Atlanta Hawks", "ATL", "Hawks", "Atlanta", "Atlanta", 1949),
+    (1610612738, "Boston Celtics", "BOS", "Celtics", "Boston", "Massachusetts", 1946),
+    (1610612739, "Cleveland Cavaliers", "CLE", "Cavaliers", "Cleveland", "Ohio", 1970),
+    (1610612740, "New Orleans Pelicans", "NOP", "Pelicans", "New Orleans", "Louisiana", 2002),
+    (1610612741, "Chicago Bulls", "CHI", "Bulls", "Chicago", "Illinois", 1966),
+    (1610612742, "Dallas Mavericks", "DAL", "Mavericks", "Dallas", "Texas", 1980),
+    (1610612743, "Denver Nuggets", "DEN", "Nuggets", "Denver", "Colorado", 1976),
+    (1610612744, "Golden State Warriors", "GSW", "Warriors", "Golden State", "California", 1946),
+    (1610612745, "Houston Rockets", "HOU", "Rockets", "Houston", "Texas", 1967),
+    (1610612746, "Los Angeles Clippers", "LAC", "Clippers", "Los Angeles", "California", 1970),
+    (1610612747, "Los Angeles Lakers", "LAL", "Lakers", "Los Angeles", "California", 1948),
+    (1610612748, "Miami Heat", "MIA", "Heat", "Miami", "Florida", 1988),
+    (1610612749, "Milwaukee Bucks", "MIL", "Bucks", "Milwaukee", "Wisconsin", 1968),
+    (1610612750, "Minnesota Timberwolves", "MIN", "Timberwolves", "Minnesota", "Minnesota", 1989),
+    (1610612751, "Brooklyn Nets", "BKN", "Nets", "Brooklyn", "New York", 1976),
+    (1610612752, "New York Knicks", "NYK", "Knicks", "New York", "New York", 1946),
+    (1610612753, "Orlando Magic", "ORL", "Magic", "Orlando", "Florida", 1989),
+    (1610612754, "Indiana Pacers", "IND", "Pacers", "Indiana", "Indiana", 1976),
+    (1610612755, "Philadelphia 76ers", "PHI", "76ers", "Philadelphia", "Pennsylvania", 1949),
+    (1610612756, "Phoenix Suns", "PHX", "Suns", "Phoenix", "Arizona", 1968),
+    (1610612757, "Portland Trail Blazers", "POR", "Trail Blazers", "Portland", "Oregon", 1970),
+    (1610612758, "Sacramento Kings", "SAC", "Kings", "Sacramento", "California", 1948),
+    (1610612759, "San Antonio Spurs", "SAS", "Spurs", "San Antonio", "Texas", 1976),
+    (1610612760, "Oklahoma City Thunder", "OKC", "Thunder", "Oklahoma City", "Oklahoma", 1967),
+    (1610612761, "Toronto Raptors", "TOR", "Raptors", "Toronto", "Ontario", 1995),
+    (1610612762, "Utah Jazz", "UTA", "Jazz", "Utah", "Utah", 1974),
+    (1610612763, "Memphis Grizzlies", "MEM", "Grizzlies", "Memphis", "Tennessee", 1995),
+    (1610612764, "Washington Wizards", "WAS", "Wizards", "Washington", "District of Columbia", 1961),
+    (1610612765, "Detroit Pistons", "DET", "Pistons", "Detroit", "Michigan", 1948),
+    (1610612766, "Charlotte Hornets", "CHA", "Hornets", "Charlotte", "North Carolina", 1988),
+]
+# Abreviaciones antiguas de all_seasons.csv (las corrige TEAM_ABBREVIATION_FIXES)
+HISTORICAL_ABBREVIATIONS = ["VAN", "SEA", "NJN", "CHH", "NOH", "NOK", "CHO"]
+
+_SYLLABLES = ["ka", "mar", "de", "lo", "ja", "ron", "ti", "an", "bel", "cu", "ray", "mon",
+              "sha", "qu", "el", "vin", "to", "nes", "wal", "ker", "jo", "son", "lin", "da"]
+
+_FIRST_SEASON, _LAST_SEASON = 1946, 2022
+_THREE_POINT_SEASON = 1979
+_FULL_BOX_SEASON = 1973
+_DATE_FORMAT = "%Y-%m-%d 00:00:00"
+
+_BOX_COLS = ["fgm", "fga", "fg_pct", "fg3m", "fg3a", "fg3_pct", "ftm", "fta", "ft_pct",
+             "oreb", "dreb", "reb", "ast", "stl", "blk", "tov", "pf", "pts", "plus_minus"]
+_GAME_SIDE_COLS = ["team_id", "team_abbreviation", "team_name", "matchup", "wl",
+                   *_BOX_COLS, "video_available"]
+_LINE_SCORE_SIDE_COLS = ["team_id", "team_abbreviation", "team_city_name", "team_nickname",
+                         "team_wins_losses", *[f"pts_qtr{i}" for i in range(1, 5)],
+                         *[f"pts_ot{i}" for i in range(1, 11)], "pts"]
+_OTHER_STATS_SIDE_COLS = ["team_id", "team_abbreviation", "team_city", "pts_paint",
+                          "pts_2nd_chance", "pts_fb", "largest_lead"]
+_OTHER_STATS_TAIL_COLS = ["team_turnovers", "total_turnovers", "team_rebounds", "pts_off_to"]
+
+# Columnas en el orden de los CSV de Kaggle
+GAME_COLUMNS = (["season_id"]
+                + [f"{c}_home" for c in _GAME_SIDE_COLS[:3]] + ["game_id", "game_date"]
+                + [f"{c}_home" for c in _GAME_SIDE_COLS[3:5]] + ["min"]
+                + [f"{c}_home" for c in _GAME_SIDE_COLS[5:]]
+                + [f"{c}_away" for c in _GAME_SIDE_COLS]
+                + ["season_type"])
+LINE_SCORE_COLUMNS = (["game_date_est", "game_sequence", "game_id"]
+                      + [f"{c}_home" for c in _LINE_SCORE_SIDE_COLS]
+                      + [f"{c}_away" for c in _LINE_SCORE_SIDE_COLS])
+OTHER_STATS_COLUMNS = (["game_id", "league_id"]
+                       + [f"{c}_home" for c in _OTHER_STATS_SIDE_COLS] + ["lead_changes", "times_tied"]
+                       + [f"{c}_home" for c in _OTHER_STATS_TAIL_COLS]
+                       + [f"{c}_away" for c in _OTHER_STATS_SIDE_COLS]
+                       + [f"{c}_away" for c in _OTHER_STATS_TAIL_COLS])
+
+
+def dataset_paths(out_dir):
+    """Rutas de los CSV sintéticos dentro de out_dir (misma estructura que Kaggle)"""
+    out_dir = Path(out_dir)
+    csv_dir = out_dir / "basketball" / "csv"
+    return {
+        "csv_dir": csv_dir,
+        "game": csv_dir / "game.csv",
+        "line_score": csv_dir / "line_score.csv",
+        "other_stats": csv_dir / "other_stats.csv",
+        "player": csv_dir / "player.csv",
+        "team": csv_dir / "team.csv",
+        "all_seasons": out_dir / "nba_players" / "all_seasons.csv",
+    }
+
+
+# ============================================
+# UTILIDADES
+# ============================================
+def _rows(table, scale):
+    return max(int(round(BASE_ROWS[table] * scale)), 1)
+
+
+def _names(rng, n, min_syllables=2, max_syllables=3):
+    """Nombres inventados con sílabas (miles de valores distintos, como los reales)"""
+    count = rng.integers(min_syllables, max_syllables + 1, n)
+    parts = rng.choice(_SYLLABLES, (n, max_syllables))
+    names = pd.Series(parts[:, 0])
+    for i in range(1, max_syllables):
+        names = names + np.where(count > i, parts[:, i], "")
+    return names.str.capitalize()
+
+
+def _with_nulls(rng, df, rates):
+    """Vacía al azar cada columna según la tasa de su nombre base (sin _home/_away)"""
+    for col in df.columns:
+        base = col.removesuffix("_home").removesuffix("_away")
+        rate = rates.get(base, rates.get(base.rstrip("0123456789")))
+        if rate:
+            mask = rng.random(len(df)) < rate
+            if mask.any():
+                df[col] = df[col].astype("float64" if df[col].dtype.kind in "iuf" else object)
+                df.loc[mask, col] = np.nan
+    return df
+
+
+def _with_duplicates(rng, df, rate):
+    """Agrega filas repetidas tal cual al final del bloque"""
+    n = rng.binomial(len(df), rate) if rate else 0
+    if n == 0:
+        return df
+    return pd.concat([df, df.iloc[rng.integers(0, len(df), n)]], ignore_index=True)
+
+
+def _write(df, path, first, **kwargs):
+    df.to_csv(path, mode="w" if first else "a", header=first, **kwargs)
+
+
+# ============================================
+# TABLAS CHICAS
+# ============================================
+def make_team():
+    """Los 30 equipos actuales, con year_founded como float igual que team.csv"""
+    df = pd.DataFrame(TEAMS, columns=["id", "full_name", "abbreviation", "nickname",
+                                      "city", "state", "year_founded"])
+    return df.astype({"year_founded": "float64"})
+
+
+def make_players(n, rng):
+    """player.csv: id, full_name, first_name, last_name, is_active"""
+    first = _names(rng, n, 2, 2)
+    last = _names(rng, n, 2, 3)
+    df = pd.DataFrame({
+        "id": np.arange(76001, 76001 + n),
+        "full_name": first + " " + last,
+        "first_name": first,
+        "last_name": last,
+        "is_active": (rng.random(n) < 0.12).astype(int),
+    })
+    df = _with_nulls(rng, df, NULL_RATES["player"])
+    return _with_duplicates(rng, df, DUPLICATE_RATES["player"])
+
+
+def make_all_seasons(n, rng, player_names):
+    """all_seasons.csv: una fila por jugador y temporada desde 1996-97"""
+    season_start = rng.integers(1996, _LAST_SEASON + 1, n)
+    abbreviations = np.array([team[2] for team in TEAMS] + HISTORICAL_ABBREVIATIONS)
+    weights = np.r_[np.full(len(TEAMS), 0.95 / len(TEAMS)),
+                    np.full(len(HISTORICAL_ABBREVIATIONS), 0.05 / len(HISTORICAL_ABBREVIATIONS))]
+    colleges = _names(rng, 350, 2, 3).to_numpy()
+    countries = np.array(["USA"] * 16 + ["Canada", "France", "Spain", "Serbia", "Australia",
+                                          "Germany", "Argentina", "Brazil", "Nigeria", "Croatia"])
+    undrafted = rng.random(n) < 0.18
+    draft_year = (season_start - rng.integers(0, 12, n)).astype(str)
+    draft_round = rng.choice(["1", "2"], n, p=[0.6, 0.4])
+    draft_number = rng.integers(1, 61, n).astype(str)
+
+    pts = np.round(rng.gamma(1.9, 4.3, n), 1)
+    df = pd.DataFrame({
+        "player_name": rng.choice(player_names, n),
+        "team_abbreviation": rng.choice(abbreviations, n, p=weights),
+        "age": np.clip(np.round(rng.normal(27, 4.3, n)), 18, 44),
+        "player_height": np.round(np.clip(rng.normal(200.5, 9.1, n), 160.02, 231.14), 2),
+        "player_weight": np.round(np.clip(rng.normal(100.3, 12.4, n), 60.3, 163.3), 6),
+        "college": rng.choice(colleges, n),
+        "country": rng.choice(countries, n),
+        "draft_year": np.where(undrafted, "Undrafted", draft_year),
+        "draft_round": np.where(undrafted, "Undrafted", draft_round),
+        "draft_number": np.where(undrafted, "Undrafted", draft_number),
+        "gp": rng.integers(1, 86, n),
+        "pts": pts,
+        "reb": np.round(pts * rng.uniform(0.2, 0.8, n), 1),
+        "ast": np.round(pts * rng.uniform(0.05, 0.45, n), 1),
+        "net_rating": np.round(rng.normal(-2.2, 12.7, n), 1),
+        "oreb_pct": np.round(np.clip(rng.normal(0.054, 0.043, n), 0, 1), 3),
+        "dreb_pct": np.round(np.clip(rng.normal(0.141, 0.063, n), 0, 1), 3),
+        "usg_pct": np.round(np.clip(rng.normal(0.185, 0.054, n), 0, 1), 3),
+        "ts_pct": np.round(np.clip(rng.normal(0.513, 0.102, n), 0, 1.5), 3),
+        "ast_pct": np.round(np.clip(rng.normal(0.132, 0.094, n), 0, 1), 3),
+        "season": [f"{year}-{(year + 1) % 100:02d}" for year in season_start],
+    })
+    df = _with_nulls(rng, df, NULL_RATES["all_seasons"])
+    return _with_duplicates(rng, df, DUPLICATE_RATES["all_seasons"])
+
+
+# ============================================
+# PARTIDOS (game, line_score, other_stats)
+# ============================================
+def _schedule(n, rng):
+    """
+    Fechas, temporada, tipo y número de partido de n partidos, en orden de fecha
+
+    Hay más partidos por temporada a medida que crece la liga (de 8 a 30 equipos).
+    """
+    seasons = np.arange(_FIRST_SEASON, _LAST_SEASON + 1)
+    teams = np.clip(8 + (seasons - _FIRST_SEASON) * 22 / 58, 8, 30)
+    season = rng.choice(seasons, n, p=teams / teams.sum())
+    day = rng.integers(0, 235, n)
+    order = np.lexsort((day, season))
+    season, day = season[order], day[order]
+    dates = (pd.to_datetime(season.astype(str) + "-10-25") + pd.to_timedelta(day, unit="D")).to_numpy()
+    playoffs = (day > 175) & (rng.random(n) < 0.6)
+    kind = np.where(playoffs, 4, 2)
+    seq = pd.DataFrame({"kind": kind, "season": season}).groupby(["kind", "season"]).cumcount().to_numpy() + 1
+    if seq.max() >= 100_000:
+        raise ValueError("Demasiados partidos por temporada para el formato de game_id")
+    return dates, season, kind, seq
+
+
+def _game_ids(season, kind, seq):
+    """game_id con el formato de la NBA: '00' + tipo + año (2 dígitos) + número (5 dígitos)"""
+    return pd.Series([f"00{k}{s % 100:02d}{q:05d}" for k, s, q in zip(kind, season, seq)])
+
+
+def _side_box(rng, pts, n, season):
+    """Estadísticas de un equipo en cada partido (pts ya calculado por cuartos)"""
+    fga = rng.integers(70, 100, n)
+    fgm = np.round(fga * rng.uniform(0.38, 0.52, n)).astype(int)
+    fg3a = rng.integers(5, 45, n)
+    fg3m = np.round(fg3a * rng.uniform(0.25, 0.42, n)).astype(int)
+    fta = rng.integers(10, 40, n)
+    ftm = np.round(fta * rng.uniform(0.6, 0.9, n)).astype(int)
+    oreb = rng.integers(5, 18, n)
+    dreb = rng.integers(25, 40, n)
+    box = {
+        "fgm": fgm, "fga": fga, "fg_pct": np.round(fgm / fga, 3),
+        "fg3m": fg3m.astype(float), "fg3a": fg3a.astype(float), "fg3_pct": np.round(fg3m / fg3a, 3),
+        "ftm": ftm, "fta": fta, "ft_pct": np.round(ftm / fta, 3),
+        "oreb": oreb.astype(float), "dreb": dreb.astype(float), "reb": oreb + dreb,
+        "ast": rng.integers(12, 32, n), "stl": rng.integers(3, 13, n).astype(float),
+        "blk": rng.integers(1, 10, n).astype(float), "tov": rng.integers(8, 22, n).astype(float),
+        "pf": rng.integers(14, 30, n), "pts": pts,
+    }
+    # Antes de 1979-80 no existía el triple; antes de 1973-74 no se registraban
+    # rebotes ofensivos/defensivos, robos, tapas ni pérdidas
+    sin_triple = season < _THREE_POINT_SEASON
+    sin_box = season < _FULL_BOX_SEASON
+    for col in ("fg3m", "fg3a", "fg3_pct"):
+        box[col] = np.where(sin_triple, np.nan, box[col])
+    for col in ("oreb", "dreb", "stl", "blk", "tov"):
+        box[col] = np.where(sin_box, np.nan, box[col])
+    return box
+
+
+def _quarters(rng, n, overtimes):
+    """Puntos por cuarto y prórroga de un equipo; pts es la suma"""
+    qtr = np.clip(np.round(rng.normal(26, 5, (n, 4))), 8, 50).astype(int)
+    ot = np.where(np.arange(1, 11) <= overtimes[:, None],
+                  np.clip(np.round(rng.normal(10, 3, (n, 10))), 0, 25), 0).astype(int)
+    return qtr, ot
+
+
+def make_games_chunk(rng, dates, season, kind, seq):
+    """
+    Un bloque de partidos: game (todos) y line_score (~88% de ellos)
+
+    Comparten game_id, fecha y equipos, y los puntos de line_score son los
+    mismos que los de game.
+
+    Returns:
+        (game, line_score, índice del equipo local, índice del visitante)
+    """
+    n = len(dates)
+    home = rng.integers(0, len(TEAMS), n)
+    away = (home + rng.integers(1, len(TEAMS), n)) % len(TEAMS)
+    teams = make_team()
+    overtimes = rng.choice([0, 1, 2, 3], n, p=[0.94, 0.045, 0.012, 0.003])
+
+    qtr, ot, pts = {}, {}, {}
+    for side in ("home", "away"):
+        qtr[side], ot[side] = _quarters(rng, n, overtimes)
+        pts[side] = qtr[side].sum(axis=1) + ot[side].sum(axis=1)
+    # Sin empates: un punto más al local en el último cuarto
+    tie = pts["home"] == pts["away"]
+    qtr["home"][tie, 3] += 1
+    pts["home"] = pts["home"] + tie
+
+    game_id = _game_ids(season, kind, seq)
+    game_date = pd.Series(pd.to_datetime(dates).strftime(_DATE_FORMAT))
+    game = {"season_id": kind * 10_000 + season, "game_id": game_id, "game_date": game_date,
+            "min": 240 + 25 * overtimes,
+            "season_type": np.where(kind == 4, "Playoffs", "Regular Season")}
+    for side, idx, other in (("home", home, away), ("away", away, home)):
+        abbr = teams["abbreviation"].to_numpy()
+        game[f"team_id_{side}"] = teams["id"].to_numpy()[idx]
+        game[f"team_abbreviation_{side}"] = abbr[idx]
+        game[f"team_name_{side}"] = teams["full_name"].to_numpy()[idx]
+        sep = " vs. " if side == "home" else " @ "
+        game[f"matchup_{side}"] = pd.Series(abbr[idx]) + sep + pd.Series(abbr[other])
+        rival = "away" if side == "home" else "home"
+        game[f"wl_{side}"] = np.where(pts[side] > pts[rival], "W", "L")
+        for col, values in _side_box(rng, pts[side], n, season).items():
+            game[f"{col}_{side}"] = values
+        game[f"plus_minus_{side}"] = pts[side] - pts[rival]
+        game[f"video_available_{side}"] = (season >= 2012).astype(int)
+    df_game = pd.DataFrame(game)[GAME_COLUMNS]
+
+    # line_score: ~88% de los partidos, igual que en Kaggle
+    ls = rng.random(n) < BASE_ROWS["line_score"] / BASE_ROWS["game"]
+    line = {"game_date_est": game_date[ls].to_numpy(), "game_sequence": rng.integers(1, 15, ls.sum()),
+            "game_id": game_id[ls].to_numpy()}
+    for side, idx in (("home", home), ("away", away)):
+        line[f"team_id_{side}"] = teams["id"].to_numpy()[idx][ls]
+        line[f"team_abbreviation_{side}"] = teams["abbreviation"].to_numpy()[idx][ls]
+        line[f"team_city_name_{side}"] = teams["city"].to_numpy()[idx][ls]
+        line[f"team_nickname_{side}"] = teams["nickname"].to_numpy()[idx][ls]
+        line[f"team_wins_losses_{side}"] = (pd.Series(rng.integers(0, 60, ls.sum())).astype(str) + "-"
+                                            + pd.Series(rng.integers(0, 60, ls.sum())).astype(str))
+        for i in range(4):
+            line[f"pts_qtr{i + 1}_{side}"] = qtr[side][ls, i]
+        for i in range(10):
+            line[f"pts_ot{i + 1}_{side}"] = ot[side][ls, i]
+        line[f"pts_{side}"] = pts[side][ls]
+    df_line_score = pd.DataFrame(line)[LINE_SCORE_COLUMNS]
+    return df_game, df_line_score, home, away
+
+
+def make_other_stats_chunk(rng, df_game, home, away, fraction):
+    """other_stats de los partidos del bloque desde 1996-97 (una fracción de ellos)"""
+    keep = (df_game["game_date"] >= "1996-10-01").to_numpy() & (rng.random(len(df_game)) < fraction)
+    n = int(keep.sum())
+    teams = make_team()
+    other = {"game_id": df_game["game_id"].to_numpy()[keep], "league_id": np.full(n, "00"),
+             "lead_changes": rng.integers(0, 25, n), "times_tied": rng.integers(0, 20, n)}
+    for side, idx in (("home", home[keep]), ("away", away[keep])):
+        other[f"team_id_{side}"] = teams["id"].to_numpy()[idx]
+        other[f"team_abbreviation_{side}"] = teams["abbreviation"].to_numpy()[idx]
+        other[f"team_city_{side}"] = teams["city"].to_numpy()[idx]
+        other[f"pts_paint_{side}"] = rng.integers(20, 70, n)
+        other[f"pts_2nd_chance_{side}"] = rng.integers(0, 30, n)
+        other[f"pts_fb_{side}"] = rng.integers(0, 30, n)
+        other[f"largest_lead_{side}"] = rng.integers(0, 35, n)
+        other[f"team_turnovers_{side}"] = rng.integers(0, 4, n).astype(float)
+        other[f"total_turnovers_{side}"] = rng.integers(6, 25, n).astype(float)
+        other[f"team_rebounds_{side}"] = rng.integers(3, 16, n).astype(float)
+        other[f"pts_off_to_{side}"] = rng.integers(5, 30, n).astype(float)
+    return pd.DataFrame(other)[OTHER_STATS_COLUMNS]
+
+
+# ============================================
+# GENERACIÓN COMPLETA
+# ============================================
+def generate(out_dir, scale=1, seed=42, chunk_games=None):
+    """
+    Genera todos los CSV sintéticos en out_dir
+
+    Args:
+        out_dir: carpeta de salida (se crean basketball/csv y nba_players)
+        scale: múltiplo de las filas reales (1, 10, 100; acepta fracciones)
+        seed: semilla; misma semilla y escala dan los mismos archivos
+        chunk_games: partidos por bloque (por defecto CHUNK_GAMES)
+
+    Returns:
+        {tabla: filas escritas}
+    """
+    rng = np.random.default_rng(seed)
+    paths = dataset_paths(out_dir)
+    paths["csv_dir"].mkdir(parents=True, exist_ok=True)
+    paths["all_seasons"].parent.mkdir(parents=True, exist_ok=True)
+    chunk_games = chunk_games or CHUNK_GAMES
+    rows = {}
+
+    df_team = make_team()
+    df_team.to_csv(paths["team"], index=False)
+    rows["team"] = len(df_team)
+
+    df_player = make_players(_rows("player", scale), rng)
+    df_player.to_csv(paths["player"], index=False)
+    rows["player"] = len(df_player)
+
+    df_all_seasons = make_all_seasons(_rows("all_seasons", scale), rng,
+                                      df_player["full_name"].to_numpy())
+    # La primera columna del CSV real es el índice sin nombre
+    df_all_seasons.to_csv(paths["all_seasons"])
+    rows["all_seasons"] = len(df_all_seasons)
+    del df_player, df_all_seasons
+
+    dates, season, kind, seq = _schedule(_rows("game", scale), rng)
+    modern = (season >= 1996).sum()
+    fraction = min(_rows("other_stats", scale) / modern, 1.0) if modern else 0.0
+    rows.update(game=0, line_score=0, other_stats=0)
+    for first in range(0, len(dates), chunk_games):
+        block = slice(first, first + chunk_games)
+        df_game, df_line_score, home, away = make_games_chunk(
+            rng, dates[block], season[block], kind[block], seq[block]
+        )
+        df_other_stats = make_other_stats_chunk(rng, df_game, home, away, fraction)
+        for table, df in (("game", df_game), ("line_score", df_line_score),
+                          ("other_stats", df_other_stats)):
+            df = _with_nulls(rng, df, NULL_RATES[table])
+            df = _with_duplicates(rng, df, DUPLICATE_RATES[table])
+            _write(df, paths[table], first == 0, index=False)
+            rows[table] += len(df)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera datasets NBA sintéticos con el formato de Kaggle")
+    parser.add_argument("--scale", type=float, nargs="+", default=list(SCALES),
+                        help="múltiplos de las filas reales (por defecto 1 10 100)")
+    parser.add_argument("--out", default="data/synthetic", help="carpeta base; cada escala va en x<escala>/")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for scale in args.scale:
+        out_dir = Path(args.out) / f"x{scale:g}"
+        print(f"🧪 Generando escala x{scale:g} en {out_dir}")
+        for table, n in generate(out_dir, scale, args.seed).items():
+            print(f"   {table:<12}{n:>12,} filas")
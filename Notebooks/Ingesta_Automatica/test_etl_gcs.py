@@ -0,0 +1,103 @@
+import gzip
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from conftest import make_game
+from etl_gcs import upload_stream, format_upload_stats, _csv_ready
+from etl_io import read_table_csv, to_arrow_table
+
+# ============================================
+# SUBIDA POR STREAMING CONTRA LocalBucket
+# ============================================
+# upload_stream escribe en un objeto de LocalBucket (una carpeta temporal)
+# igual que en una subida resumible de GCS: se lee el archivo resultante y
+# se compara con la tabla original.
+BLOB = "nba_data/cleaned/game_cleaned"
+
+
+def read_csv_text(path, text, table):
+    """Escribe un CSV y lo lee con el plan de tipos (read_table_csv lee el archivo dos veces)"""
+    path.write_text(text, encoding="utf-8")
+    return read_table_csv(path, table)
+
+
+def expected_csv(path, dataframe, table):
+    """La tabla leída de un CSV sin comprimir con las columnas que sube upload_stream"""
+    return read_csv_text(path, _csv_ready(dataframe, table).to_csv(index=False), table)
+
+
+def test_gzip_csv_round_trip(tmp_path, bucket, game):
+    stats = upload_stream(bucket, f"{BLOB}.csv", game, "game", "csv", compress=True, rows_per_chunk=5)
+
+    with bucket.blob(f"{BLOB}.csv").open("rb") as f:
+        data = f.read()
+    assert data[:2] == b"\x1f\x8b"
+    leido = read_csv_text(tmp_path / "leido.csv", gzip.decompress(data).decode("utf-8"), "game")
+    pd.testing.assert_frame_equal(leido, expected_csv(tmp_path / "esperado.csv", game, "game"))
+    assert leido["game_id"].tolist() == game["game_id"].tolist()
+    assert leido["min"].isna().sum() == game["min"].isna().sum()
+    assert stats["rows"] == len(game)
+
+
+def test_parquet_round_trip_multiple_row_groups(bucket, game):
+    upload_stream(bucket, f"{BLOB}.parquet", game, "game", "parquet", rows_per_chunk=5)
+
+    path = bucket.blob(f"{BLOB}.parquet").path
+    assert pq.ParquetFile(path).num_row_groups == 5  # 24 filas de a 5
+    # Igual a convertir la tabla completa de una vez
+    esperado = to_arrow_table(game, "game")
+    leido = pq.read_table(path)
+    assert leido.schema == esperado.schema
+    assert leido.equals(esperado)
+
+
+def test_upload_reports_bytes(bucket):
+    game = make_game(300)
+    csv = upload_stream(bucket, f"{BLOB}.csv", game, "game", "csv", compress=True)
+    parquet = upload_stream(bucket, f"{BLOB}.parquet", game, "game", "parquet")
+
+    # CSV: bytes_raw es el CSV sin comprimir y bytes_sent el objeto gzip
+    assert csv["bytes_raw"] == len(_csv_ready(game, "game").to_csv(index=False).encode("utf-8"))
+    assert csv["bytes_sent"] == bucket.blob(f"{BLOB}.csv").path.stat().st_size
+    assert csv["bytes_sent"] < csv["bytes_raw"]
+    # Parquet ya viene comprimido: lo enviado es lo escrito
+    assert parquet["bytes_sent"] == parquet["bytes_raw"] == bucket.blob(f"{BLOB}.parquet").path.stat().st_size
+    for stats in (csv, parquet):
+        assert stats["rows"] == len(game)
+        assert stats["seconds"] > 0 and stats["mb_s"] > 0
+    assert f"{len(game):,} filas" in format_upload_stats(csv)
+
+
+def test_failed_upload_keeps_previous_object(bucket, game):
+    upload_stream(bucket, f"{BLOB}.parquet", game, "game", "parquet", rows_per_chunk=5)
+    anterior = bucket.blob(f"{BLOB}.parquet").download_as_bytes()
+
+    # game_id es REQUIRED: el tercer bloque falla después de escribir los dos primeros
+    rota = make_game(20)
+    rota.loc[rota.index[12], "game_id"] = None
+    with pytest.raises(ValueError, match="game_id"):
+        upload_stream(bucket, f"{BLOB}.parquet", rota, "game", "parquet", rows_per_chunk=5)
+
+    assert bucket.blob(f"{BLOB}.parquet").download_as_bytes() == anterior
+    assert [b.name for b in bucket.list_blobs()] == [f"{BLOB}.parquet"]
+
+
+def test_compose_gzip_members(tmp_path, bucket):
+    # Lo que hace merge_csv_increment: el objeto base con encabezado más un
+    # incremento sin encabezado, concatenados con compose
+    base, nuevos = make_game(10), make_game(4, first=10)
+    upload_stream(bucket, f"{BLOB}.csv", base, "game", "csv", compress=True, rows_per_chunk=7)
+    upload_stream(bucket, f"{BLOB}_run.csv", nuevos, "game", "csv", header=False, compress=True)
+
+    destino = bucket.blob(f"{BLOB}.csv")
+    destino.compose([destino, bucket.blob(f"{BLOB}_run.csv")])
+
+    texto = gzip.decompress(destino.download_as_bytes()).decode("utf-8")
+    lineas = texto.splitlines()
+    assert lineas[0].startswith("season_id,game_id,game_date")
+    assert len(lineas) == 1 + 2 * (10 + 4)
+    leido = read_csv_text(tmp_path / "leido.csv", texto, "game")
+    esperado = expected_csv(tmp_path / "esperado.csv", pd.concat([base, nuevos], ignore_index=True), "game")
+    pd.testing.assert_frame_equal(leido, esperado)
@@ -0,0 +1,164 @@
+import gzip
+import importlib
+from types import SimpleNamespace
+
+import pyarrow.parquet as pq
+import pytest
+
+from conftest import make_game
+from etl_gcs import load_from_gcs, schema_for
+
+bigquery = pytest.importorskip("google.cloud.bigquery")
+pytest.importorskip("dotenv")
+
+# ============================================
+# CARGA A BIGQUERY DESDE GCS CON CLIENTES STUB
+# ============================================
+# publish_table corre contra LocalBucket y un cliente de BigQuery stub que
+# registra cada load_table_from_uri: se verifica el objeto gs:// que se carga,
+# la configuración del job (esquema explícito, sin autodetect, encabezado del
+# CSV, modo de escritura) y que el objeto exista con las filas publicadas.
+BUCKET_NAME = "nba-test"
+RUN_ID = "20240101T000000"
+
+
+class StubJob:
+    def __init__(self, output_rows):
+        self.output_rows = output_rows
+
+    def result(self):
+        return self
+
+
+class StubBigQuery:
+    """Cliente de BigQuery que registra las cargas y lee el objeto de LocalBucket"""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.loads = []
+        self.rows = {}
+
+    def load_table_from_uri(self, uri, table_id, job_config=None):
+        prefix = f"gs://{BUCKET_NAME}/"
+        assert uri.startswith(prefix)
+        blob = self.bucket.blob(uri[len(prefix):])
+        assert blob.exists(), uri
+        if job_config.source_format == "PARQUET":
+            rows = pq.read_metadata(blob.path).num_rows
+        else:
+            lines = gzip.decompress(blob.download_as_bytes()).decode("utf-8").splitlines()
+            rows = len(lines) - job_config.skip_leading_rows
+        self.loads.append({"uri": uri, "table_id": table_id, "job_config": job_config, "rows": rows})
+        total = self.rows.get(table_id, 0) if job_config.write_disposition == "WRITE_APPEND" else 0
+        self.rows[table_id] = total + rows
+        return StubJob(rows)
+
+    def get_table(self, table_id):
+        return SimpleNamespace(num_rows=self.rows[table_id])
+
+
+@pytest.fixture
+def etl(tmp_path, monkeypatch, bucket):
+    """etl_project_gcp_bq con LocalBucket, BigQuery stub y salidas en tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GOOGLE_APPLICATION_CREDENTIALS", str(tmp_path / "credenciales.json"))
+    monkeypatch.setenv("ETL_RUN_LOG", str(tmp_path / "etl_runs.jsonl"))
+    module = importlib.import_module("etl_project_gcp_bq")
+    client = StubBigQuery(bucket)
+    monkeypatch.setattr(module, "_bucket", bucket)
+    monkeypatch.setattr(module, "_bq_client", client)
+    monkeypatch.setattr(module, "BUCKET_NAME", BUCKET_NAME)
+    monkeypatch.setattr(module, "PROJECT_ID", "proyecto")
+    monkeypatch.setattr(module, "cleaned_dir", tmp_path / "cleaned")
+    monkeypatch.setattr(module, "run_id", RUN_ID)
+    (tmp_path / "cleaned").mkdir()
+    return SimpleNamespace(module=module, client=client, bucket=bucket)
+
+
+def set_formats(monkeypatch, value):
+    import etl_io
+    monkeypatch.setattr(etl_io, "OUTPUT_FORMAT", value)
+
+
+def schema_fields(schema):
+    return [(field.name, field.field_type, field.mode) for field in schema]
+
+
+def test_load_from_gcs_config(bucket, game):
+    client = StubBigQuery(bucket)
+    blob = bucket.blob("nba_data/cleaned/game_cleaned_run.csv")
+    with blob.open("wb") as f:
+        f.write(gzip.compress(b"a,b\n1,2\n"))
+    schema = [bigquery.SchemaField("game_id", "STRING", mode="REQUIRED")]
+
+    job = load_from_gcs(client, f"gs://{BUCKET_NAME}/{blob.name}", "p.d.games", schema, "csv",
+                        bigquery.WriteDisposition.WRITE_APPEND, header=False)
+
+    config = client.loads[0]["job_config"]
+    assert config.autodetect is False
+    assert config.schema == schema
+    assert config.source_format == "CSV"
+    assert config.skip_leading_rows == 0
+    assert config.write_disposition == "WRITE_APPEND"
+    assert job.output_rows == 2
+
+
+def test_publish_parquet_truncate_then_append(etl, monkeypatch):
+    set_formats(monkeypatch, "both")
+    m = etl.module
+    base, nuevos = make_game(10), make_game(3, first=10)
+
+    assert m.publish_table(base, "game", m.schema_game, m.MODE_TRUNCATE)
+    assert m.publish_table(nuevos, "game", m.schema_game, m.MODE_APPEND)
+
+    truncate, append = etl.client.loads
+    assert truncate["uri"] == f"gs://{BUCKET_NAME}/nba_data/cleaned/game_cleaned.parquet"
+    assert append["uri"] == f"gs://{BUCKET_NAME}/nba_data/cleaned/game_cleaned_{RUN_ID}.parquet"
+    assert truncate["table_id"] == append["table_id"] == "proyecto.nba_analytics.games"
+    for load, disposition, df in ((truncate, "WRITE_TRUNCATE", base), (append, "WRITE_APPEND", nuevos)):
+        config = load["job_config"]
+        assert config.source_format == "PARQUET"
+        assert config.autodetect is False
+        assert config.write_disposition == disposition
+        # Solo las columnas del esquema presentes en la tabla, en el orden del esquema
+        assert schema_fields(config.schema) == schema_fields(schema_for(m.schema_game, df))
+        assert load["rows"] == len(df)
+
+    # El CSV del incremento se concatenó al base con compose y se borró
+    names = [blob.name for blob in etl.bucket.list_blobs(prefix="nba_data/cleaned/")]
+    assert names == ["nba_data/cleaned/game_cleaned.csv", "nba_data/cleaned/game_cleaned.parquet",
+                     f"nba_data/cleaned/game_cleaned_{RUN_ID}.parquet"]
+    csv = etl.bucket.blob("nba_data/cleaned/game_cleaned.csv").download_as_bytes()
+    lineas = gzip.decompress(csv).decode("utf-8").splitlines()
+    assert lineas[0].startswith("season_id,game_id,game_date")
+    assert len(lineas) == 1 + len(base) + len(nuevos)
+
+
+def test_publish_csv_increment_without_header(etl, monkeypatch):
+    set_formats(monkeypatch, "csv")
+    m = etl.module
+    base, nuevos = make_game(10), make_game(3, first=10)
+
+    assert m.publish_table(base, "game", m.schema_game, m.MODE_TRUNCATE)
+    assert m.publish_table(nuevos, "game", m.schema_game, m.MODE_APPEND)
+
+    truncate, append = etl.client.loads
+    assert truncate["uri"] == f"gs://{BUCKET_NAME}/nba_data/cleaned/game_cleaned.csv"
+    assert append["uri"] == f"gs://{BUCKET_NAME}/nba_data/cleaned/game_cleaned_{RUN_ID}.csv"
+    assert truncate["job_config"].skip_leading_rows == 1
+    assert truncate["job_config"].write_disposition == "WRITE_TRUNCATE"
+    # El incremento CSV no tiene encabezado: no se saltea ninguna fila
+    assert append["job_config"].skip_leading_rows == 0
+    assert append["job_config"].write_disposition == "WRITE_APPEND"
+    for load in (truncate, append):
+        assert load["job_config"].source_format == "CSV"
+        assert load["job_config"].autodetect is False
+        assert schema_fields(load["job_config"].schema) == schema_fields(schema_for(m.schema_game, base))
+    assert append["rows"] == len(nuevos)
+    assert etl.client.rows["proyecto.nba_analytics.games"] == len(base) + len(nuevos)
+
+    # Tras el compose queda un solo objeto: encabezado más todas las filas
+    names = [blob.name for blob in etl.bucket.list_blobs(prefix="nba_data/cleaned/")]
+    assert names == ["nba_data/cleaned/game_cleaned.csv"]
+    csv = etl.bucket.blob("nba_data/cleaned/game_cleaned.csv").download_as_bytes()
+    assert len(gzip.decompress(csv).decode("utf-8").splitlines()) == 1 + len(base) + len(nuevos)
@@ -1,15 +1,21 @@
+import hashlib
+import os
+import time
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
 import seaborn as sns
 
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.cluster import KMeans
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, r2_score, accuracy_score
+from nba_data import read_dataset, read_duckdb_dataset
+from nba_cache import load_dataset, load_report, CACHE_DIR
+from nba_charts import chart_data
+from nba_profile import profile_dataset, numeric_columns, slider_range
+from nba_similar import load_or_build_index, find_row, query_similar
+from nba_models import (load_or_train, model_hash, score_batch, TARGET, FEATURES, RF_FEATURES,
+                        CLUSTER_COLS, POTENTIAL_QUANTILE)
 
 # ======================================================
 # CONFIG GENERAL (COLORES + PAGE CONFIG + CSS + LOGO)
@@ -85,32 +91,56 @@ CSV_FILES = {
     "team": "team_filtrado.csv",
     "game": "game_filtrado.csv",
     "line_score": "line_score_filtrado.csv",
-    "resumen": "resumen.csv"
+    "resumen": "resumen.csv",
+    # Agregados por equipo y temporada del ETL (opcional)
+    "team_season": "team_season_cleaned.csv"
 }
 
-# ---- CARGA DE LOS 7 CSV ----
-@st.cache_data
-def load_default_csvs():
-    dfs = {}
-    for k, fname in CSV_FILES.items():
-        try:
-            dfs[k] = pd.read_csv(RAW + fname)
-        except:
-            dfs[k] = pd.DataFrame()
-    return dfs
+# Almacén DuckDB local (etl_duckdb.py): si NBA_DUCKDB apunta a un archivo
+# existente, los datasets se leen de ahí en vez de GitHub
+DUCKDB_PATH = os.getenv("NBA_DUCKDB")
+USE_DUCKDB = bool(DUCKDB_PATH) and os.path.exists(DUCKDB_PATH)
+
+# ---- CARGA DE LOS CSV (a demanda) ----
+# Cada CSV se lee con su plan de tipos (nba_data.DTYPE_PLAN): categóricas,
+# enteros chicos y ids como texto. Un dataset se carga recién cuando se usa
+# (puntaje siempre; el resto al elegirlo como dataset principal).
+# nba_cache.load_dataset lo sirve desde memoria, desde la caché Parquet en
+# disco (NBA_CACHE_DIR) o, si no está, desde la fuente remota.
+def fetch_default(k):
+    """Función que trae el dataset k de la fuente remota, y la descripción de esa fuente"""
+    if USE_DUCKDB:
+        return (lambda: read_duckdb_dataset(DUCKDB_PATH, k)), f"duckdb:{DUCKDB_PATH}"
+    return (lambda: read_dataset(RAW + CSV_FILES[k], k)), RAW + CSV_FILES[k]
+
+
+# Versión (hash) de cada dataset cargado: clave de los resultados cacheados
+versiones = {}
+
 
-dfs_default = load_default_csvs()
+def get_dataset(k):
+    """Dataset k, cargado la primera vez que se pide; avisa si no se pudo cargar"""
+    fetch, source = fetch_default(k)
+    df, log = load_dataset(k, fetch, source)
+    if log["error"]:
+        st.warning(f"No se pudo cargar {k}. Revisá la conexión o la caché en {CACHE_DIR}.")
+    versiones[k] = f"{k}:{log['sha256']}"
+    return df
+
+df_puntaje = get_dataset("puntaje")
 
 # ---- CARGA DE ARCHIVO SUBIDO ----
 uploaded = st.file_uploader("📂 Subir archivo CSV (opcional) para reemplazar dataset principal")
 
 if uploaded:
-    df_uploaded = pd.read_csv(uploaded)
+    df_uploaded, _ = read_dataset(uploaded, "puntaje")
+    versiones["uploaded"] = "subido:" + hashlib.sha256(uploaded.getvalue()).hexdigest()[:12]
     df_base = df_uploaded.copy()
     st.success(f"Archivo cargado correctamente: {uploaded.name}")
 else:
     df_base = None
-    st.info("Archivos por defecto: cargados correctamente.")
+    origen = f"almacén DuckDB local ({DUCKDB_PATH})" if USE_DUCKDB else "GitHub"
+    st.info(f"Archivos por defecto (fuente: {origen}): se cargan al elegirlos.")
 
 st.markdown("---")
 
@@ -132,27 +162,36 @@ else:
         "line_score_filtrado.csv": "line_score",
         "resumen.csv": "resumen"
     }
+    # Opcional: si no está publicado, al elegirlo se avisa que no se pudo cargar
+    opciones["team_season (por equipo y temporada)"] = "team_season"
 
 choice = st.selectbox("Dataset principal:", list(opciones.keys()))
 
 if choice == "Archivo subido":
     df_nba = df_base.copy()
 else:
-    df_nba = dfs_default[opciones[choice]].copy()
+    df_nba = get_dataset(opciones[choice]).copy()
+version_nba = versiones[opciones[choice]]
 
 st.success(f"Dataset seleccionado: {choice} — {df_nba.shape[0]:,} filas")
 
+# Solo los datasets cargados hasta ahora; una nueva selección se agrega al elegirla
+with st.expander("🧠 Carga y memoria por dataset (origen: disco / remoto)"):
+    st.dataframe(load_report(), use_container_width=True)
+
 st.markdown("---")
 
 # ======================================================
-# 3. PREPARAR ETIQUETA DE POTENCIAL + ENTRENAR CLASIFICADOR
+# 3. PREPARAR ETIQUETA DE POTENCIAL + CARGAR CLASIFICADOR
 # ======================================================
+# Los modelos salen del registro (nba_models.py): se entrenan una sola vez
+# por hash de los datos y quedan en memoria entre reruns. Mover un slider ya
+# no vuelve a entrenar nada.
 
-TARGET = "global_score"
-FEATURES = [
-    "ts_pct_score","usg_pct_score","dreb_pct_score","ast_pct_score",
-    "oreb_pct_score","age","player_height","player_weight"
-]
+@st.cache_resource
+def get_model(name, key, _df):
+    """Modelo del registro para los datos con este hash: se carga o entrena una vez"""
+    return load_or_train(name, _df)
 
 potential_threshold = None
 classifier = None
@@ -160,21 +199,22 @@ scaler_clf = None
 clf_acc = None
 
 if TARGET in df_nba.columns:
-    try:
-        potential_threshold = df_nba[TARGET].dropna().quantile(0.75)
-        df_nba["potencial_bin"] = (df_nba[TARGET] >= potential_threshold).astype(int)
-
-        df_clf = df_nba[FEATURES + ["potencial_bin"]].dropna()
-        if df_clf.shape[0] >= 40:
-            scaler_clf = StandardScaler()
-            Xs = scaler_clf.fit_transform(df_clf[FEATURES])
-            y = df_clf["potencial_bin"]
-            Xtr, Xte, ytr, yte = train_test_split(Xs, y, test_size=0.2, random_state=42)
-            classifier = LogisticRegression(max_iter=500)
-            classifier.fit(Xtr, ytr)
-            clf_acc = accuracy_score(yte, classifier.predict(Xte))
-    except:
-        pass
+    potential_threshold = df_nba[TARGET].dropna().quantile(POTENTIAL_QUANTILE)
+    df_nba["potencial_bin"] = (df_nba[TARGET] >= potential_threshold).astype(int)
+
+    clf_artifact, _ = get_model("clasificador", model_hash("clasificador", df_nba), df_nba)
+    if clf_artifact is not None:
+        classifier = clf_artifact["model"]
+        scaler_clf = clf_artifact["scaler"]
+        clf_acc = clf_artifact["metrics"]["accuracy"]
+
+# Perfil de columnas (nba_profile.py): una vez por versión del dataset. De
+# ahí salen los rangos de los sliders, el resumen estadístico y los ejes del EDA.
+@st.cache_data(max_entries=16, show_spinner=False)
+def get_profile(version, _df):
+    return profile_dataset(_df)
+
+perfil = get_profile(version_nba, df_nba)
 
 # ======================================================
 # 4. SIDEBAR — PREDICCIÓN
@@ -195,14 +235,7 @@ DEFAULT_R = {
 
 input_vals = {}
 for col in FEATURES:
-    vmin, vmax, vmean = DEFAULT_R[col]
-    if col in df_nba.columns:
-        try:
-            vmin = float(df_nba[col].min())
-            vmax = float(df_nba[col].max())
-            vmean = float(df_nba[col].median())
-        except:
-            pass
+    vmin, vmax, vmean = slider_range(perfil, col, DEFAULT_R[col])
 
     if col in ["age","player_height","player_weight"]:
         input_vals[col] = st.sidebar.slider(col, int(vmin), int(vmax), int(vmean))
@@ -224,6 +257,82 @@ if st.sidebar.button("Predecir"):
 
     st.sidebar.success(f"Resultado: {label} ({method})")
 
+# ---- PREDICCIÓN POR LOTE (SIEMPRE CON LOS MODELOS DE nba_puntaje_vara.csv) ----
+# Un CSV de candidatos (draft, agentes libres) con las columnas FEATURES se
+# puntúa de una vez: clasificador, regresor y cluster predicen sobre todas
+# las filas en una sola llamada cada uno.
+st.sidebar.markdown("---")
+st.sidebar.markdown(f"<h3 style='color:{COLOR_ACCENT};'>📋 Predicción por lote</h3>", unsafe_allow_html=True)
+lote = st.sidebar.file_uploader("CSV de candidatos (columnas de las variables de predicción)", key="lote")
+
+if lote:
+    df_lote = pd.read_csv(lote)
+    faltan = [c for c in FEATURES if c not in df_lote.columns]
+    if faltan:
+        st.sidebar.error("Faltan columnas: " + ", ".join(faltan))
+    elif df_puntaje.empty:
+        st.sidebar.error("No se pudo cargar nba_puntaje_vara.csv para los modelos.")
+    else:
+        modelos = {name: get_model(name, model_hash(name, df_puntaje), df_puntaje)[0]
+                   for name in ("clasificador", "regresor", "clusters")}
+        inicio = time.perf_counter()
+        puntuados = score_batch(df_lote, modelos["clasificador"], modelos["regresor"], modelos["clusters"])
+        segundos = time.perf_counter() - inicio
+        st.sidebar.success(f"{len(puntuados):,} candidatos puntuados en {segundos:.2f} s "
+                           f"({int(puntuados['potencial'].eq(1).sum()):,} con potencial)")
+        # El cluster usa además net_rating_score, que no está entre las variables de predicción
+        faltan_cluster = [c for c in CLUSTER_COLS if c not in df_lote.columns]
+        if faltan_cluster:
+            st.sidebar.warning("Sin cluster: faltan columnas " + ", ".join(faltan_cluster))
+        st.sidebar.dataframe(
+            puntuados.sort_values("global_score_pred", ascending=False).head(20),
+            use_container_width=True, hide_index=True
+        )
+        st.sidebar.download_button(
+            "Descargar predicciones (CSV)", puntuados.to_csv(index=False).encode("utf-8"),
+            file_name="predicciones_lote.csv", mime="text/csv"
+        )
+
+# ======================================================
+# 4b. SIDEBAR — JUGADORES SIMILARES (SIEMPRE SOBRE nba_puntaje_vara.csv)
+# ======================================================
+# El índice (KD-tree sobre los *_score) se carga de disco una vez por proceso;
+# solo se reconstruye si cambió nba_puntaje_vara.csv (ver nba_similar.py)
+
+@st.cache_resource
+def get_similar_index(_df_puntaje):
+    return load_or_build_index(_df_puntaje)
+
+st.sidebar.markdown("---")
+st.sidebar.markdown(f"<h3 style='color:{COLOR_ACCENT};'>🔎 Jugadores similares</h3>", unsafe_allow_html=True)
+
+if df_puntaje.empty:
+    st.sidebar.info("No se pudo cargar nba_puntaje_vara.csv para buscar similares.")
+else:
+    similar_index, similar_origen = get_similar_index(df_puntaje)
+    info = similar_index["info"]
+
+    jugador = st.sidebar.selectbox("Jugador", sorted(info["player_name"].dropna().unique()))
+    temporadas = info.loc[info["player_name"] == jugador, "season"].astype(str).tolist()
+    temporada = st.sidebar.selectbox("Temporada", temporadas)
+
+    k_similares = st.sidebar.slider("Cantidad de similares", 5, 25, 10)
+    anio_min, anio_max = int(info["season_year"].min()), int(info["season_year"].max())
+    rango = st.sidebar.slider("Temporadas (año inicial)", anio_min, anio_max, (anio_min, anio_max))
+    equipos = st.sidebar.multiselect("Equipos", sorted(info["team_abbreviation"].dropna().unique()))
+
+    fila = find_row(similar_index, jugador, temporada)
+    if fila is not None:
+        similares = query_similar(similar_index, fila, k_similares, seasons=rango, teams=equipos)
+        if similares.empty:
+            st.sidebar.info("Ningún jugador cumple los filtros.")
+        else:
+            st.sidebar.dataframe(
+                similares[["player_name", "team_abbreviation", "season", "global_score", "distancia"]],
+                use_container_width=True, hide_index=True
+            )
+    st.sidebar.caption(f"Índice: {len(info):,} jugadores-temporada ({similar_origen})")
+
 # ======================================================
 # 5. EDA — BARRA / LÍNEA / SCATTER
 # ======================================================
@@ -248,12 +357,9 @@ with col_preview_2:
 
 st.dataframe(df_nba.head(num_rows), use_container_width=True)
 
-# -------- Resumen estadístico --------
+# -------- Resumen estadístico (del perfil de columnas) --------
 with st.expander("Mostrar resumen estadístico"):
-    try:
-        st.dataframe(df_nba.describe().T, use_container_width=True)
-    except:
-        st.info("No se puede generar un resumen estadístico para este dataset.")
+    st.dataframe(perfil.drop(columns=["numérica"]), use_container_width=True)
 
 st.markdown("---")
 
@@ -262,8 +368,8 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-num_cols = df_nba.select_dtypes(include=['number']).columns.tolist()
-all_cols = df_nba.columns.tolist()
+num_cols = numeric_columns(perfil)
+all_cols = perfil.index.tolist()
 
 c1,c2,c3 = st.columns(3)
 
@@ -276,6 +382,12 @@ with c2:
 with c3:
     ycol = st.selectbox("Eje Y:", num_cols)
 
+# Los gráficos reciben un resumen acotado (nba_charts.py), calculado una vez
+# por versión del dataset, tipo de gráfico y par de columnas
+@st.cache_data(max_entries=64, show_spinner=False)
+def get_chart_data(version, tipo, xcol, ycol, _df):
+    return chart_data(_df, tipo, xcol, ycol)
+
 fig, ax = plt.subplots(figsize=(8,5))
 fig.patch.set_facecolor(COLOR_BG)
 ax.set_facecolor(COLOR_BG)
@@ -283,23 +395,50 @@ ax.set_facecolor(COLOR_BG)
 plt.rcParams.update({"text.color":"white","axes.labelcolor":"white","xtick.color":"white","ytick.color":"white"})
 
 try:
+    resumen_graf = get_chart_data(version_nba, tipo, xcol, ycol, df_nba)
+    g = resumen_graf.get("data")
+
     if tipo == "Barra":
-        g = df_nba.groupby(xcol)[ycol].mean().reset_index()
-        sns.barplot(data=g, x=xcol, y=ycol, ax=ax, palette="crest")
+        etiquetas = g[xcol].round(2) if pd.api.types.is_float_dtype(g[xcol]) else g[xcol]
+        g = g.assign(**{xcol: etiquetas.astype(str)})
+        sns.barplot(data=g, x=xcol, y="media", ax=ax, palette="crest")
+        detalle = f"{len(g):,} barras"
+        ax.set_ylabel(ycol)
         ax.set_title(f"{ycol} por {xcol}", color=COLOR_3)
         plt.xticks(rotation=60)
 
     elif tipo == "Línea":
-        g = df_nba[[xcol,ycol]].dropna().sort_values(xcol)
-        sns.lineplot(data=g, x=xcol, y=ycol, ax=ax, color=COLOR_2)
-        ax.set_title(f"{ycol} vs {xcol}", color=COLOR_3)
+        ax.plot(g[xcol], g["media"], color=COLOR_2)
+        ax.fill_between(g[xcol], g["media"] - g["desvío"].fillna(0), g["media"] + g["desvío"].fillna(0),
+                        color=COLOR_2, alpha=0.25)
+        detalle = f"{len(g):,} puntos"
+        ax.set_xlabel(xcol)
+        ax.set_ylabel(ycol)
+        ax.set_title(f"{ycol} vs {xcol} (promedio ± desvío)", color=COLOR_3)
         plt.xticks(rotation=60)
 
-    else:  # Scatter
-        sns.scatterplot(data=df_nba, x=xcol, y=ycol, ax=ax, color=COLOR_ACCENT)
+    elif resumen_graf["kind"] == "puntos":
+        sns.scatterplot(data=g, x=xcol, y=ycol, ax=ax, color=COLOR_ACCENT)
+        detalle = f"{len(g):,} puntos"
         ax.set_title(f"Scatter: {ycol} vs {xcol}", color=COLOR_3)
         plt.xticks(rotation=60)
 
+    else:  # Scatter como densidad 2-D
+        counts = np.ma.masked_equal(resumen_graf["counts"].T, 0)
+        xedges = resumen_graf["xedges"]
+        if resumen_graf["fecha_x"]:
+            xedges = pd.to_datetime(xedges.astype("int64"))
+        mesh = ax.pcolormesh(xedges, resumen_graf["yedges"], counts,
+                             cmap=sns.color_palette("crest", as_cmap=True), norm=LogNorm())
+        fig.colorbar(mesh, ax=ax, label="filas")
+        detalle = f"una grilla de {counts.shape[1]}x{counts.shape[0]}"
+        ax.set_xlabel(xcol)
+        ax.set_ylabel(ycol)
+        ax.set_title(f"Densidad: {ycol} vs {xcol}", color=COLOR_3)
+        plt.xticks(rotation=60)
+
+    st.caption(f"{resumen_graf['rows']:,} filas resumidas en {detalle}")
+
 except Exception as e:
     st.warning(f"No se pudo generar gráfico con esas columnas. {e}")
 
@@ -318,7 +457,7 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-df_model = dfs_default["puntaje"].copy()  # <-- SIEMPRE ESTE
+df_model = df_puntaje.copy()  # <-- SIEMPRE ESTE
 
 if not df_model.empty and "global_score" in df_model.columns:
     try:
@@ -356,31 +495,19 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-req = [
-    'age','player_height','player_weight',
-    'oreb_pct_score','dreb_pct_score','usg_pct_score',
-    'ts_pct_score','ast_pct_score'
-]
+req = RF_FEATURES
 
 if all([c in df_model.columns for c in req + ["global_score"]]):
-    df_rf = df_model.dropna(subset=req + ["global_score"])
-    if df_rf.shape[0] >= 30:
-
-        X = df_rf[req]
-        y = df_rf["global_score"]
-
-        Xtr, Xte, ytr, yte = train_test_split(X, y, test_size=0.2, random_state=42)
-
-        rf = RandomForestRegressor(n_estimators=300, random_state=42)
-        rf.fit(Xtr, ytr)
-
-        ypred = rf.predict(Xte)
+    rf_artifact, rf_origen = get_model("regresor", model_hash("regresor", df_model), df_model)
+    if rf_artifact is not None:
 
         colA, colB = st.columns(2)
-        colA.metric("MAE", f"{mean_absolute_error(yte, ypred):.4f}")
-        colB.metric("R²", f"{r2_score(yte, ypred):.4f}")
+        colA.metric("MAE", f"{rf_artifact['metrics']['mae']:.4f}")
+        colB.metric("R²", f"{rf_artifact['metrics']['r2']:.4f}")
+        st.caption(f"Modelo {rf_origen}: {rf_artifact['rows']:,} filas, entrenado el {rf_artifact['trained_at']} "
+                   f"(hash {rf_artifact['hash'][:12]})")
 
-        importancia = pd.Series(rf.feature_importances_, index=req).sort_values()
+        importancia = rf_artifact["importances"]
 
         st.write("### Importancia de variables")
         fig, ax = plt.subplots(figsize=(7,5))
@@ -467,24 +594,32 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-cluster_cols = [
-    'ts_pct_score','usg_pct_score','ast_pct_score',
-    'oreb_pct_score','dreb_pct_score','net_rating_score'
-]
+cluster_cols = CLUSTER_COLS
 
+# El barrido de k (nba_models.py, "barrido_k") trae un K-Means ajustado por
+# cada k con su inercia, silueta y promedios por cluster: cambiar k en el
+# slider solo elige uno ya entrenado.
+k = None
 if all([c in df_model.columns for c in cluster_cols]):
-    dfc = df_model.dropna(subset=cluster_cols)
-    if dfc.shape[0] >= 20:
-        scaler = StandardScaler()
-        Xsc = scaler.fit_transform(dfc[cluster_cols])
+    sweep, _ = get_model("barrido_k", model_hash("barrido_k", df_model), df_model)
+    if sweep is not None:
+        tabla_k = sweep["table"].set_index("k")
+        colA, colB = st.columns(2)
+        colA.write("Inercia por k (codo)")
+        colA.line_chart(tabla_k["inercia"])
+        colB.write("Silueta por k (más alta = clusters más separados)")
+        colB.line_chart(tabla_k["silueta"])
 
-        kmeans = KMeans(n_clusters=4, random_state=42, n_init=10)
-        dfc["cluster"] = kmeans.fit_predict(Xsc)
+        k_default = 4 if 4 in sweep["model"] else int(sweep["metrics"]["mejor_k"])
+        k = st.select_slider("Cantidad de clusters (k)", options=list(sweep["model"]), value=k_default)
+        kmeans = sweep["model"][k]
+        st.caption(f"k={k}: inercia {tabla_k.loc[k, 'inercia']:,.0f}, silueta {tabla_k.loc[k, 'silueta']:.3f} "
+                   f"(mejor silueta con k={int(sweep['metrics']['mejor_k'])})")
 
         st.write("### Centros del cluster (estandarizados)")
         st.dataframe(pd.DataFrame(kmeans.cluster_centers_, columns=cluster_cols))
 
-        summary = dfc.groupby("cluster")[cluster_cols].mean()
+        summary = sweep["summary"][k]
         dominant = summary.idxmax(axis=1)
 
         interpretacion = {
@@ -511,6 +646,8 @@ st.markdown(
     f"<h3 style='color:{COLOR_ACCENT}; margin-top:25px;'>Conclusión del análisis de Clustering</h3>",
     unsafe_allow_html=True
 )
+if k is not None and k != 4:
+    st.caption("La conclusión describe la segmentación con k=4.")
 
 conclusion_text = """
 El análisis de clustering permitió identificar **4 perfiles claros de jugadores**, basados en 
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.error import URLError
+
+import pandas as pd
+
+from nba_data import memory_mb
+
+# ======================================================
+# CACHÉ LOCAL DE LOS DATASETS DE LA APP
+# ======================================================
+# Cada dataset se busca en tres niveles, en orden:
+#   1. memoria: el DataFrame ya cargado en este proceso (reruns de Streamlit)
+#   2. disco: <dataset>.<hash>.parquet en NBA_CACHE_DIR, válido solo si el
+#      SHA-256 del archivo coincide con el de cache_manifest.json
+#   3. remoto: la fuente original (CSV de GitHub o almacén DuckDB); lo que se
+#      baja se guarda en disco para la próxima vez
+# Con la caché en disco completa la app arranca sin conexión. Si la fuente
+# remota falla se usa la copia en disco aunque venga de otra fuente.
+#
+# NBA_CACHE_DIR: carpeta de la caché (por defecto Data/Processed)
+# NBA_CACHE_REFRESH=1: al iniciar, vuelve a bajar todo en vez de leer el disco
+CACHE_DIR = Path(os.getenv("NBA_CACHE_DIR", "Data/Processed"))
+REFRESH = os.getenv("NBA_CACHE_REFRESH", "0") == "1"
+MANIFEST = "cache_manifest.json"
+
+TIER_MEMORY = "memoria"
+TIER_DISK = "disco"
+TIER_REMOTE = "remoto"
+
+# Errores esperables al leer: archivo o red (URLError es OSError), CSV o
+# Parquet inválido (ValueError), columnas faltantes (KeyError), duckdb sin
+# instalar (ImportError)
+LOAD_ERRORS = (OSError, URLError, ValueError, KeyError, ImportError)
+
+_memory = {}
+# Registro de la carga que trajo cada dataset al proceso (disco o remoto, o el
+# error si no se pudo): los aciertos en memoria no lo pisan
+_loads = {}
+
+
+def file_sha256(path, block_size=1 << 20):
+    """SHA-256 de un archivo leído por bloques"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def frame_sha256(df):
+    """SHA-256 del contenido de un DataFrame (fila por fila, sin el índice)"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def read_manifest(cache_dir=CACHE_DIR):
+    """{dataset: {file, sha256, rows, source, saved_at}}; vacío si no hay manifiesto"""
+    path = Path(cache_dir) / MANIFEST
+    if not path.exists():
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Manifiesto de caché ilegible ({path}): {e}")
+        return {}
+
+
+def _write_manifest(manifest, cache_dir):
+    path = Path(cache_dir) / MANIFEST
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_from_disk(dataset, source=None, cache_dir=CACHE_DIR):
+    """
+    Lee un dataset de la caché en disco si su hash coincide con el manifiesto
+
+    Args:
+        source: si se pasa, la copia en disco tiene que venir de esa fuente
+            (ej: no servir la versión de GitHub cuando se pidió el almacén DuckDB)
+
+    Returns:
+        (DataFrame, sha256) o (None, None) si no está o no es válido
+    """
+    entry = read_manifest(cache_dir).get(dataset)
+    if not entry or (source is not None and entry.get("source") != str(source)):
+        return None, None
+    path = Path(cache_dir) / entry["file"]
+    if not path.exists():
+        return None, None
+    sha = file_sha256(path)
+    if sha != entry["sha256"]:
+        print(f"⚠️ Caché de {dataset} descartada: el hash de {path.name} no coincide con el manifiesto")
+        return None, None
+    return pd.read_parquet(path), sha
+
+
+def save_to_disk(df, dataset, source, cache_dir=CACHE_DIR):
+    """
+    Guarda un dataset como <dataset>.<hash>.parquet y lo registra en el manifiesto
+
+    La versión anterior del dataset se borra después de actualizar el manifiesto.
+
+    Returns:
+        sha256 del archivo guardado
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_dir / f"{dataset}.tmp.parquet"
+    df.to_parquet(tmp_path, index=False)
+    sha = file_sha256(tmp_path)
+    path = cache_dir / f"{dataset}.{sha[:12]}.parquet"
+    os.replace(tmp_path, path)
+
+    manifest = read_manifest(cache_dir)
+    previous = manifest.get(dataset, {}).get("file")
+    manifest[dataset] = {
+        "file": path.name,
+        "sha256": sha,
+        "rows": len(df),
+        "source": str(source),
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    _write_manifest(manifest, cache_dir)
+    if previous and previous != path.name:
+        (cache_dir / previous).unlink(missing_ok=True)
+    return sha
+
+
+def load_dataset(dataset, fetch, source="", cache_dir=CACHE_DIR, refresh=REFRESH):
+    """
+    Carga un dataset desde el primer nivel que lo tenga: memoria, disco o remoto
+
+    Args:
+        dataset: nombre del dataset (clave de nba_data.DTYPE_PLAN)
+        fetch: función sin argumentos que lo trae de la fuente remota y
+            devuelve (DataFrame, reporte), como nba_data.read_dataset
+        source: descripción de la fuente remota (URL o archivo), para el manifiesto
+        cache_dir: carpeta de la caché en disco
+        refresh: True para bajar de la fuente remota aunque esté en disco
+
+    Returns:
+        (DataFrame, fila del registro: dataset, origen, filas, mb, segundos,
+        sha256 y error). Si ningún nivel lo tiene, el DataFrame es vacío y el
+        error queda en el registro.
+    """
+    start = time.perf_counter()
+    log = {"dataset": dataset, "origen": None, "filas": 0, "mb": 0.0, "segundos": 0.0,
+           "sha256": None, "error": None}
+
+    def served(df, tier, sha):
+        _memory[dataset] = (df, sha)
+        log.update(origen=tier, filas=len(df), mb=round(float(memory_mb(df)), 2),
+                   segundos=round(time.perf_counter() - start, 3), sha256=sha[:12] if sha else None)
+        if tier != TIER_MEMORY:
+            _loads[dataset] = dict(log)
+            print(f"📦 {dataset}: {tier} ({len(df):,} filas, {log['segundos']:.3f} s)")
+        return df, log
+
+    if dataset in _memory:
+        df, sha = _memory[dataset]
+        return served(df, TIER_MEMORY, sha)
+    if dataset in _loads and _loads[dataset]["error"]:
+        # Ya falló en este proceso: no se reintenta en cada rerun (ver clear_memory)
+        return pd.DataFrame(), dict(_loads[dataset])
+
+    errores = []
+    if not refresh:
+        try:
+            df, sha = read_from_disk(dataset, source, cache_dir)
+            if df is not None:
+                return served(df, TIER_DISK, sha)
+        except LOAD_ERRORS as e:
+            errores.append(f"disco: {e}")
+
+    try:
+        df, _ = fetch()
+    except LOAD_ERRORS as e:
+        errores.append(f"remoto: {e}")
+        # Sin conexión: cualquier copia válida en disco sirve
+        try:
+            df, sha = read_from_disk(dataset, None, cache_dir)
+        except LOAD_ERRORS:
+            df = None
+        if df is not None:
+            print(f"⚠️ {dataset}: fuente remota no disponible, se usa la copia en disco")
+            return served(df, TIER_DISK, sha)
+    else:
+        sha = None
+        try:
+            sha = save_to_disk(df, dataset, source, cache_dir)
+        except (OSError, ValueError) as e:
+            # Sin permisos de escritura (ej: Streamlit Cloud) la app sigue con lo
+            # bajado; el hash del contenido identifica igual la versión
+            print(f"⚠️ No se pudo guardar {dataset} en la caché: {e}")
+            sha = frame_sha256(df)
+        return served(df, TIER_REMOTE, sha)
+
+    log.update(error="; ".join(errores), segundos=round(time.perf_counter() - start, 3))
+    _loads[dataset] = dict(log)
+    print(f"❌ {dataset}: no se pudo cargar ({log['error']})")
+    return pd.DataFrame(), log
+
+
+def load_report():
+    """Una fila por dataset cargado en el proceso: origen, filas, MB, segundos, hash y error"""
+    return pd.DataFrame(list(_loads.values()),
+                        columns=["dataset", "origen", "filas", "mb", "segundos", "sha256", "error"])
+
+
+def clear_memory():
+    """Vacía el nivel de memoria y los errores (el próximo acceso lee de disco o remoto)"""
+    _memory.clear()
+    _loads.clear()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# ======================================================
+# DATOS AGREGADOS PARA LOS GRÁFICOS DEL EDA
+# ======================================================
+# Los gráficos no reciben el dataset completo sino un resumen de tamaño
+# acotado, calculado una vez por (versión del dataset, tipo, x, y):
+#   - Barra: promedio de y por valor de x (o por intervalo de x si es
+#     numérica con muchos valores), como mucho MAX_GROUPS barras
+#   - Línea: promedio y desvío de y por valor o intervalo de x, ordenado,
+#     como mucho MAX_POINTS puntos
+#   - Scatter: los puntos tal cual si son pocos; si no, la densidad en una
+#     grilla de DENSITY_BINS x DENSITY_BINS (histograma 2-D)
+# Dibujar pasa a depender del tamaño del resumen y no de las filas.
+MAX_GROUPS = 40
+MAX_POINTS = 2000
+DENSITY_BINS = 80
+
+
+def _binnable(series):
+    return pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)
+
+
+def _as_float(series):
+    """Valores numéricos o fechas como float64 (las fechas en nanosegundos)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.to_numpy("datetime64[ns]").astype("int64").astype(np.float64)
+        values[series.isna().to_numpy()] = np.nan
+        return values
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _interval_keys(series, n_bins):
+    """Intervalo de igual ancho de cada fila y el punto medio de cada intervalo"""
+    values = _as_float(series)
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    edges = np.linspace(lo, hi, n_bins + 1)
+    keys = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, n_bins - 1)
+    mids = (edges[:-1] + edges[1:]) / 2
+    if pd.api.types.is_datetime64_any_dtype(series):
+        mids = pd.to_datetime(mids.astype("int64"))
+    return keys, np.asarray(mids)
+
+
+def grouped_stats(df, x, y, max_groups):
+    """
+    Promedio, desvío y cantidad de y por valor de x
+
+    Si x es numérica (o fecha) con más de max_groups valores distintos se
+    agrupa por intervalos de igual ancho, representados por su punto medio.
+    Si es categórica con más de max_groups valores quedan los más frecuentes.
+
+    Returns:
+        (DataFrame con x, media, desvío y filas, ordenado por x; filas usadas)
+    """
+    data = df[[x, y]].dropna()
+    if data.empty:
+        return pd.DataFrame(columns=[x, "media", "desvío", "filas"]), 0
+    yv = pd.Series(_as_float(data[y]), index=data.index)
+    if _binnable(data[x]) and data[x].nunique() > max_groups:
+        keys, mids = _interval_keys(data[x], max_groups)
+        stats = yv.groupby(keys).agg(["mean", "std", "size"])
+        stats.index = mids[stats.index]
+    else:
+        stats = yv.groupby(data[x], observed=True).agg(["mean", "std", "size"])
+        if len(stats) > max_groups:
+            stats = stats.nlargest(max_groups, "size")
+        stats = stats.sort_index()
+    stats = stats.rename(columns={"mean": "media", "std": "desvío", "size": "filas"})
+    return stats.rename_axis(x).reset_index(), len(data)
+
+
+def scatter_data(df, x, y, max_points=MAX_POINTS, bins=DENSITY_BINS):
+    """
+    Puntos o densidad 2-D para el scatter de y contra x
+
+    Returns:
+        dict con kind "puntos" (data: hasta max_points filas de x e y) o
+        "densidad" (counts de bins x bins y los bordes xedges / yedges), y
+        las filas representadas
+    """
+    data = df[[x, y]].dropna()
+    if len(data) <= max_points:
+        return {"kind": "puntos", "data": data, "rows": len(data)}
+    if not _binnable(data[x]):
+        # Eje x categórico: una muestra fija de max_points filas
+        return {"kind": "puntos", "data": data.sample(max_points, random_state=42), "rows": len(data)}
+    counts, xedges, yedges = np.histogram2d(_as_float(data[x]), _as_float(data[y]), bins=bins)
+    return {"kind": "densidad", "counts": counts, "xedges": xedges, "yedges": yedges,
+            "fecha_x": pd.api.types.is_datetime64_any_dtype(data[x]), "rows": len(data)}
+
+
+def chart_data(df, tipo, x, y):
+    """Resumen para un gráfico del EDA ("Barra", "Línea" o "Scatterplot")"""
+    if tipo == "Barra":
+        stats, rows = grouped_stats(df, x, y, MAX_GROUPS)
+        return {"kind": "barra", "data": stats, "rows": rows}
+    if tipo == "Línea":
+        stats, rows = grouped_stats(df, x, y, MAX_POINTS)
+        return {"kind": "linea", "data": stats, "rows": rows}
+    return scatter_data(df, x, y)
@@ -0,0 +1,175 @@
+import pandas as pd
+
+# ======================================================
+# PLAN DE TIPOS DE LOS DATASETS DE LA APP
+# ======================================================
+# Misma idea que DTYPE_PLAN del ETL (Notebooks/Ingesta_Automatica/etl_schemas.py),
+# repetido acá porque la app se publica sola desde esta carpeta.
+#   - category: textos con pocos valores distintos (equipos, college, temporada...)
+#   - string[pyarrow]: nombres e ids de texto (game_id conserva los ceros)
+#   - Int8/Int16/Int32: enteros chicos, nullable
+#   - float32: porcentajes de tiro de los partidos
+# Las métricas y scores de nba_puntaje_vara.csv quedan en float64: alimentan
+# el clasificador, el RandomForest y el K-Means, que no deben cambiar.
+_COUNT = "Int16"
+_TEXT = "string[pyarrow]"
+
+_SEASONS = {
+    "Unnamed: 0": "Int32",
+    "player_name": _TEXT, "team_abbreviation": "category",
+    "college": "category", "country": "category",
+    "draft_year": "category", "draft_round": "category", "draft_number": "category",
+    "gp": _COUNT, "season": "category", "season_year": _COUNT,
+    "team_id": "Int32", "team_name": "category",
+}
+
+DTYPE_PLAN = {
+    "puntaje": {**_SEASONS, "rendimiento": "category"},
+    "all_seasons": _SEASONS,
+    "player": {
+        "id": "Int32", "full_name": _TEXT, "first_name": _TEXT, "last_name": _TEXT,
+        # Nombres de la tabla limpia (almacén DuckDB)
+        "player_id": "Int32", "player_name": _TEXT,
+        "is_active": "Int8",
+    },
+    "team": {
+        # ~30 filas: una categórica ocuparía más que el texto
+        "id": "Int32", "full_name": _TEXT, "abbreviation": _TEXT, "nickname": _TEXT,
+        "city": _TEXT, "state": _TEXT, "year_founded": _COUNT,
+    },
+    "game": {
+        "season_id": "Int32", "game_id": _TEXT, "game_date": "date",
+        "season_type": "category", "team_id": "Int32",
+        "team_abbreviation": "category", "team_name": "category",
+        "matchup": _TEXT, "wl": "category", "team_side": "category",
+        "min": _COUNT,
+        "fgm": _COUNT, "fga": _COUNT, "fg_pct": "float32",
+        "fg3m": _COUNT, "fg3a": _COUNT, "fg3_pct": "float32",
+        "ftm": _COUNT, "fta": _COUNT, "ft_pct": "float32",
+        "oreb": _COUNT, "dreb": _COUNT, "reb": _COUNT,
+        "ast": _COUNT, "stl": _COUNT, "blk": _COUNT,
+        "tov": _COUNT, "pf": _COUNT, "pts": _COUNT,
+        "plus_minus": _COUNT, "video_available": "Int8",
+    },
+    "line_score": {
+        "game_date_est": "date", "game_date": "date", "game_id": _TEXT,
+        "team_id": "Int32", "team_abbreviation": "category",
+        "team_city_name": "category", "team_nickname": "category",
+        "team_wins_losses": _TEXT, "local_visitante": "category",
+        **{f"pts_qtr{i}": _COUNT for i in range(1, 5)},
+        **{f"pts_ot{i}": _COUNT for i in range(1, 11)},
+        "pts": _COUNT,
+    },
+    "resumen": {
+        "team_abbreviation": "category", "season_year": _COUNT,
+        "n_players": _COUNT, "n_malos": _COUNT,
+    },
+    "team_season": {
+        "team_id": "Int32", "season_id": "Int32",
+        "team_abbreviation": "category", "team_name": "category",
+    },
+}
+
+# Ids que deben leerse como texto para no perder los ceros a la izquierda
+TEXT_IDS = {"game_id": str}
+
+SIDE_SUFFIXES = ("_home", "_away")
+
+
+def dtypes_for(dataset, columns):
+    """dtype del plan para cada columna presente (resuelve <col>_home / <col>_away)"""
+    plan = DTYPE_PLAN.get(dataset, {})
+    dtypes = {}
+    for col in columns:
+        base = col
+        for suffix in SIDE_SUFFIXES:
+            if col.endswith(suffix) and col[:-len(suffix)] in plan:
+                base = col[:-len(suffix)]
+        if base in plan:
+            dtypes[col] = plan[base]
+    return dtypes
+
+
+def apply_dtype_plan(df, dataset):
+    """
+    Aplica el plan de tipos columna por columna
+
+    Si una columna no se puede convertir (ej: un CSV subido con decimales en
+    un contador) se deja con su tipo original.
+    """
+    converted = {}
+    for col, dtype in dtypes_for(dataset, df.columns).items():
+        if df[col].dtype == dtype:
+            continue
+        try:
+            if dtype == "date":
+                converted[col] = pd.to_datetime(df[col], errors="coerce")
+            else:
+                converted[col] = df[col].astype(dtype)
+        except (ValueError, TypeError):
+            continue
+    return df.assign(**converted) if converted else df
+
+
+def memory_mb(df):
+    """Memoria del DataFrame en MB, contando el contenido real de los textos"""
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def read_dataset(source, dataset):
+    """
+    Lee un CSV de la app con su plan de tipos
+
+    Returns:
+        (DataFrame, fila del reporte de memoria: dataset, filas, MB antes/después, ahorro)
+    """
+    return _with_dtype_plan(pd.read_csv(source, dtype=TEXT_IDS), dataset)
+
+
+# ======================================================
+# ALMACÉN DUCKDB LOCAL (opcional)
+# ======================================================
+# Archivo generado por Notebooks/Ingesta_Automatica/etl_duckdb.py con las
+# tablas limpias y los puntajes. Con NBA_DUCKDB=<archivo> la app lee de ahí en
+# vez de los CSV de GitHub y funciona sin red. Requiere duckdb.
+DUCKDB_TABLES = {
+    "puntaje": "puntaje",
+    "all_seasons": "all_seasons",
+    "player": "players",
+    "team": "teams",
+    "game": "games",
+    "line_score": "line_score",
+    "resumen": "resumen",
+    "team_season": "team_season",
+}
+
+
+def read_duckdb_dataset(db_path, dataset):
+    """
+    Lee un dataset de la app desde el almacén DuckDB, con su plan de tipos
+
+    Returns:
+        (DataFrame, fila del reporte de memoria), igual que read_dataset
+    """
+    import duckdb  # solo hace falta si se usa el almacén
+
+    try:
+        with duckdb.connect(str(db_path), read_only=True) as con:
+            df = con.execute(f"SELECT * FROM {DUCKDB_TABLES[dataset]}").df()
+    except duckdb.Error as e:
+        # Archivo inexistente o tabla faltante: mismo tipo de error que un CSV que no se puede leer
+        raise OSError(f"{db_path}: {e}") from e
+    return _with_dtype_plan(df, dataset)
+
+
+def _with_dtype_plan(df, dataset):
+    antes = memory_mb(df)
+    df = apply_dtype_plan(df, dataset)
+    despues = memory_mb(df)
+    return df, {
+        "dataset": dataset,
+        "filas": len(df),
+        "mb_antes": round(antes, 2),
+        "mb_despues": round(despues, 2),
+        "ahorro": f"{1 - despues / antes:.0%}" if antes else "—",
+    }
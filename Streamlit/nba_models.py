@@ -0,0 +1,416 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, mean_absolute_error, r2_score, silhouette_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from nba_data import read_dataset
+
+# ======================================================
+# REGISTRO DE MODELOS DE LA APP
+# ======================================================
+# Los tres modelos de app_nba.py (clasificador de potencial, RandomForest de
+# global_score y K-Means de perfiles), más un barrido de K-Means para k de 2
+# a 12, se entrenan una vez y se guardan en disco con sus escaladores y
+# métricas. Cada artefacto se llama
+# <modelo>.<hash>.joblib, donde el hash sale de las columnas que usa el
+# modelo y de sus parámetros: la app solo entrena si no hay un artefacto
+# para esos datos (ej: cambió nba_puntaje_vara.csv o se subió otro archivo).
+#
+# registry.json guarda modelo, hash, filas y métricas de cada artefacto, para
+# listarlos sin cargar el RandomForest (~70 MB comprimido).
+#
+# NBA_MODELS_DIR: carpeta de los artefactos (por defecto models)
+MODELS_DIR = Path(os.getenv("NBA_MODELS_DIR", "models"))
+REGISTRY = "registry.json"
+
+TARGET = "global_score"
+FEATURES = [
+    "ts_pct_score", "usg_pct_score", "dreb_pct_score", "ast_pct_score",
+    "oreb_pct_score", "age", "player_height", "player_weight",
+]
+RF_FEATURES = [
+    "age", "player_height", "player_weight",
+    "oreb_pct_score", "dreb_pct_score", "usg_pct_score",
+    "ts_pct_score", "ast_pct_score",
+]
+CLUSTER_COLS = [
+    "ts_pct_score", "usg_pct_score", "ast_pct_score",
+    "oreb_pct_score", "dreb_pct_score", "net_rating_score",
+]
+
+# Jugadores con global_score en el cuartil superior "tienen potencial"
+POTENTIAL_QUANTILE = 0.75
+
+# Por modelo: columnas que usa, mínimo de filas completas y parámetros
+# (los parámetros entran en el hash: si cambian, se vuelve a entrenar)
+MODELS = {
+    "clasificador": {
+        "columns": FEATURES + [TARGET],
+        "min_rows": 40,
+        "params": {"max_iter": 500, "quantile": POTENTIAL_QUANTILE, "test_size": 0.2, "random_state": 42},
+    },
+    "regresor": {
+        "columns": RF_FEATURES + [TARGET],
+        "min_rows": 30,
+        "params": {"n_estimators": 300, "test_size": 0.2, "random_state": 42},
+    },
+    "clusters": {
+        "columns": CLUSTER_COLS,
+        "min_rows": 20,
+        "params": {"n_clusters": 4, "n_init": 10, "random_state": 42},
+    },
+    # Barrido de k para elegir la cantidad de clusters en la app sin reentrenar.
+    # Con más de minibatch_rows filas (o minibatch=True) usa MiniBatchKMeans;
+    # la silueta se calcula sobre una muestra (es cuadrática en filas).
+    "barrido_k": {
+        "columns": CLUSTER_COLS,
+        "min_rows": 20,
+        "params": {"k_min": 2, "k_max": 12, "n_init": 10, "random_state": 42, "minibatch": None,
+                   "minibatch_rows": 100_000, "batch_size": 4096, "silhouette_sample": 5000},
+    },
+}
+
+
+def model_params(name, params=None):
+    """Parámetros del modelo, con los de params reemplazando a los de MODELS"""
+    return {**MODELS[name]["params"], **(params or {})}
+
+
+def model_hash(name, df, params=None):
+    """Hash de las columnas que usa el modelo y de sus parámetros; None si faltan columnas"""
+    spec = MODELS[name]
+    if not all(c in df.columns for c in spec["columns"]):
+        return None
+    row_hashes = pd.util.hash_pandas_object(df[spec["columns"]], index=False).to_numpy()
+    digest = hashlib.sha256(row_hashes.tobytes())
+    digest.update(repr(sorted(model_params(name, params).items())).encode())
+    return digest.hexdigest()
+
+
+def _train_classifier(df, params):
+    threshold = float(df[TARGET].dropna().quantile(params["quantile"]))
+    data = df[FEATURES + [TARGET]].dropna()
+    y = (data[TARGET] >= threshold).astype(int)
+    scaler = StandardScaler()
+    Xs = scaler.fit_transform(data[FEATURES])
+    Xtr, Xte, ytr, yte = train_test_split(Xs, y, test_size=params["test_size"],
+                                          random_state=params["random_state"])
+    model = LogisticRegression(max_iter=params["max_iter"])
+    model.fit(Xtr, ytr)
+    return {
+        "model": model,
+        "scaler": scaler,
+        "features": FEATURES,
+        "threshold": threshold,
+        "metrics": {"accuracy": float(accuracy_score(yte, model.predict(Xte)))},
+    }
+
+
+def _train_regressor(df, params):
+    data = df.dropna(subset=RF_FEATURES + [TARGET])
+    Xtr, Xte, ytr, yte = train_test_split(data[RF_FEATURES], data[TARGET], test_size=params["test_size"],
+                                          random_state=params["random_state"])
+    model = RandomForestRegressor(n_estimators=params["n_estimators"], random_state=params["random_state"],
+                                  n_jobs=-1)
+    model.fit(Xtr, ytr)
+    ypred = model.predict(Xte)
+    return {
+        "model": model,
+        "scaler": None,
+        "features": RF_FEATURES,
+        "importances": pd.Series(model.feature_importances_, index=RF_FEATURES).sort_values(),
+        "metrics": {"mae": float(mean_absolute_error(yte, ypred)), "r2": float(r2_score(yte, ypred))},
+    }
+
+
+def _train_clusters(df, params):
+    data = df.dropna(subset=CLUSTER_COLS)
+    scaler = StandardScaler()
+    Xsc = scaler.fit_transform(data[CLUSTER_COLS])
+    model = KMeans(n_clusters=params["n_clusters"], random_state=params["random_state"], n_init=params["n_init"])
+    model.fit(Xsc)
+    return {
+        "model": model,
+        "scaler": scaler,
+        "features": CLUSTER_COLS,
+        "metrics": {"inertia": float(model.inertia_)},
+    }
+
+
+def _fit_k(X, k, params, minibatch):
+    """Ajusta K-Means con k clusters; devuelve (k, modelo, etiquetas, inercia, silueta)"""
+    if minibatch:
+        model = MiniBatchKMeans(n_clusters=k, random_state=params["random_state"], n_init=3,
+                                batch_size=params["batch_size"])
+    else:
+        model = KMeans(n_clusters=k, random_state=params["random_state"], n_init=params["n_init"])
+    labels = model.fit_predict(X)
+    sample = min(len(X), params["silhouette_sample"])
+    silhouette = silhouette_score(X, labels, sample_size=sample, random_state=params["random_state"])
+    return k, model, labels, float(model.inertia_), float(silhouette)
+
+
+def _train_sweep(df, params):
+    data = df.dropna(subset=CLUSTER_COLS)
+    scaler = StandardScaler()
+    Xsc = scaler.fit_transform(data[CLUSTER_COLS])
+    minibatch = params["minibatch"]
+    if minibatch is None:
+        minibatch = len(data) > params["minibatch_rows"]
+    ks = [k for k in range(params["k_min"], params["k_max"] + 1) if k < len(data)]
+
+    # Un k por proceso; cada uno es independiente de los demás
+    fits = Parallel(n_jobs=-1)(delayed(_fit_k)(Xsc, k, params, minibatch) for k in ks)
+
+    models, summaries, table = {}, {}, []
+    for k, model, labels, inertia, silhouette in fits:
+        models[k] = model
+        # Promedio de cada cluster en las unidades originales (para las etiquetas de la app)
+        summaries[k] = data[CLUSTER_COLS].groupby(labels).mean().rename_axis("cluster")
+        table.append({"k": k, "inercia": inertia, "silueta": silhouette,
+                      "tamaño_min": int(np.bincount(labels).min())})
+    table = pd.DataFrame(table)
+    best = table.loc[table["silueta"].idxmax()]
+    return {
+        "model": models,
+        "scaler": scaler,
+        "features": CLUSTER_COLS,
+        "summary": summaries,
+        "table": table,
+        "minibatch": bool(minibatch),
+        "metrics": {"mejor_k": float(best["k"]), "silueta": float(best["silueta"])},
+    }
+
+
+TRAINERS = {
+    "clasificador": _train_classifier,
+    "regresor": _train_regressor,
+    "clusters": _train_clusters,
+    "barrido_k": _train_sweep,
+}
+
+
+def train_model(name, df, params=None):
+    """
+    Entrena un modelo del registro sobre df
+
+    Returns:
+        dict con model, scaler (o None), features, metrics, hash, rows y
+        trained_at (más threshold en el clasificador e importances en el
+        regresor); None si faltan columnas o no hay suficientes filas completas
+    """
+    spec = MODELS[name]
+    key = model_hash(name, df, params)
+    if key is None:
+        return None
+    rows = int(df[spec["columns"]].notna().all(axis=1).sum())
+    if rows < spec["min_rows"]:
+        return None
+    start = time.perf_counter()
+    artifact = TRAINERS[name](df, model_params(name, params))
+    artifact.update(
+        name=name,
+        hash=key,
+        rows=rows,
+        trained_at=datetime.now().isoformat(timespec="seconds"),
+        train_seconds=round(time.perf_counter() - start, 3),
+    )
+    return artifact
+
+
+def artifact_path(name, key, models_dir=MODELS_DIR):
+    return Path(models_dir) / f"{name}.{key[:16]}.joblib"
+
+
+def read_registry(models_dir=MODELS_DIR):
+    """{archivo: {modelo, hash, filas, métricas, fecha}}; vacío si no hay registro"""
+    path = Path(models_dir) / REGISTRY
+    if not path.exists():
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Registro de modelos ilegible ({path}): {e}")
+        return {}
+
+
+def save_model(artifact, models_dir=MODELS_DIR):
+    """Guarda el artefacto en <modelo>.<hash>.joblib (archivo temporal + rename) y lo anota en el registro"""
+    path = artifact_path(artifact["name"], artifact["hash"], models_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    joblib.dump(artifact, tmp_path, compress=3)
+    os.replace(tmp_path, path)
+
+    entries = read_registry(models_dir)
+    entries[path.name] = {
+        "modelo": artifact["name"],
+        "hash": artifact["hash"],
+        "filas": artifact["rows"],
+        "metricas": artifact["metrics"],
+        "entrenado": artifact["trained_at"],
+        "segundos": artifact["train_seconds"],
+        "mb": round(path.stat().st_size / 1024 ** 2, 2),
+    }
+    registry_path = Path(models_dir) / REGISTRY
+    tmp_registry = registry_path.with_suffix(".tmp")
+    with open(tmp_registry, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_registry, registry_path)
+    return path
+
+
+def load_or_train(name, df, models_dir=MODELS_DIR, params=None):
+    """
+    Carga el modelo entrenado con estos datos; si no está en disco, lo entrena y lo guarda
+
+    Args:
+        params: parámetros que reemplazan a los de MODELS (ej: {"minibatch": True})
+
+    Returns:
+        (artefacto o None, "disco", "entrenado" o "sin datos")
+    """
+    key = model_hash(name, df, params)
+    if key is None:
+        return None, "sin datos"
+    path = artifact_path(name, key, models_dir)
+    if path.exists():
+        try:
+            artifact = joblib.load(path)
+            if artifact.get("hash") == key:
+                return artifact, "disco"
+        except Exception as e:
+            print(f"⚠️ No se pudo leer {path}: {e}")
+    artifact = train_model(name, df, params)
+    if artifact is None:
+        return None, "sin datos"
+    try:
+        save_model(artifact, models_dir)
+    except OSError as e:
+        # Sin permisos de escritura la app sigue con el modelo en memoria
+        print(f"⚠️ No se pudo guardar {path}: {e}")
+    return artifact, "entrenado"
+
+
+def registry(models_dir=MODELS_DIR):
+    """Una fila por artefacto del registro que sigue en disco: modelo, hash, filas, métricas y fecha"""
+    rows = []
+    for fname, entry in read_registry(models_dir).items():
+        if not (Path(models_dir) / fname).exists():
+            continue
+        rows.append({
+            "modelo": entry["modelo"],
+            "hash": entry["hash"][:16],
+            "filas": entry["filas"],
+            **entry["metricas"],
+            "entrenado": entry["entrenado"],
+            "segundos": entry["segundos"],
+            "mb": entry["mb"],
+        })
+    return pd.DataFrame(rows)
+
+
+def score_batch(df, classifier=None, regressor=None, clusters=None):
+    """
+    Puntúa muchos candidatos de una vez con los artefactos del registro
+
+    Cada modelo predice con una sola llamada sobre todas las filas completas
+    (sin recorrer fila por fila). Las filas con alguna columna nula, o los
+    modelos que no se pasan, quedan en nulo.
+
+    Args:
+        df: candidatos con las columnas FEATURES (y net_rating_score para el cluster)
+        classifier, regressor, clusters: artefactos de load_or_train
+
+    Returns:
+        df con potencial (1/0), prob_potencial, global_score_pred y cluster
+    """
+    out = df.copy()
+    n = len(df)
+    predictions = {
+        "potencial": pd.array([pd.NA] * n, dtype="Int8"),
+        "prob_potencial": np.full(n, np.nan),
+        "global_score_pred": np.full(n, np.nan),
+        "cluster": pd.array([pd.NA] * n, dtype="Int8"),
+    }
+
+    def complete_rows(artifact):
+        if artifact is None or not all(c in df.columns for c in artifact["features"]):
+            return None, None
+        # DataFrame con los nombres de columna con que se entrenaron el modelo y el escalador
+        X = df[artifact["features"]].apply(pd.to_numeric, errors="coerce").astype(np.float64)
+        rows = X.notna().all(axis=1).to_numpy()
+        return X[rows], rows
+
+    X, rows = complete_rows(classifier)
+    if rows is not None and rows.any():
+        Xs = classifier["scaler"].transform(X)
+        predictions["potencial"][rows] = classifier["model"].predict(Xs)
+        predictions["prob_potencial"][rows] = classifier["model"].predict_proba(Xs)[:, 1]
+
+    X, rows = complete_rows(regressor)
+    if rows is not None and rows.any():
+        predictions["global_score_pred"][rows] = regressor["model"].predict(X)
+
+    X, rows = complete_rows(clusters)
+    if rows is not None and rows.any():
+        predictions["cluster"][rows] = clusters["model"].predict(clusters["scaler"].transform(X))
+
+    for col, values in predictions.items():
+        out[col] = values
+    return out
+
+
+if __name__ == "__main__":
+    # Entrena de antemano: python nba_models.py [nba_puntaje_vara.csv]
+    parser = argparse.ArgumentParser(description="Entrena y guarda los modelos de la app")
+    parser.add_argument("input", nargs="?", default="nba_puntaje_vara.csv", help="tabla de puntajes")
+    parser.add_argument("--dir", default=str(MODELS_DIR), help="carpeta de los artefactos")
+    parser.add_argument("--list", action="store_true", help="solo lista los artefactos guardados")
+    parser.add_argument("--minibatch", action="store_true", help="barrido de k con MiniBatchKMeans")
+    parser.add_argument("--score", help="CSV de candidatos a puntuar con los modelos")
+    parser.add_argument("--out", default="predicciones_lote.csv", help="CSV de salida de --score")
+    args = parser.parse_args()
+
+    if not args.list:
+        df_puntaje, _ = read_dataset(args.input, "puntaje")
+        artifacts = {}
+        for name in MODELS:
+            start = time.perf_counter()
+            params = {"minibatch": True} if args.minibatch and name == "barrido_k" else None
+            artifact, origen = load_or_train(name, df_puntaje, args.dir, params)
+            if artifact is None:
+                print(f"⚠️ {name}: faltan columnas o filas para entrenar")
+                continue
+            artifacts[name] = artifact
+            metricas = ", ".join(f"{k}={v:.4f}" for k, v in artifact["metrics"].items())
+            print(f"✅ {name} ({origen}, {time.perf_counter() - start:.2f} s): {metricas}")
+            if name == "barrido_k":
+                print(artifact["table"].to_string(index=False))
+
+        if args.score:
+            candidates = pd.read_csv(args.score)
+            missing = [c for c in CLUSTER_COLS if c not in candidates.columns]
+            if missing:
+                print(f"⚠️ Sin cluster: faltan columnas {', '.join(missing)}")
+            start = time.perf_counter()
+            scored = score_batch(candidates, artifacts.get("clasificador"), artifacts.get("regresor"),
+                                 artifacts.get("clusters"))
+            print(f"✅ {len(scored):,} candidatos puntuados en {time.perf_counter() - start:.2f} s: {args.out}")
+            scored.to_csv(args.out, index=False)
+    print(registry(args.dir).to_string(index=False))
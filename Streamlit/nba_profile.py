@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+# ======================================================
+# PERFIL DE COLUMNAS DE UN DATASET
+# ======================================================
+# Una fila por columna con lo que la app necesita saber de ella: tipo,
+# nulos, valores distintos, mínimo / máximo, cuantiles y valores más
+# frecuentes. Se calcula una vez por versión del dataset y de ahí leen el
+# resumen estadístico, los rangos de los sliders y los selectores de ejes
+# (antes cada rerun volvía a correr describe(), select_dtypes y min / max /
+# median por columna).
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+TOP_VALUES = 5
+
+
+def _column_profile(series, top_n):
+    row = {
+        "tipo": str(series.dtype),
+        "numérica": bool(pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)),
+        "nulos": int(series.isna().sum()),
+        "distintos": int(series.nunique(dropna=True)),
+        "min": np.nan, "max": np.nan, "media": np.nan, "desvío": np.nan,
+        "rango": None, "top": None,
+    }
+    row.update({f"p{int(q * 100)}": np.nan for q in QUANTILES})
+    present = series.dropna()
+    if present.empty:
+        return row
+
+    if row["numérica"]:
+        values = present.to_numpy(dtype=np.float64)
+        row.update({"min": values.min(), "max": values.max(), "media": values.mean(),
+                    "desvío": values.std(ddof=1) if len(values) > 1 else np.nan})
+        row.update({f"p{int(q * 100)}": v for q, v in zip(QUANTILES, np.quantile(values, QUANTILES))})
+        row["rango"] = f"{row['min']:g} → {row['max']:g}"
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        row["rango"] = f"{present.min()} → {present.max()}"
+
+    counts = present.value_counts().head(top_n)
+    counts = counts[counts > 0]  # las categorías sin filas de un category
+    row["top"] = ", ".join(f"{value} ({n:,})" for value, n in counts.items())
+    return row
+
+
+def profile_dataset(df, top_n=TOP_VALUES):
+    """
+    Perfil de todas las columnas de df
+
+    Returns:
+        DataFrame indexado por columna con tipo, numérica (bool), nulos,
+        distintos, min, max, media, desvío, p5..p95 (solo columnas
+        numéricas), rango (texto, también para fechas) y top (los top_n
+        valores más frecuentes con su cantidad)
+    """
+    rows = {col: _column_profile(df[col], top_n) for col in df.columns}
+    profile = pd.DataFrame.from_dict(rows, orient="index")
+    profile.index.name = "columna"
+    profile.attrs["filas"] = len(df)
+    return profile
+
+
+def numeric_columns(profile):
+    """Columnas numéricas, en el orden del dataset"""
+    return profile.index[profile["numérica"]].tolist()
+
+
+def slider_range(profile, col, default):
+    """(mínimo, máximo, mediana) de una columna según el perfil; default si no es numérica o no tiene datos"""
+    if col not in profile.index or not profile.at[col, "numérica"] or pd.isna(profile.at[col, "min"]):
+        return default
+    return float(profile.at[col, "min"]), float(profile.at[col, "max"]), float(profile.at[col, "p50"])
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+from nba_data import read_dataset
+
+# ======================================================
+# ÍNDICE DE JUGADORES SIMILARES
+# ======================================================
+# KD-tree sobre los nueve *_score de nba_puntaje_vara.csv, estandarizados
+# (media 0, desvío 1 en toda la tabla) para que ningún atributo pese más por
+# su escala. Se construye una vez y se guarda en disco junto con el hash de
+# los datos: al iniciar la app se carga y solo se reconstruye si el CSV cambió.
+#
+# SIMILAR_INDEX_PATH: archivo del índice (por defecto similar_index.joblib)
+SCORE_COLS = [
+    "pts_score", "reb_score", "ast_score", "net_rating_score", "oreb_pct_score",
+    "dreb_pct_score", "usg_pct_score", "ts_pct_score", "ast_pct_score",
+]
+INFO_COLS = ["player_name", "team_abbreviation", "season", "season_year", "global_score"]
+
+INDEX_PATH = Path(os.getenv("SIMILAR_INDEX_PATH", "similar_index.joblib"))
+
+
+def data_hash(df):
+    """Hash de las columnas que usa el índice (cambia si cambia cualquier fila)"""
+    cols = [c for c in SCORE_COLS + INFO_COLS if c in df.columns]
+    row_hashes = pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def build_index(df):
+    """
+    Construye el índice a partir de la tabla de puntajes
+
+    Las filas con algún *_score nulo quedan fuera del índice.
+
+    Returns:
+        dict con el KD-tree, media y desvío de la estandarización, los datos
+        de cada fila indexada (INFO_COLS) y el hash de los datos
+    """
+    indexed = df.dropna(subset=SCORE_COLS)
+    X = indexed[SCORE_COLS].to_numpy(np.float64)
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    return {
+        "tree": KDTree((X - mean) / std),
+        "mean": mean,
+        "std": std,
+        "info": indexed[[c for c in INFO_COLS if c in indexed.columns]].reset_index(drop=True),
+        "hash": data_hash(df),
+    }
+
+
+def save_index(index, path=INDEX_PATH):
+    """Guarda el índice en disco (archivo temporal + rename)"""
+    path = Path(path)
+    tmp_path = path.with_suffix(".tmp")
+    joblib.dump(index, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_or_build_index(df, path=INDEX_PATH):
+    """
+    Carga el índice de disco si corresponde a estos datos; si no, lo construye y lo guarda
+
+    Returns:
+        (índice, "disco" o "construido")
+    """
+    path = Path(path)
+    expected = data_hash(df)
+    if path.exists():
+        try:
+            index = joblib.load(path)
+            if index.get("hash") == expected:
+                return index, "disco"
+        except Exception as e:
+            print(f"⚠️ No se pudo leer {path}: {e}")
+    index = build_index(df)
+    try:
+        save_index(index, path)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar {path}: {e}")
+    return index, "construido"
+
+
+def find_row(index, player_name, season):
+    """Posición en el índice de un jugador en una temporada (None si no está)"""
+    info = index["info"]
+    matches = np.flatnonzero((info["player_name"] == player_name).to_numpy() & (info["season"] == season).to_numpy())
+    return int(matches[0]) if len(matches) else None
+
+
+def query_similar(index, row, k=10, seasons=None, teams=None):
+    """
+    Los k jugadores-temporada más parecidos a una fila del índice
+
+    Args:
+        index: resultado de build_index / load_or_build_index
+        row: posición de la fila de referencia (ver find_row)
+        k: cantidad de resultados
+        seasons: (año inicial, año final) de season_year, inclusive
+        teams: lista de team_abbreviation permitidos
+
+    Returns:
+        DataFrame con INFO_COLS y la distancia, del más parecido al menos
+        parecido (sin la fila de referencia)
+    """
+    info = index["info"]
+    allowed = np.ones(len(info), dtype=bool)
+    if seasons is not None:
+        years = info["season_year"].to_numpy(dtype="float64", na_value=np.nan)
+        allowed &= (years >= seasons[0]) & (years <= seasons[1])
+    if teams:
+        allowed &= info["team_abbreviation"].isin(teams).to_numpy()
+    allowed[row] = False
+    available = int(allowed.sum())
+    if available == 0:
+        return info.iloc[[]].assign(distancia=[])
+
+    # Con filtros se piden más vecinos hasta juntar k que los cumplan
+    point = index["tree"].data[row:row + 1]
+    n_fetch = min(k + 1, len(info))
+    while True:
+        dist, ind = index["tree"].query(point, k=n_fetch)
+        dist, ind = dist[0], ind[0]
+        keep = allowed[ind]
+        if keep.sum() >= min(k, available) or n_fetch == len(info):
+            break
+        n_fetch = min(n_fetch * 4, len(info))
+
+    ind, dist = ind[keep][:k], dist[keep][:k]
+    return info.iloc[ind].assign(distancia=dist).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    # Construye el índice de antemano: python nba_similar.py [nba_puntaje_vara.csv]
+    source = sys.argv[1] if len(sys.argv) > 1 else "nba_puntaje_vara.csv"
+    df_puntaje, _ = read_dataset(source, "puntaje")
+    index = build_index(df_puntaje)
+    save_index(index)
+    print(f"✅ Índice de {len(index['info']):,} jugadores-temporada guardado en {INDEX_PATH}")